@@ -0,0 +1,23 @@
+"""Shared bits for the benchmark scripts: import path, env, local servers."""
+import os
+import sys
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web  # noqa: E402
+
+
+async def serve(handler, host: str = "127.0.0.1") -> tuple[web.AppRunner, int]:
+    """Serve `handler` for every GET path on an ephemeral port."""
+    app = web.Application()
+    app.router.add_route("GET", "/{tail:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, 0).start()
+    return runner, runner.addresses[0][1]
+
+
+def quantile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
@@ -0,0 +1,67 @@
+"""Chapter compression: ratio and encode/decode cost.
+
+Compresses CHAPTERS synthetic chapters (~12 KB of prose each, words drawn
+from a Zipf-like vocabulary like real text) with the codec utils.compress
+uses and, for comparison, other zlib levels and zstd when `zstandard` is
+installed.
+
+    python benchmarks/bench_compress.py
+"""
+import random
+import time
+import zlib
+
+import _local  # noqa: F401
+
+from utils import compress
+
+CHAPTERS = 500
+WORDS    = 2000
+
+
+def _chapters() -> list[str]:
+    rng   = random.Random(7)
+    vocab = [''.join(rng.choice("etaoinshrdlucmfwypvbgkjqxz") for _ in range(rng.randint(2, 9)))
+             for _ in range(3000)]
+    weights = [1 / (i + 1) for i in range(len(vocab))]
+    out = []
+    for _ in range(CHAPTERS):
+        words = rng.choices(vocab, weights, k=WORDS)
+        paras = [" ".join(words[i:i + 80]).capitalize() + "." for i in range(0, WORDS, 80)]
+        out.append("\n\n".join(paras))
+    return out
+
+
+def run(label: str, encode, decode, texts: list[str]):
+    started = time.perf_counter()
+    blobs = [encode(t) for t in texts]
+    enc = time.perf_counter() - started
+    started = time.perf_counter()
+    for b in blobs:
+        decode(b)
+    dec = time.perf_counter() - started
+    raw, packed = sum(len(t.encode()) for t in texts), sum(len(b) for b in blobs)
+    mb = raw / 2**20
+    print(f"{label:16s} ratio {raw / packed:5.2f}x  encode {mb / enc:7.1f} MB/s  "
+          f"decode {mb / dec:7.1f} MB/s  per chapter {enc / len(texts) * 1e6:6.0f} µs / "
+          f"{dec / len(texts) * 1e6:5.0f} µs")
+
+
+def main():
+    texts = _chapters()
+    print(f"{CHAPTERS} chapters, {sum(len(t) for t in texts) / len(texts) / 1024:.1f} KiB each")
+    run(f"pack (zlib {compress.LEVEL})", compress.pack, compress.unpack, texts)
+    for level in (1, 9):
+        run(f"zlib {level}", lambda t: zlib.compress(t.encode(), level),
+            lambda b: zlib.decompress(b).decode(), texts)
+    if compress.zstandard is not None:
+        for level in (3, 6):
+            c, d = compress.zstandard.ZstdCompressor(level=level), compress.zstandard.ZstdDecompressor()
+            run(f"zstd {level}", lambda t: c.compress(t.encode()),
+                lambda b: d.decompress(b).decode(), texts)
+    else:
+        print("zstd             zstandard not installed, skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""EPUB export: streaming writer (utils.epub) vs the old ebooklib build.
+
+Builds one CHAPTERS-chapter volume both ways and reports wall time, peak
+Python memory (tracemalloc) and file size. The ebooklib side is skipped when
+ebooklib is not installed.
+
+    python benchmarks/bench_epub.py
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+
+import _local  # noqa: F401
+
+from scraper import Chapter, Novel
+from utils.exporters import export_epub
+
+CHAPTERS = 2000
+PARA     = "The quick brown fox jumps over the lazy dog. " * 12
+NOVEL    = Novel(title="Benchmark Novel", url="https://bench.local/novel", author="Bench")
+
+
+def chapters():
+    for i in range(CHAPTERS):
+        yield Chapter(index=i, title=f"Chapter {i + 1}", url=f"https://bench.local/{i}",
+                      content="\n\n".join([PARA] * 25))
+
+
+def export_ebooklib(novel: Novel, chapters, volume: str = "") -> str:
+    """The pre-streaming export path, kept here for comparison."""
+    from ebooklib import epub
+
+    book = epub.EpubBook()
+    book.set_identifier(f"zero-novel-scraper:{novel.url}:{volume}")
+    book.set_title(novel.title)
+    book.set_language("en")
+    book.add_author(novel.author or "Unknown")
+    spine, toc = ["nav"], []
+    for ch in chapters:
+        c = epub.EpubHtml(title=ch.title, file_name=f"chap_{ch.index:05d}.xhtml", lang="en")
+        body = "".join(f"<p>{p}</p>" for p in ch.content.split("\n\n") if p.strip())
+        c.set_content(f"<html><body><h2>Chapter {ch.index + 1}: {ch.title}</h2>{body}</body></html>")
+        book.add_item(c)
+        spine.append(c)
+        toc.append(epub.Link(c.file_name, ch.title, f"chap_{ch.index}"))
+    book.toc, book.spine = toc, spine
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    path = os.path.join(tempfile.gettempdir(), "bench_ebooklib.epub")
+    epub.write_epub(path, book)
+    return path
+
+
+def run(label: str, build):
+    tracemalloc.start()
+    started = time.perf_counter()
+    path = build()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = os.path.getsize(path)
+    os.remove(path)
+    print(f"{label:<12} {elapsed:7.2f} s   peak {peak / 2**20:7.1f} MiB   file {size / 2**20:6.1f} MiB")
+
+
+def main():
+    print(f"{CHAPTERS} chapters, ~{len(PARA) * 25 // 1024} KiB each")
+    run("streaming", lambda: export_epub(NOVEL, chapters()))
+    try:
+        import ebooklib  # noqa: F401
+    except ImportError:
+        print("ebooklib    not installed, skipped")
+        return
+    run("ebooklib", lambda: export_ebooklib(NOVEL, chapters()))
+
+
+if __name__ == "__main__":
+    main()
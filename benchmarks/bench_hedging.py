@@ -0,0 +1,93 @@
+"""Chapter fetch tail latency with and without hedging / mirror failover.
+
+A local site answers most chapters in 30-80 ms but takes 3 s for SLOW of
+them; a local mirror on 127.0.0.2 always answers in 50-100 ms. Each run
+fetches CHAPTERS chapters, FLIGHT at a time, after a warm-up that gives the
+host its latency samples.
+
+    python benchmarks/bench_hedging.py
+"""
+import asyncio
+import logging
+import random
+
+import _local
+from aiohttp import web
+
+import scraper
+from config import Config
+from scraper import Chapter, NovelScraper
+
+SLOW     = 0.04
+CHAPTERS = 400
+FLIGHT   = 4
+BODY     = ("<html><body><h1>Chapter {n}</h1><div id='chapter-content'><p>"
+            + "word " * 300 + "</p></div></body></html>")
+
+
+async def main():
+    dead: set[int] = set()
+
+    async def primary(req):
+        n = int(req.match_info["tail"].rsplit("/", 1)[-1])
+        if n in dead:
+            return web.Response(status=503)
+        await asyncio.sleep(3.0 if random.random() < SLOW else random.uniform(0.03, 0.08))
+        return web.Response(text=BODY.format(n=n), content_type="text/html")
+
+    async def mirror(req):
+        await asyncio.sleep(random.uniform(0.05, 0.1))
+        return web.Response(text=BODY.format(n=req.match_info["tail"]), content_type="text/html")
+
+    site, site_port = await _local.serve(primary)
+    mir, mirror_port = await _local.serve(mirror, "127.0.0.2")
+
+    async def run(label, percent, use_mirror, dead_share=0.0):
+        Config.HEDGE_PERCENT = percent
+        scraper._host_times.clear()
+        scraper._hedge_window[:] = [0, 0]
+        for k in scraper._hedge_stats:
+            scraper._hedge_stats[k] = 0
+        dead.clear()
+        dead.update(random.sample(range(1000, 1000 + CHAPTERS), int(CHAPTERS * dead_share)))
+        alt = (lambda ch: f"http://127.0.0.2:{mirror_port}/c/{ch.index}") if use_mirror else None
+
+        def chapter(n):
+            return Chapter(index=n, title=f"Chapter {n}", url=f"http://127.0.0.1:{site_port}/c/{n}")
+
+        lat, empty = [], 0
+        async with NovelScraper(alternates=alt) as s:
+            await asyncio.gather(*(s.fetch_chapter(chapter(n)) for n in range(40)))
+            flight = asyncio.Semaphore(FLIGHT)
+
+            async def one(n):
+                nonlocal empty
+                async with flight:
+                    t = asyncio.get_running_loop().time()
+                    ch = await s.fetch_chapter(chapter(n))
+                    lat.append(asyncio.get_running_loop().time() - t)
+                    empty += not ch.has_content
+            await asyncio.gather(*(one(n) for n in range(1000, 1000 + CHAPTERS)))
+
+        st    = scraper.hedge_stats()
+        extra = st["hedged"] + st["failover"]
+        print(f"{label:30s} p50 {_local.quantile(lat, .5) * 1000:5.0f} ms  "
+              f"p95 {_local.quantile(lat, .95) * 1000:5.0f} ms  p99 {_local.quantile(lat, .99) * 1000:5.0f} ms  "
+              f"empty {empty:3d}  extra requests {extra:3d} ({extra * 100 / st['chapters']:.1f}%)")
+
+    await run("no hedging", 0, False)
+    await run("hedge 5%, retry same URL", 5, False)
+    await run("hedge 10%, retry same URL", 10, False)
+    await run("hedge 10%, mirror", 10, True)
+    print("-- 5% of chapters answer 503:")
+    await run("no hedging, no mirror", 0, False, dead_share=0.05)
+    await run("hedge 10% + mirror failover", 10, True, dead_share=0.05)
+
+    await site.cleanup()
+    await mir.cleanup()
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    random.seed(1)
+    asyncio.run(main())
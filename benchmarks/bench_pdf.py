@@ -0,0 +1,96 @@
+"""PDF export: current exporter vs the old multi_cell one.
+
+Exports a CHAPTERS-chapter fixture novel (Latin-1 prose, with one CJK
+sentence every tenth chapter) three ways and reports time, pages, pages/s and
+file size:
+
+  old multi_cell    the pre-TTF exporter: core Helvetica, multi_cell per
+                    paragraph, a new page per chapter (paragraphs it could
+                    not encode were dropped)
+  new (DejaVu)      export_pdf with the bundled Unicode font
+  new (Helvetica)   export_pdf with no TTF available
+
+    python benchmarks/bench_pdf.py
+"""
+import os
+import random
+import re
+import tempfile
+import time
+
+import _local  # noqa: F401
+
+from scraper import Chapter, Novel
+from utils import exporters
+
+CHAPTERS = 200
+NOVEL    = Novel(title="Benchmark Novel", url="https://bench.local/novel", author="Bench")
+
+
+def chapters() -> list[Chapter]:
+    rng   = random.Random(5)
+    words = ("the caravan crossed dunes before sun rose and her blade caught light "
+             "quiet he said nothing moved café naïve").split()
+    out = []
+    for i in range(CHAPTERS):
+        paras = [" ".join(rng.choices(words, k=rng.randint(40, 120))).capitalize() + "."
+                 for _ in range(30)]
+        if i % 10 == 0:
+            paras[3] += " 龙王 looked back."          # outside Latin-1
+        out.append(Chapter(index=i, title=f"The Road North {i + 1}", url=f"https://bench.local/{i}",
+                           content="\n\n".join(paras)))
+    return out
+
+
+def export_old(novel: Novel, chapters) -> str:
+    """The exporter before the Unicode/line-breaker rewrite, kept for comparison."""
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Helvetica", "B", 20)
+    pdf.cell(0, 10, novel.title, new_x="LMARGIN", new_y="NEXT", align="C")
+    for ch in chapters:
+        pdf.add_page()
+        pdf.set_font("Helvetica", "B", 14)
+        pdf.cell(0, 10, f"Chapter {ch.index + 1}: {ch.title}", new_x="LMARGIN", new_y="NEXT")
+        pdf.ln(4)
+        pdf.set_font("Helvetica", size=11)
+        for para in ch.content.split("\n\n"):
+            try:
+                pdf.multi_cell(0, 7, para.strip())
+                pdf.ln(3)
+            except Exception:
+                pass
+    path = os.path.join(tempfile.gettempdir(), "bench_old.pdf")
+    pdf.output(path)
+    return path
+
+
+def _pages(path: str) -> int:
+    with open(path, "rb") as f:
+        return len(re.findall(rb"/Type\s*/Page\b", f.read()))
+
+
+def run(label: str, build):
+    started = time.perf_counter()
+    path = build()
+    elapsed = time.perf_counter() - started
+    pages, size = _pages(path), os.path.getsize(path)
+    os.remove(path)
+    print(f"{label:16s} {elapsed:6.2f} s  {pages:5d} pages  {pages / elapsed:6.0f} pages/s  "
+          f"{size / 1024:6.0f} KB")
+
+
+def main():
+    chs = chapters()
+    print(f"{CHAPTERS} chapters")
+    run("old multi_cell", lambda: export_old(NOVEL, chs))
+    run("new (DejaVu)", lambda: exporters.export_pdf(NOVEL, chs))
+    exporters._FONT_CANDIDATES, exporters.Config.PDF_FONT = (), ""
+    run("new (Helvetica)", lambda: exporters.export_pdf(NOVEL, chs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Throughput against a per-client rate-limited site, by proxy pool size.
+
+The local site allows RATE requests/s per client (told apart by the X-Via
+header local stand-in proxies add) and answers 429 above that. Each run
+fetches PAGES pages, retrying a failed one up to 20 times.
+
+    python benchmarks/bench_proxies.py
+"""
+import asyncio
+import logging
+import time
+
+import _local  # noqa: F401  (path + env)
+import aiohttp
+from aiohttp import web
+
+import scraper
+from utils import proxies
+from utils.scheduler import FetchScheduler
+
+RATE  = 5.0
+PAGES = 60
+BODY  = "<html><body><div id='chapter-content'>" + "x" * 2000 + "</div></body></html>"
+
+
+async def main():
+    last: dict[str, float] = {}
+
+    async def site(req):
+        who, now = req.headers.get("X-Via", "direct"), time.monotonic()
+        if now - last.get(who, 0.0) < 1 / RATE:
+            return web.Response(status=429)
+        last[who] = now
+        await asyncio.sleep(0.02)
+        return web.Response(text=BODY, content_type="text/html")
+
+    def stand_in(name):
+        async def handler(req):
+            async with aiohttp.ClientSession() as s:
+                async with s.get(str(req.url), headers={"X-Via": name}) as r:
+                    return web.Response(status=r.status, body=await r.read(), content_type="text/html")
+        return handler
+
+    runners = []
+    runner, site_port = await _local.serve(site)
+    runners.append(runner)
+    proxy_urls = []
+    for i in range(4):
+        runner, port = await _local.serve(stand_in(f"p{i}"))
+        runners.append(runner)
+        proxy_urls.append(f"http://127.0.0.1:{port}")
+
+    for n in (0, 1, 2, 4):
+        last.clear()
+        proxies.pool = (
+            proxies.ProxyPool(proxy_urls[:n], direct=True, host_rps=RATE) if n else None
+        )
+        scraper.scheduler = FetchScheduler(4 * proxies.route_count(), 1)
+        ok = 0
+
+        async def one(i):
+            nonlocal ok
+            for _ in range(20):
+                if await scraper._fetch(session, f"http://127.0.0.1:{site_port}/c/{i}"):
+                    ok += 1
+                    return
+                await asyncio.sleep(0.2)
+
+        async with aiohttp.ClientSession() as session:
+            started = time.monotonic()
+            await asyncio.gather(*(one(i) for i in range(PAGES)))
+            secs = time.monotonic() - started
+        label = f"{n} proxies + direct" if n else "direct only, no pool"
+        print(f"{label:22s} {ok:3d}/{PAGES} pages in {secs:5.1f}s = {ok / secs:5.1f} pages/s")
+
+    for runner in runners:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""Page reading: bytes read and peak memory on large pages.
+
+A local server sends two fixture pages in 16 KB writes:
+
+  chapter   ~3 MB: the chapter near the top, then a huge comment section
+  huge      ~20 MB of markup (over MAX_PAGE_BYTES)
+
+Each is read three ways: the old `await r.text()`, `_read_html` (streamed,
+capped at MAX_PAGE_BYTES) and `_read_html` with the `_ContainerEnd` stop
+chapter fetches use once a host's content selector is known.
+
+    python benchmarks/bench_read.py
+"""
+import asyncio
+import logging
+import time
+import tracemalloc
+
+import _local
+import aiohttp
+from aiohttp import web
+
+from scraper import MAX_PAGE_BYTES, _ContainerEnd, _read_html
+
+PARA    = "<p>" + "The caravan crossed the dunes before the sun rose. " * 12 + "</p>"
+COMMENT = "<div class='comment'><b>reader</b>" + "Thanks for the chapter! " * 20 + "</div>"
+PAGES = {
+    "chapter": ("<html><body><div id='chapter-content'>" + PARA * 40 + "</div>"
+                + COMMENT * 5600 + "</body></html>").encode(),
+    "huge":    b"<html><body>" + (b"<div>" + b"x" * 1000 + b"</div>") * 20_000,
+}
+
+
+async def main():
+    async def handler(req):
+        body = PAGES[req.path.strip("/")]
+        resp = web.StreamResponse(headers={"Content-Type": "text/html; charset=utf-8"})
+        await resp.prepare(req)
+        try:
+            for i in range(0, len(body), 16 * 1024):
+                await resp.write(body[i:i + 16 * 1024])
+            await resp.write_eof()
+        except (ConnectionResetError, RuntimeError):
+            pass                          # the reader stopped early and hung up
+        return resp
+
+    runner, port = await _local.serve(handler)
+    ways = {
+        "r.text()":        lambda r: r.text(),
+        "_read_html":      lambda r: _read_html(r),
+        "_read_html+stop": lambda r: _read_html(r, _ContainerEnd("#chapter-content")),
+    }
+    print(f"MAX_PAGE_BYTES = {MAX_PAGE_BYTES / 2**20:.0f} MB")
+    async with aiohttp.ClientSession() as s:
+        for page, body in PAGES.items():
+            print(f"-- {page} page, {len(body) / 2**20:.1f} MB")
+            for label, read in ways.items():
+                tracemalloc.start()
+                started = time.perf_counter()
+                async with s.get(f"http://127.0.0.1:{port}/{page}") as r:
+                    html = await read(r)
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"   {label:16s} read {len(html.encode()) / 1024:8.0f} KB  "
+                      f"peak {peak / 2**20:6.1f} MB  {elapsed * 1000:6.0f} ms")
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)     # the capped read logs its truncation
+    asyncio.run(main())
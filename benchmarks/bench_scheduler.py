@@ -0,0 +1,82 @@
+"""Page-turn latency while 20 bulk downloads hammer the same site.
+
+A local site answers every page in 40-60 ms. DOWNLOADS bulk downloads fetch
+chapters back to back while one reader turns TURNS pages, one every
+READ_GAP seconds. The reader runs three ways:
+
+  fifo         the reader's fetches queue as BULK from the same user as the
+               downloads, i.e. plain first-come-first-served
+  round-robin  BULK, but as its own user (per-user fairness only)
+  scheduler    READ priority with the reserved slot (what the bot does)
+
+    python benchmarks/bench_scheduler.py
+"""
+import asyncio
+import logging
+import random
+import time
+
+import _local
+from aiohttp import web
+
+import scraper
+from config import Config
+from scraper import Chapter, NovelScraper
+from utils.scheduler import BULK, READ, FetchScheduler
+
+DOWNLOADS = 20
+TURNS     = 60
+READ_GAP  = 0.1
+BODY      = ("<html><body><div id='chapter-content'><p>" + "word " * 300
+             + "</p></div></body></html>")
+
+
+async def main():
+    async def site(req):
+        await asyncio.sleep(random.uniform(0.04, 0.06))
+        return web.Response(text=BODY, content_type="text/html")
+
+    runner, port = await _local.serve(site)
+    seq = iter(range(10**9))
+
+    def chapter(user):
+        return Chapter(index=0, title="", url=f"http://127.0.0.1:{port}/{user}/{next(seq)}")
+
+    async def download(user):
+        async with NovelScraper(priority=BULK, user=user) as s:
+            while True:
+                await s.fetch_chapter(chapter(user))
+
+    async def run(label, priority, user):
+        scraper.scheduler = FetchScheduler(Config.HOST_CONCURRENCY, Config.HOST_RESERVED)
+        bulk = [asyncio.create_task(download(u)) for u in range(DOWNLOADS)]
+        await asyncio.sleep(0.5)
+        turns, since = [], time.monotonic()
+        before = scraper.scheduler.stats()["bulk"]["requests"]
+        async with NovelScraper(priority=priority, user=user) as s:
+            for _ in range(TURNS):
+                started = time.monotonic()
+                await s.fetch_chapter(chapter(user))
+                turns.append(time.monotonic() - started)
+                await asyncio.sleep(READ_GAP)
+        bulk_rate = (scraper.scheduler.stats()["bulk"]["requests"] - before) / (time.monotonic() - since)
+        for t in bulk:
+            t.cancel()
+        await asyncio.gather(*bulk, return_exceptions=True)
+        print(f"{label:12s} page turn p50 {_local.quantile(turns, .5) * 1000:5.0f} ms  "
+              f"p95 {_local.quantile(turns, .95) * 1000:5.0f} ms  max {max(turns) * 1000:5.0f} ms  "
+              f"bulk {bulk_rate:4.1f} pages/s")
+
+    print(f"{DOWNLOADS} bulk downloads, {Config.HOST_CONCURRENCY} slots per host "
+          f"({Config.HOST_RESERVED} reserved for reads)")
+    await run("fifo", BULK, 0)
+    await run("round-robin", BULK, 999)
+    await run("scheduler", READ, 999)
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    Config.HEDGE_PERCENT = 0
+    random.seed(1)
+    asyncio.run(main())
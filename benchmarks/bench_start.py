@@ -0,0 +1,117 @@
+"""/start latency under a burst of BURST concurrent starts.
+
+Drives handlers.start.start_handler with fake Message objects whose reply_*
+calls take a Telegram-like 30-80 ms; the user write sleeps 5 ms like a
+MongoDB round trip, and the wallpaper API is a local server answering in
+~300 ms. Compared with the pre-pool handler, which wrote the user, held the
+sticker for 2 s and fetched a wallpaper inline before answering.
+
+    python benchmarks/bench_start.py
+"""
+import asyncio
+import itertools
+import logging
+import random
+import time
+
+import _local
+from aiohttp import web
+
+import database as db
+from config import Config
+from handlers import start
+from utils import helpers
+
+BURST = 1000
+
+
+class FakeUser:
+    def __init__(self, uid: int):
+        self.id, self.first_name, self.mention = uid, f"user{uid}", f"[user{uid}](tg://user?id={uid})"
+
+
+class FakeMessage:
+    """What start_handler touches: from_user, reply_* and the sent message."""
+    _ids = itertools.count()
+
+    def __init__(self, uid: int, log: list):
+        self.from_user, self._log = FakeUser(uid), log
+        self.photo = None
+
+    async def _telegram(self, kind: str, payload=None) -> "FakeMessage":
+        await asyncio.sleep(random.uniform(0.03, 0.08))
+        self._log.append((kind, payload))
+        sent = FakeMessage(self.from_user.id, self._log)
+        if kind == "photo":
+            sent.photo = type("Photo", (), {"file_id": f"file{next(self._ids)}"})()
+        return sent
+
+    async def reply_sticker(self, sticker):
+        return await self._telegram("sticker")
+
+    async def reply_photo(self, photo, caption=""):
+        return await self._telegram("photo", photo)
+
+    async def reply_text(self, text, **kw):
+        return await self._telegram("text")
+
+    async def delete(self):
+        await asyncio.sleep(0.03)
+
+
+async def old_start_handler(client, message):
+    """The handler before the wallpaper pool, kept for comparison."""
+    user = message.from_user
+    await db.add_user(user.id, user.first_name)
+    sticker_msg = await message.reply_sticker(Config.START_STICKER)
+    await asyncio.sleep(2)
+    await sticker_msg.delete()
+    wp = await helpers.fetch_random_wallpaper()
+    await message.reply_photo(photo=wp or Config.WELCOME_IMAGE, caption="welcome")
+
+
+async def main():
+    async def wallpaper_api(req):
+        await asyncio.sleep(0.3)
+        return web.json_response({"url": f"https://img.test/{random.random()}.jpg"})
+
+    runner, port = await _local.serve(wallpaper_api)
+    Config.WALLPAPER_API = f"http://127.0.0.1:{port}/random"
+
+    async def add_user(uid, name):
+        await asyncio.sleep(0.005)
+    db.add_user = add_user
+
+    async def burst(label: str, handler):
+        log, latencies = [], []
+
+        async def one(uid):
+            started = time.monotonic()
+            await handler(None, FakeMessage(uid, log))
+            latencies.append(time.monotonic() - started)
+
+        started = time.monotonic()
+        await asyncio.gather(*(one(uid) for uid in range(BURST)))
+        wall = time.monotonic() - started
+        photos  = [p for kind, p in log if kind == "photo"]
+        fresh   = sum(p.startswith("https://img.test/") for p in photos)
+        reused  = sum(p.startswith("file") for p in photos)
+        print(f"{label:14s} p50 {_local.quantile(latencies, .5) * 1000:6.0f} ms  "
+              f"p95 {_local.quantile(latencies, .95) * 1000:6.0f} ms  "
+              f"p99 {_local.quantile(latencies, .99) * 1000:6.0f} ms  burst done in {wall:5.2f} s  "
+              f"wallpapers: {fresh} fresh, {reused} reused, {len(photos) - fresh - reused} fallback")
+
+    print(f"{BURST} concurrent /start")
+    await burst("old handler", old_start_handler)
+
+    helpers.wallpapers.start()                    # as bot.main() does
+    await asyncio.sleep(0.3 * helpers.wallpapers.size + 0.5)   # pool filled before the burst
+    await burst("pool handler", start.start_handler)
+    await asyncio.sleep(3)                        # let the sticker clean-ups finish
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    random.seed(2)
+    asyncio.run(main())
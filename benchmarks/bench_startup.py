@@ -0,0 +1,62 @@
+"""Import time of the bot at startup (bot, every handler, worker).
+
+Runs RUNS fresh interpreters with `python -X importtime`, prints the median
+total and the modules with the largest cumulative import time, and lists any
+heavy library (parsers, PDF/EPUB, images) that got imported on the way.
+
+    python benchmarks/bench_startup.py
+"""
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+import _local  # noqa: F401
+
+RUNS  = 5
+TOP   = 15
+HEAVY = ("bs4", "lxml", "fpdf", "PIL", "ebooklib")
+ROOT  = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROBE = ("import importlib, pkgutil, bot, handlers\n"
+         "for m in pkgutil.iter_modules(handlers.__path__):\n"
+         "    importlib.import_module(f'handlers.{m.name}')\n"
+         "import worker\n")
+
+
+def run_once() -> dict[str, int]:
+    """module → cumulative import time in µs, from -X importtime."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE], cwd=ROOT,
+                         env=dict(os.environ), capture_output=True, text=True, check=True)
+    times = {}
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    totals, per_module = [], defaultdict(list)
+    for _ in range(RUNS):
+        times = run_once()
+        top_level = [us for name, us in times.items() if name in ("bot", "handlers", "worker")
+                     or name.startswith("handlers.")]
+        totals.append(sum(top_level) / 1e6)
+        for name, us in times.items():
+            per_module[name].append(us)
+
+    print(f"startup imports: median {statistics.median(totals):.3f} s over {RUNS} runs "
+          f"(min {min(totals):.3f}, max {max(totals):.3f})")
+    print(f"\n{'module':<40} cumulative ms")
+    ranked = sorted(per_module.items(), key=lambda kv: -statistics.median(kv[1]))
+    for name, samples in ranked[:TOP]:
+        print(f"{name:<40} {statistics.median(samples) / 1000:10.1f}")
+
+    heavy = sorted({name.split(".")[0] for name in per_module} & set(HEAVY))
+    print(f"\nheavy modules imported at startup: {', '.join(heavy) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
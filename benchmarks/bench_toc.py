@@ -0,0 +1,54 @@
+"""TOC memory: ChapterList vs a plain list of Chapter objects.
+
+Builds a novel's table of contents at 1k / 10k / 50k chapters both ways and
+reports the memory each holds (tracemalloc, strings included) and the size
+of the stored to_blob() form. The baseline is the pre-ChapterList layout: a
+list of regular (non-slotted) dataclass instances, one per chapter.
+
+    python benchmarks/bench_toc.py
+"""
+import gc
+import tracemalloc
+from dataclasses import dataclass
+
+import _local  # noqa: F401
+
+from scraper import Chapter, ChapterList
+
+SIZES = (1_000, 10_000, 50_000)
+BASE  = "https://www.example-novels.com/novel/the-legendary-mechanic-of-the-endless-sky/"
+
+
+@dataclass
+class PlainChapter:
+    index: int
+    title: str
+    url:   str
+    blob:  bytes = b""
+
+
+def _toc(n: int):
+    for i in range(n):
+        yield i, f"Chapter {i + 1}: The Road to the Northern Gate", f"{BASE}chapter-{i + 1}"
+
+
+def measure(build) -> tuple[int, object]:
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, obj
+
+
+def main():
+    print(f"{'chapters':>9} {'list[Chapter]':>14} {'ChapterList':>12} {'saving':>7} {'to_blob':>9}")
+    for n in SIZES:
+        plain, _ = measure(lambda: [PlainChapter(i, t, u) for i, t, u in _toc(n)])
+        compact, toc = measure(lambda: ChapterList(Chapter(i, t, u) for i, t, u in _toc(n)))
+        print(f"{n:>9} {plain / 1024:>11.0f} KiB {compact / 1024:>8.0f} KiB "
+              f"{plain / compact:>6.1f}x {len(toc.to_blob()) / 1024:>6.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,12 +8,16 @@ Setup:
   2. pip install -r requirements.txt
   3. python bot.py
 """
+import time
+_BOOT_TS = time.perf_counter()
+
 import asyncio
 import logging
 import os
 from aiohttp import web
 
 from pyrogram import Client
+import database as db
 from config import Config
 
 # ── Logging ──────────────────────────────────────────────────────────────────
@@ -24,6 +28,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# ── Event loop ───────────────────────────────────────────────────────────────
+# Installed before the Client is built so Pyrogram picks up the uvloop loop.
+if Config.USE_UVLOOP:
+    try:
+        import uvloop
+        uvloop.install()
+        logger.info("⚡ uvloop event loop installed")
+    except ImportError:
+        logger.info("uvloop not available, using the default asyncio loop")
+
 # ── Pyrogram Client ──────────────────────────────────────────────────────────
 plugins = {"root": "handlers"}
 
@@ -53,12 +67,33 @@ async def start_web_server():
 
 
 # ── Main ──────────────────────────────────────────────────────────────────────
+_background: set[asyncio.Task] = set()    # strong refs to long-running tasks
+
+
 async def main():
     logger.info("🚀 Starting Zero Novel Scraper Bot…")
     await start_web_server()
+    try:
+        await db.ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Could not create MongoDB indexes: {e}")
     async with app:
+        from utils.helpers import wallpapers
+        wallpapers.start()
+        if Config.USE_WORKERS:
+            from utils.jobs import dispatch_results
+            task = asyncio.create_task(dispatch_results(app))
+            _background.add(task)
+            task.add_done_callback(_background.discard)
+            logger.info("🛠 Downloads are queued for worker.py")
+        if Config.WATCH_ENABLED:
+            from utils import watcher
+            watcher.start(app)
         me = await app.get_me()
-        logger.info(f"✅ Bot started as @{me.username} (ID: {me.id})")
+        logger.info(
+            f"✅ Bot started as @{me.username} (ID: {me.id}) "
+            f"in {time.perf_counter() - _BOOT_TS:.2f}s"
+        )
         await asyncio.Event().wait()   # run forever
 
 
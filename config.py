@@ -16,6 +16,11 @@ class Config:
         {"id": "@mvxyoffcail",    "link": "https://t.me/mvxyoffcail",    "name": "MvxyOfficial"},
     ]
 
+    FORCE_SUB_TTL        = 6 * 3600   # seconds a confirmed membership is trusted
+    FORCE_SUB_NEG_TTL    = 60         # seconds a "not joined" result is trusted
+    FORCE_SUB_CACHE_SIZE = 100_000    # (user, channel) entries kept; least recently used go first
+    FORCE_SUB_SWEEP      = 600        # seconds between sweeps of expired entries
+
     # ─── Owner ────────────────────────────────────────────────────
     OWNER_ID      = int(os.environ.get("OWNER_ID", 0))
     OWNER_USERNAME = "Venuboyy"
@@ -29,6 +34,67 @@ class Config:
     # ─── Web server ───────────────────────────────────────────────
     PORT = int(os.environ.get("PORT", 8080))
 
+    # ─── Startup ──────────────────────────────────────────────────
+    USE_UVLOOP = os.environ.get("USE_UVLOOP", "1") != "0"
+
     # ─── Limits ───────────────────────────────────────────────────
-    MAX_CHAPTERS_PER_DL = 500
+    MAX_CHAPTERS_PER_DL = int(os.environ.get("MAX_CHAPTERS_PER_DL", 5000))   # per request
+    VOLUME_SIZE         = int(os.environ.get("VOLUME_SIZE", 100))            # chapters per file
     CHAPTER_DELAY       = 0.3   # seconds between requests
+    DOWNLOAD_RETRIES    = 2     # end-of-job retry rounds for failed chapters
+
+    # ─── Fetch scheduler ──────────────────────────────────────────
+    HOST_CONCURRENCY    = int(os.environ.get("HOST_CONCURRENCY", 4))   # fetches in flight per site
+    HOST_RESERVED       = 1     # of those, slots only interactive reads may use
+
+    # ─── Proxy pool (optional) ────────────────────────────────────
+    PROXIES         = [p.strip() for p in os.environ.get("PROXIES", "").split(",") if p.strip()]
+    PROXY_DIRECT    = os.environ.get("PROXY_DIRECT", "1") != "0"   # also use our own address
+    PROXY_HOST_RPS  = float(os.environ.get("PROXY_HOST_RPS", 2.0))  # requests/s per (route, site)
+    PROXY_MAX_FAILS = 5       # consecutive failures before a route is ejected
+    PROXY_COOLDOWN  = 300     # seconds an ejected route sits out
+
+    # ─── Hedged chapter fetches ───────────────────────────────────
+    HEDGE_PERCENT  = float(os.environ.get("HEDGE_PERCENT", 5))   # max extra requests, % of chapter fetches
+    MIRRORS        = os.environ.get("MIRRORS", "1") != "0"       # look for the novel on other sites
+    MIRROR_MAX     = 2        # mirror sites kept per novel
+    MIRROR_RECHECK = 7 * 86400   # seconds before a novel's mirror search is redone
+
+    # ─── Search ───────────────────────────────────────────────────
+    SEARCH_MIN_SCORE    = 0.35   # local hits below this are dropped
+    SEARCH_STRONG_SCORE = 0.6    # local hits at/above this count as good matches
+    SEARCH_LOCAL_ENOUGH = 1      # strong local hits needed to skip remote search
+
+    # ─── Workers ──────────────────────────────────────────────────
+    USE_WORKERS         = os.environ.get("USE_WORKERS", "0") == "1"   # queue downloads for worker.py
+    WORKER_CONCURRENCY  = int(os.environ.get("WORKER_CONCURRENCY", 2))
+    JOB_LEASE           = 60     # seconds a claimed job stays owned without a heartbeat
+    JOB_POLL            = 2      # seconds between queue / outbox polls
+    JOB_MAX_ATTEMPTS    = 3      # claims before an expired job is failed
+    OUTBOX_MAX_ATTEMPTS = 5      # upload tries before a worker result is dropped
+    JOB_RETENTION       = 86400  # seconds a finished, reported job is kept before deletion
+
+    # ─── New-chapter watcher ──────────────────────────────────────
+    WATCH_ENABLED          = os.environ.get("WATCH_ENABLED", "1") != "0"
+    WATCH_CONCURRENCY      = int(os.environ.get("WATCH_CONCURRENCY", 20))   # TOC checks in flight
+    WATCH_PER_HOST         = 2        # concurrent checks against one site
+    WATCH_HOST_DELAY       = 1.0      # seconds between checks on one connection to a site
+    WATCH_MIN_INTERVAL     = 15 * 60
+    WATCH_DEFAULT_INTERVAL = 3600     # until a novel's update rhythm is known
+    WATCH_MAX_INTERVAL     = 2 * 86400
+    WATCH_JITTER           = 0.1      # ± fraction added to every interval
+
+    # ─── Exports ──────────────────────────────────────────────────
+    PDF_FONT = os.environ.get("PDF_FONT", "")   # Unicode .ttf for PDFs (see README)
+
+    # ─── Diagnostics ──────────────────────────────────────────────
+    SLOW_REQUEST_MS     = int(os.environ.get("SLOW_REQUEST_MS", 3000))   # log traces slower than this
+    PROFILE_MAX_SECONDS = 300
+
+    # ─── Caches ───────────────────────────────────────────────────
+    RENDER_CACHE_SIZE   = int(os.environ.get("RENDER_CACHE_SIZE", 2000))   # rendered pages
+    COVER_CACHE_SIZE    = int(os.environ.get("COVER_CACHE_SIZE", 256))     # processed covers
+    COVER_MAX_SIDE      = 800   # px, covers are downsized to fit this box
+    TOC_TTL             = int(os.environ.get("TOC_TTL", 6 * 3600))   # seconds before a stored TOC is refreshed
+    CHAPTER_STORE_TTL   = int(os.environ.get("CHAPTER_STORE_TTL", 7 * 86400))   # seconds a stored chapter body is kept
+    CHECKPOINT_TTL      = int(os.environ.get("CHECKPOINT_TTL", 7 * 86400))      # seconds an idle download checkpoint is kept
@@ -1,13 +1,46 @@
 import motor.motor_asyncio
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from gridfs.errors import NoFile
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import OperationFailure
 from config import Config
 
 client = motor.motor_asyncio.AsyncIOMotorClient(Config.MONGODB_URI)
 db     = client["NovelScraper"]
 
-users_col    = db["users"]
-stats_col    = db["stats"]
-novels_col   = db["novels"]
+users_col     = db["users"]
+stats_col     = db["stats"]
+novels_col    = db["novels"]
+chapters_col  = db["chapters"]      # chapter url → compressed body
+downloads_col = db["downloads"]     # per (novel url, format) download checkpoints
+jobs_col      = db["jobs"]          # queued work for worker.py
+outbox_col    = db["outbox"]        # worker results waiting for the bot to upload
+subs_col      = db["subscriptions"] # novel url → followers + watcher state
+exports_fs    = motor.motor_asyncio.AsyncIOMotorGridFSBucket(db, bucket_name="exports")
+
+# ─── Indexes ──────────────────────────────────────────────────────────────────
+async def ensure_indexes():
+    """Create the indexes the polling queries rely on. Idempotent; run at startup."""
+    # claim_job / fail_expired_jobs / iter_active_jobs run every JOB_POLL
+    await jobs_col.create_index([("status", ASCENDING), ("created", ASCENDING)])
+    await jobs_col.create_index([("status", ASCENDING), ("lease_until", ASCENDING)])
+    await jobs_col.create_index([("status", ASCENDING), ("notified", ASCENDING)])
+    await _ttl_index(jobs_col, "finished", Config.JOB_RETENTION,
+                     partialFilterExpression={"notified": True})
+    await outbox_col.create_index("created")
+    # resumable-download state; an expired chapter is simply fetched again
+    await _ttl_index(chapters_col, "saved", Config.CHAPTER_STORE_TTL)
+    await _ttl_index(downloads_col, "updated", Config.CHECKPOINT_TTL)
+
+async def _ttl_index(col, field: str, seconds: int, **kwargs):
+    """TTL index on `field`; an existing one gets the new expiry via collMod."""
+    try:
+        await col.create_index(field, expireAfterSeconds=int(seconds), **kwargs)
+    except OperationFailure as e:
+        if e.code != 85:              # IndexOptionsConflict: same key, old expiry
+            raise
+        await db.command("collMod", col.name,
+                         index={"keyPattern": {field: 1}, "expireAfterSeconds": int(seconds)})
 
 # ─── Default user document ────────────────────────────────────────────────────
 def _default_user(user_id: int, first_name: str = "") -> dict:
@@ -103,3 +136,232 @@ async def get_progress(user_id: int) -> tuple[str | None, int]:
     if not user:
         return None, 0
     return user.get("last_novel_url"), user.get("last_chapter", 0)
+
+# ─── Novels ───────────────────────────────────────────────────────────────────
+async def save_novel_meta(novel_url: str, meta: dict):
+    meta = dict(meta, scraped=datetime.utcnow())
+    await novels_col.update_one({"_id": novel_url}, {"$set": meta}, upsert=True)
+
+def iter_novel_meta():
+    return novels_col.find(
+        {"title": {"$exists": True}},
+        {"title": 1, "author": 1, "description": 1, "cover_url": 1},
+    )
+
+async def save_novel_toc(novel_url: str, toc: bytes, count: int, meta: dict | None = None):
+    """Store a novel's compressed TOC, plus any metadata fields given."""
+    await novels_col.update_one(
+        {"_id": novel_url},
+        {"$set": dict(meta or {}, toc=toc, toc_count=count, toc_at=datetime.utcnow())},
+        upsert=True,
+    )
+
+async def get_novel_doc(novel_url: str) -> dict | None:
+    """Stored metadata + compressed TOC for a novel, if we have its TOC."""
+    return await novels_col.find_one({"_id": novel_url, "toc": {"$exists": True}})
+
+async def get_novel_mirrors(novel_url: str) -> dict | None:
+    """`mirrors` (other sites' URLs for the novel) and `mirrors_at`, if searched."""
+    return await novels_col.find_one(
+        {"_id": novel_url, "mirrors": {"$exists": True}}, {"mirrors": 1, "mirrors_at": 1}
+    )
+
+async def save_novel_mirrors(novel_url: str, mirrors: list[str]):
+    await novels_col.update_one(
+        {"_id": novel_url},
+        {"$set": {"mirrors": mirrors, "mirrors_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+async def get_cover_file_id(novel_url: str) -> str | None:
+    doc = await novels_col.find_one({"_id": novel_url}, {"cover_file_id": 1})
+    return doc.get("cover_file_id") if doc else None
+
+async def save_cover_file_id(novel_url: str, file_id: str | None):
+    await novels_col.update_one(
+        {"_id": novel_url}, {"$set": {"cover_file_id": file_id}}, upsert=True
+    )
+
+# ─── Subscriptions ────────────────────────────────────────────────────────────
+# One document per followed novel: the follower ids plus the watcher's
+# scheduling state (epoch-second floats, see utils/watcher.py).
+async def follow_novel(user_id: int, novel_url: str, title: str, chapters: int) -> dict:
+    return await subs_col.find_one_and_update(
+        {"_id": novel_url},
+        {
+            "$addToSet":    {"users": user_id},
+            "$set":         {"title": title},
+            "$setOnInsert": {"chapters": chapters, "created": datetime.utcnow()},
+        },
+        projection={"users": 0},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+
+async def unfollow_novel(user_id: int, novel_url: str) -> int:
+    """Remove a follower; returns how many followers remain."""
+    doc = await subs_col.find_one_and_update(
+        {"_id": novel_url}, {"$pull": {"users": user_id}},
+        return_document=ReturnDocument.AFTER,
+    )
+    return len(doc.get("users", [])) if doc else 0
+
+async def is_following(user_id: int, novel_url: str) -> bool:
+    return await subs_col.find_one({"_id": novel_url, "users": user_id}, {"_id": 1}) is not None
+
+async def get_followers(novel_url: str) -> list[int]:
+    doc = await subs_col.find_one({"_id": novel_url}, {"users": 1})
+    return doc.get("users", []) if doc else []
+
+def iter_watched():
+    """Followed novels with their watcher state (follower lists left out)."""
+    return subs_col.find({"users.0": {"$exists": True}}, {"users": 0})
+
+async def save_watch_state(novel_url: str, state: dict):
+    await subs_col.update_one({"_id": novel_url}, {"$set": state})
+
+# ─── Chapter store ────────────────────────────────────────────────────────────
+async def save_chapter(url: str, title: str, blob: bytes):
+    await chapters_col.update_one(
+        {"_id": url},
+        {"$set": {"title": title, "blob": blob, "saved": datetime.utcnow()}},
+        upsert=True,
+    )
+
+def iter_chapters(urls: list):
+    """Async cursor over stored chapter docs for the given urls."""
+    return chapters_col.find({"_id": {"$in": urls}})
+
+# ─── Download checkpoints ─────────────────────────────────────────────────────
+async def get_download_job(key: str) -> dict | None:
+    return await downloads_col.find_one({"_id": key})
+
+async def start_download_job(key: str, novel_url: str, fmt: str, user_id: int):
+    await downloads_col.update_one(
+        {"_id": key},
+        {
+            "$set":         {"status": "running", "user_id": user_id, "updated": datetime.utcnow()},
+            "$setOnInsert": {"novel_url": novel_url, "fmt": fmt, "done": [], "failed": [],
+                             "created": datetime.utcnow()},
+        },
+        upsert=True,
+    )
+
+async def checkpoint_chapter(key: str, index: int, ok: bool):
+    if ok:
+        update = {"$addToSet": {"done": index}, "$pull": {"failed": index}}
+    else:
+        update = {"$addToSet": {"failed": index}}
+    update["$set"] = {"updated": datetime.utcnow()}
+    await downloads_col.update_one({"_id": key}, update)
+
+async def finish_download_job(key: str, status: str):
+    await downloads_col.update_one(
+        {"_id": key}, {"$set": {"status": status, "updated": datetime.utcnow()}}
+    )
+
+# ─── Worker job queue ─────────────────────────────────────────────────────────
+async def enqueue_job(kind: str, payload: dict) -> None:
+    now = datetime.utcnow()
+    await jobs_col.insert_one({
+        "kind":        kind,
+        "payload":     payload,
+        "status":      "queued",
+        "attempts":    0,
+        "created":     now,
+        "lease_until": now,
+        "progress":    {"done": 0, "total": 0},
+    })
+
+async def claim_job(worker_id: str, lease: float, max_attempts: int) -> dict | None:
+    """Atomically claim the oldest queued job, or one whose lease expired."""
+    now = datetime.utcnow()
+    return await jobs_col.find_one_and_update(
+        {"$or": [
+            {"status": "queued"},
+            {"status": "running", "lease_until": {"$lt": now},
+             "attempts": {"$lt": max_attempts}},
+        ]},
+        {
+            "$set": {"status": "running", "worker": worker_id, "started": now,
+                     "lease_until": now + timedelta(seconds=lease)},
+            "$inc": {"attempts": 1},
+        },
+        sort=[("created", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+async def heartbeat_job(job_id, worker_id: str, lease: float) -> bool:
+    """Extend a lease; False means another worker has taken the job over."""
+    res = await jobs_col.update_one(
+        {"_id": job_id, "worker": worker_id, "status": "running"},
+        {"$set": {"lease_until": datetime.utcnow() + timedelta(seconds=lease)}},
+    )
+    return res.matched_count == 1
+
+async def update_job_progress(job_id, worker_id: str, done: int, total: int):
+    await jobs_col.update_one(
+        {"_id": job_id, "worker": worker_id},
+        {"$set": {"progress": {"done": done, "total": total}}},
+    )
+
+async def finish_job(job_id, worker_id: str, status: str, message: str = ""):
+    await jobs_col.update_one(
+        {"_id": job_id, "worker": worker_id},
+        {"$set": {"status": status, "message": message, "finished": datetime.utcnow(),
+                  "notified": False}},
+    )
+
+async def fail_expired_jobs(max_attempts: int, message: str) -> int:
+    """Fail running jobs whose lease expired after their last allowed claim."""
+    res = await jobs_col.update_many(
+        {"status": "running", "lease_until": {"$lt": datetime.utcnow()},
+         "attempts": {"$gte": max_attempts}},
+        {"$set": {"status": "failed", "message": message, "finished": datetime.utcnow(),
+                  "notified": False}},
+    )
+    return res.modified_count
+
+def iter_active_jobs():
+    """Running jobs and finished jobs the bot has not reported yet."""
+    return jobs_col.find({"$or": [
+        {"status": "running"},
+        {"status": {"$in": ["done", "failed"]}, "notified": False},
+    ]})
+
+async def mark_job_notified(job_id):
+    await jobs_col.update_one({"_id": job_id}, {"$set": {"notified": True}})
+
+# ─── Worker results ───────────────────────────────────────────────────────────
+async def push_result_file(job_id, path: str, filename: str, caption: str):
+    with open(path, "rb") as f:
+        file_id = await exports_fs.upload_from_stream(filename, f)
+    await outbox_col.insert_one({
+        "job_id":   job_id,
+        "file_id":  file_id,
+        "filename": filename,
+        "caption":  caption,
+        "created":  datetime.utcnow(),
+    })
+
+def iter_outbox():
+    return outbox_col.find({}).sort("created", 1)
+
+async def download_result_file(file_id, dest):
+    await exports_fs.download_to_stream(file_id, dest)
+
+async def result_failed(doc: dict, error: str) -> int:
+    """Count a failed upload of an outbox entry; returns its attempts so far."""
+    doc = await outbox_col.find_one_and_update(
+        {"_id": doc["_id"]},
+        {"$inc": {"attempts": 1}, "$set": {"error": error}},
+        return_document=ReturnDocument.AFTER,
+    )
+    return doc["attempts"] if doc else 0
+
+async def drop_result(doc: dict):
+    try:
+        await exports_fs.delete(doc["file_id"])
+    except NoFile:
+        pass
+    await outbox_col.delete_one({"_id": doc["_id"]})
@@ -1,12 +1,21 @@
 import asyncio
+import html
+import io
 import logging
+import time
 
 from pyrogram import Client, filters
 from pyrogram.types import Message
 
 import database as db
+import scraper
 from config import Config
 from script import script
+from utils import forcesub, proxies, watcher
+from utils.progress import ProgressReporter
+from utils.profiler import profiler
+from utils.scheduler import scheduler
+from utils.tracing import span_stats
 
 logger = logging.getLogger(__name__)
 
@@ -27,9 +36,96 @@ async def stats_handler(client: Client, message: Message):
         novels=stats["novels"],
         chapters=stats["chapters"],
     )
+    fs = forcesub.stats()
+    text += script.FORCE_SUB_STATS_TXT.format(
+        rate=fs["check_rate"], checks=fs["checks"], hit=fs["hit_ratio"] * 100,
+        api=fs["api_calls"], cached=fs["cached"],
+    )
     await message.reply_text(text)
 
 
+@Client.on_message(filters.command("perf") & owner_filter)
+async def perf_handler(client: Client, message: Message):
+    stats = scraper.extraction_stats()
+    flights = "".join(
+        script.PERF_COALESCE_TXT.format(kind=kind, leaders=st["leaders"], coalesced=st["coalesced"])
+        for kind, st in scraper.coalesce_stats().items()
+    )
+    flights += "".join(
+        script.PERF_SCHED_TXT.format(cls=cls, **st)
+        for cls, st in scheduler.stats().items() if st["requests"]
+    )
+    hedges = scraper.hedge_stats()
+    if hedges["chapters"]:
+        flights += script.PERF_HEDGE_TXT.format(**hedges)
+    flights += "".join(
+        script.PERF_SPAN_TXT.format(name=name, **st)
+        for name, st in sorted(span_stats().items())
+    )
+    if proxies.pool:
+        flights += "".join(
+            script.PERF_PROXY_TXT.format(
+                name=html.escape(r["name"]), requests=r["requests"], score=r["score"] * 100,
+                latency_ms=r["latency_ms"], state=" ⛔ ejected" if r["ejected"] else "",
+            )
+            for r in proxies.pool.stats()
+        )
+    watching = watcher.stats()
+    if watching:
+        flights += script.PERF_WATCH_TXT.format(**watching)
+    if not stats and not flights:
+        return await message.reply_text("No chapters extracted yet.")
+    rows = "".join(
+        script.PERF_ROW_TXT.format(
+            host=host or "?", pages=st["pages"], avg_ms=st["avg_ms"],
+            selector=html.escape(str(st["selector"])),
+            hits=html.escape(", ".join(f"{sel}: {n}" for sel, n in st["hits"].items())),
+        )
+        for host, st in sorted(stats.items(), key=lambda kv: -kv[1]["pages"])[:20]
+    )
+    await message.reply_text(script.PERF_TXT.format(rows=rows) + flights)
+
+
+_profile_stop = asyncio.Event()
+
+
+@Client.on_message(filters.command("profile") & owner_filter)
+async def profile_handler(client: Client, message: Message):
+    arg = message.command[1] if len(message.command) > 1 else "30"
+    if arg == "stop":
+        if not profiler.running:
+            return await message.reply_text("No profiling session is running.")
+        _profile_stop.set()
+        return
+
+    try:
+        seconds = min(max(float(arg), 1), Config.PROFILE_MAX_SECONDS)
+    except ValueError:
+        return await message.reply_text("Usage: <code>/profile [seconds|stop]</code>")
+    if not profiler.start(seconds):
+        return await message.reply_text("A profiling session is already running.")
+
+    _profile_stop.clear()
+    await message.reply_text(f"🔬 Profiling for {seconds:.0f}s… send /profile stop to end early.")
+    try:
+        await asyncio.wait_for(_profile_stop.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+    await asyncio.to_thread(profiler.stop)
+
+    rows = "\n".join(
+        f"<code>{own * 100 / max(profiler.samples, 1):5.1f}% {tot * 100 / max(profiler.samples, 1):5.1f}%</code> "
+        f"{html.escape(fn)}"
+        for fn, own, tot in profiler.top(15)
+    )
+    await message.reply_text(script.PROFILE_TXT.format(
+        seconds=profiler.elapsed, samples=profiler.samples, rows=rows,
+    ))
+    doc = io.BytesIO(profiler.folded().encode())
+    doc.name = f"profile-{time.strftime('%Y%m%d-%H%M%S')}.folded"
+    await message.reply_document(doc, caption="Open with speedscope or flamegraph.pl.")
+
+
 @Client.on_message(filters.command("broadcast") & owner_filter)
 async def broadcast_handler(client: Client, message: Message):
     if not message.reply_to_message:
@@ -39,6 +135,17 @@ async def broadcast_handler(client: Client, message: Message):
     wait      = await message.reply_text("📣 Broadcasting…")
 
     total = success = failed = 0
+    users = await db.total_users()
+    reporter = ProgressReporter.for_message(
+        wait,
+        lambda done, _: (
+            f"📣 Broadcasting… {done}/{users}\n\n"
+            f"✅ Success : {success}\n"
+            f"❌ Failed  : {failed}"
+        ),
+        interval=5.0,
+    )
+
     async for user in await db.get_all_users():
         total += 1
         try:
@@ -46,7 +153,9 @@ async def broadcast_handler(client: Client, message: Message):
             success += 1
         except Exception:
             failed += 1
+        reporter.update(total, users)
         await asyncio.sleep(0.05)
+    await reporter.close(flush=False)
 
     await wait.edit_text(
         f"📣 Broadcast Done!\n\n"
@@ -0,0 +1,67 @@
+"""Force-subscription gate: runs before every other handler (group -1)."""
+import logging
+
+from pyrogram import Client, filters
+from pyrogram.types import CallbackQuery, ChatMemberUpdated, Message
+
+from config import Config
+from script import script
+from utils import forcesub
+from utils.keyboards import force_sub_keyboard
+
+logger = logging.getLogger(__name__)
+
+
+def _needs_gate(_, __, update) -> bool:
+    user = update.from_user
+    return bool(Config.FORCE_SUB_CHANNELS and user and user.id != Config.OWNER_ID)
+
+
+gate_filter = filters.create(_needs_gate)
+
+
+@Client.on_message(filters.private & gate_filter, group=-1)
+async def force_sub_messages(client: Client, message: Message):
+    missing = await forcesub.missing_channels(client, message.from_user.id)
+    if not missing:
+        return
+    try:
+        await message.reply_photo(
+            photo=Config.FORCE_SUB_IMAGE,
+            caption=script.FORCE_SUB_TXT,
+            reply_markup=force_sub_keyboard(missing),
+        )
+    except Exception:
+        await message.reply_text(script.FORCE_SUB_TXT, reply_markup=force_sub_keyboard(missing))
+    message.stop_propagation()
+
+
+@Client.on_callback_query(gate_filter & ~filters.regex("^fsub_check$"), group=-1)
+async def force_sub_callbacks(client: Client, cb: CallbackQuery):
+    if await forcesub.missing_channels(client, cb.from_user.id):
+        await cb.answer("⚠️ Join our channels first to use this bot.", show_alert=True)
+        cb.stop_propagation()
+
+
+@Client.on_callback_query(filters.regex("^fsub_check$"))
+async def cb_force_sub_check(client: Client, cb: CallbackQuery):
+    forcesub.invalidate(cb.from_user.id)
+    missing = await forcesub.missing_channels(client, cb.from_user.id)
+    if missing:
+        return await cb.answer(
+            "❌ You still haven't joined: " + ", ".join(ch["name"] for ch in missing),
+            show_alert=True,
+        )
+    await cb.answer("✅ Thanks for joining! You can use the bot now.")
+    try:
+        await cb.message.delete()
+    except Exception:
+        pass
+
+
+@Client.on_chat_member_updated()
+async def force_sub_member_updated(client: Client, update: ChatMemberUpdated):
+    channel = forcesub.channel_for_chat(update.chat)
+    member  = update.new_chat_member or update.old_chat_member
+    if channel and member and member.user:
+        forcesub.invalidate(member.user.id, channel)
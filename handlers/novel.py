@@ -1,19 +1,27 @@
 """Handles novel URL messages and novel-related callbacks."""
+import asyncio
+import io
 import logging
-import os
 import re
 import time
 
 from pyrogram import Client, filters
-from pyrogram.types import CallbackQuery, Message
+from pyrogram.types import CallbackQuery, InlineKeyboardMarkup, Message
 
 import database as db
 from config import Config
 from scraper import NovelScraper, Novel
-from script import script
-from utils.helpers import edit_progress, split_text
-from utils.keyboards import chapter_nav_keyboard, novel_main_keyboard
-from utils.exporters import export_txt, export_pdf, export_epub
+from utils.helpers import progress_text
+from utils.keyboards import (
+    chapter_nav_keyboard, download_options_keyboard, follow_button, novel_main_keyboard,
+)
+from utils.render import cached_page, render_page
+from utils import covers, mirrors, novel_store, search_index, watcher
+from utils.downloads import EXPORTERS, DownloadError, run_download
+from utils.jobs import enqueue_download
+from utils.progress import ProgressReporter
+from utils.scheduler import PREFETCH
+from utils.tracing import span, traced
 
 logger = logging.getLogger(__name__)
 
@@ -25,10 +33,18 @@ _novel_cache: dict[int, Novel] = {}
 # Track users waiting to input a chapter number: user_id → novel_url
 _awaiting_chapter: dict[int, str] = {}
 
+# Track users waiting to input a download range: user_id → (novel_url, fmt)
+_awaiting_range: dict[int, tuple[str, str]] = {}
+
+# Background next-chapter fetches (kept referenced until done)
+_prefetching: set[asyncio.Task] = set()
+
+RANGE_RE = re.compile(r"^\s*(\d+)\s*(?:-|–|—|to|\s)\s*(\d+)\s*$", re.I)
+
 
 # ─── Any text message (not a command) ────────────────────────────────────────
 @Client.on_message(filters.private & filters.text & ~filters.command(
-    ["start", "help", "about", "search", "settings", "stats", "broadcast", "info"]
+    ["start", "help", "about", "search", "settings", "stats", "perf", "profile", "broadcast", "info"]
 ))
 async def handle_text(client: Client, message: Message):
     user_id = message.from_user.id
@@ -44,6 +60,18 @@ async def handle_text(client: Client, message: Message):
         await _send_chapter(client, message, novel_url, idx)
         return
 
+    # Check if user is expected to send a download range
+    if user_id in _awaiting_range:
+        novel_url, fmt = _awaiting_range.pop(user_id)
+        m = RANGE_RE.match(text)
+        if not m:
+            return await message.reply_text(
+                "❌ Please send a range like <code>1200-1800</code>."
+            )
+        first, last = sorted((int(m.group(1)), int(m.group(2))))
+        await _run_download(client, message, user_id, novel_url, fmt, first - 1, last)
+        return
+
     # Check if it's a URL
     url = URL_RE.search(text)
     if url:
@@ -55,12 +83,13 @@ async def handle_text(client: Client, message: Message):
 
 
 # ─── Core: scrape novel from URL ─────────────────────────────────────────────
+@traced("open")
 async def _handle_novel_url(client: Client, message: Message, url: str):
     user_id = message.from_user.id
     wait    = await message.reply_text("🔍 Analyzing novel URL, please wait…")
 
     try:
-        async with NovelScraper() as scraper:
+        async with NovelScraper(user=user_id) as scraper:
             novel = await scraper.scrape_novel(url)
     except Exception as e:
         logger.exception(e)
@@ -75,6 +104,8 @@ async def _handle_novel_url(client: Client, message: Message, url: str):
     _novel_cache[user_id] = novel
     await db.save_progress(user_id, url, 0)
     await db.increment_novels_scraped()
+    await search_index.record_novel(novel)
+    await novel_store.save(novel)
 
     caption = (
         f"<b>📚 {novel.title}</b>\n\n"
@@ -82,32 +113,56 @@ async def _handle_novel_url(client: Client, message: Message, url: str):
         + (f"<b>✍️ Author:</b> {novel.author}\n" if novel.author else "") +
         f"\n{novel.description[:300] + '…' if len(novel.description) > 300 else novel.description}"
     )
-    kb = novel_main_keyboard(url, len(novel.chapters))
+    kb = novel_main_keyboard(url, len(novel.chapters), await db.is_following(user_id, url))
 
-    try:
-        if novel.cover_url:
+    async with span("send"):
+        if await _send_cover(message, novel, caption, kb):
             await wait.delete()
-            await message.reply_photo(photo=novel.cover_url, caption=caption, reply_markup=kb)
         else:
             await wait.edit_text(caption, reply_markup=kb)
-    except Exception:
-        await wait.edit_text(caption, reply_markup=kb)
+
+
+async def _send_cover(message: Message, novel: Novel, caption: str, kb) -> bool:
+    """Send the cover photo, reusing a cached Telegram file_id when we have one."""
+    if not novel.cover_url:
+        return False
+
+    file_id = await covers.get_file_id(novel.url)
+    if file_id:
+        try:
+            await message.reply_photo(photo=file_id, caption=caption, reply_markup=kb)
+            return True
+        except Exception as e:
+            logger.warning(f"Cached cover file_id rejected: {e}")
+            await covers.forget_file_id(novel.url)
+
+    data = await covers.get_cover(novel.cover_url)
+    if not data:
+        return False
+    photo = io.BytesIO(data)
+    photo.name = "cover.jpg"
+    try:
+        sent = await message.reply_photo(photo=photo, caption=caption, reply_markup=kb)
+    except Exception as e:
+        logger.warning(f"Cover upload failed: {e}")
+        return False
+    if sent and sent.photo:
+        await covers.remember_file_id(novel.url, sent.photo.file_id)
+    return True
 
 
 # ─── Core: send a chapter ────────────────────────────────────────────────────
-async def _send_chapter(client, message_or_cb, novel_url: str, idx: int, edit: bool = False):
+@traced("read")
+async def _send_chapter(client, message_or_cb, novel_url: str, idx: int,
+                        edit: bool = False, page: int = 0):
     is_cb   = isinstance(message_or_cb, CallbackQuery)
     user_id = message_or_cb.from_user.id
 
-    novel = _novel_cache.get(user_id)
+    novel = await _get_novel(user_id, novel_url)
     if not novel:
-        async with NovelScraper() as s:
-            novel = await s.scrape_novel(novel_url)
-        if not novel:
-            txt = "❌ Could not reload novel."
-            return await (message_or_cb.answer(txt, show_alert=True) if is_cb
-                          else message_or_cb.reply_text(txt))
-        _novel_cache[user_id] = novel
+        txt = "❌ Could not reload novel."
+        return await (message_or_cb.answer(txt, show_alert=True) if is_cb
+                      else message_or_cb.reply_text(txt))
 
     total = len(novel.chapters)
     if idx < 0 or idx >= total:
@@ -116,39 +171,58 @@ async def _send_chapter(client, message_or_cb, novel_url: str, idx: int, edit: b
                       else message_or_cb.reply_text(txt))
 
     chapter = novel.chapters[idx]
-    if not chapter.content:
-        async with NovelScraper() as s:
-            chapter = await s.fetch_chapter(chapter)
-        novel.chapters[idx] = chapter
+    cached  = cached_page(chapter.url, page)
+    if cached is None:
+        if not chapter.has_content:
+            async with NovelScraper(user=user_id, alternates=mirrors.resolver(novel)) as s:
+                chapter = await s.fetch_chapter(chapter)
+            novel.chapters[idx] = chapter
+        cached = render_page(novel.title, idx, chapter, page)
+    text, pages = cached
+    page = min(page, pages - 1)
 
     await db.save_progress(user_id, novel_url, idx)
-    await db.increment_chapters_sent()
+    if page == 0:
+        await db.increment_chapters_sent()
+
+    kb = chapter_nav_keyboard(novel_url, idx, total, page, pages)
+
+    async with span("send"):
+        if is_cb:
+            try:
+                await message_or_cb.message.edit_text(text, reply_markup=kb,
+                                                      disable_web_page_preview=True)
+            except Exception:
+                await message_or_cb.message.reply_text(text, reply_markup=kb,
+                                                       disable_web_page_preview=True)
+        else:
+            await message_or_cb.reply_text(text, reply_markup=kb, disable_web_page_preview=True)
 
-    text = script.CHAPTER_TXT.format(
-        title=novel.title,
-        num=idx + 1,
-        chap_title=chapter.title,
-        content=chapter.content[:3500] if chapter.content else "_(content unavailable)_",
-    )
-    kb = chapter_nav_keyboard(novel_url, idx, total)
+    if idx + 1 < total and not novel.chapters[idx + 1].has_content:
+        task = asyncio.create_task(_prefetch(novel, idx + 1, user_id))
+        _prefetching.add(task)
+        task.add_done_callback(_prefetching.discard)
 
-    if is_cb:
-        try:
-            await message_or_cb.message.edit_text(text, reply_markup=kb,
-                                                  disable_web_page_preview=True)
-        except Exception:
-            await message_or_cb.message.reply_text(text, reply_markup=kb,
-                                                   disable_web_page_preview=True)
-    else:
-        await message_or_cb.reply_text(text, reply_markup=kb, disable_web_page_preview=True)
+
+async def _prefetch(novel: Novel, idx: int, user_id: int):
+    """Warm the next chapter while the user reads this one."""
+    try:
+        async with NovelScraper(priority=PREFETCH, user=user_id,
+                                alternates=mirrors.resolver(novel)) as s:
+            chapter = await s.fetch_chapter(novel.chapters[idx])
+        if chapter.has_content:
+            novel.chapters[idx] = chapter
+    except Exception as e:
+        logger.debug(f"Prefetch of chapter {idx} failed: {e}")
 
 
 # ─── Callbacks ───────────────────────────────────────────────────────────────
 @Client.on_callback_query(filters.regex(r"^read\|"))
 async def cb_read(client: Client, cb: CallbackQuery):
     _, url, idx_s = cb.data.split("|", 2)
+    idx_s, _, page_s = idx_s.partition("|")
     await cb.answer()
-    await _send_chapter(client, cb, url, int(idx_s))
+    await _send_chapter(client, cb, url, int(idx_s), page=int(page_s or 0))
 
 
 @Client.on_callback_query(filters.regex(r"^choose\|"))
@@ -162,52 +236,125 @@ async def cb_choose_chapter(client: Client, cb: CallbackQuery):
 @Client.on_callback_query(filters.regex(r"^dl\|"))
 async def cb_download(client: Client, cb: CallbackQuery):
     _, fmt, url = cb.data.split("|", 2)
-    user_id     = cb.from_user.id
     await cb.answer()
 
-    progress_msg = await cb.message.reply_text("📚 Fetching Chapters…")
+    novel = await _get_novel(cb.from_user.id, url)
+    if not novel:
+        return await cb.message.reply_text("❌ Failed to load novel.")
+
+    count   = min(len(novel.chapters), Config.MAX_CHAPTERS_PER_DL)
+    volumes = -(-count // Config.VOLUME_SIZE)
+    await cb.message.reply_text(
+        f"📥 <b>{fmt.upper()} download</b>\n\n"
+        f"<b>📑 Chapters:</b> {len(novel.chapters)}\n"
+        f"Files are sent in volumes of {Config.VOLUME_SIZE} chapters as soon as each is ready.",
+        reply_markup=download_options_keyboard(url, fmt, count, volumes),
+    )
+
+
+@Client.on_callback_query(filters.regex(r"^dla\|"))
+async def cb_download_all(client: Client, cb: CallbackQuery):
+    _, fmt, url = cb.data.split("|", 2)
+    await cb.answer()
+    await _run_download(client, cb.message, cb.from_user.id, url, fmt,
+                        0, Config.MAX_CHAPTERS_PER_DL)
+
 
+@Client.on_callback_query(filters.regex(r"^dlr\|"))
+async def cb_download_range(client: Client, cb: CallbackQuery):
+    _, fmt, url = cb.data.split("|", 2)
+    _awaiting_range[cb.from_user.id] = (url, fmt)
+    await cb.answer()
+    await cb.message.reply_text(
+        "🔢 Send the chapter range to download, e.g. <code>1200-1800</code>:"
+    )
+
+
+async def _get_novel(user_id: int, url: str):
     novel = _novel_cache.get(user_id)
-    if not novel:
-        async with NovelScraper() as s:
-            novel = await s.scrape_novel(url)
+    if not novel or novel.url != url:
+        novel = await novel_store.load(url, user_id)
         if not novel:
-            return await progress_msg.edit_text("❌ Failed to load novel.")
+            return None
         _novel_cache[user_id] = novel
+    return novel
 
-    chapters = novel.chapters[:Config.MAX_CHAPTERS_PER_DL]
-    start_ts = time.time()
 
-    async def progress_cb(done, total):
-        await edit_progress(progress_msg, done, total, start_ts)
+# ─── Core: download a chapter range in volumes ───────────────────────────────
+async def _run_download(client, message: Message, user_id: int, url: str, fmt: str,
+                        first: int, last: int):
+    """Download chapters [first, last), uploading each volume as it is built.
+    With USE_WORKERS the job is queued for worker.py instead."""
+    if fmt not in EXPORTERS:
+        return await message.reply_text("Unknown format.")
 
-    async with NovelScraper() as s:
-        chapters = await s.fetch_chapters_batch(
-            chapters, progress_cb=progress_cb, delay=Config.CHAPTER_DELAY
-        )
-    novel.chapters[:len(chapters)] = chapters
+    progress_msg = await message.reply_text("📚 Fetching Chapters…")
+
+    if Config.USE_WORKERS:
+        await enqueue_download(message.chat.id, progress_msg.id, user_id, url, fmt, first, last)
+        return
 
-    await progress_msg.edit_text(f"📦 Building {fmt.upper()} file…")
+    novel = await _get_novel(user_id, url)
+    if not novel:
+        return await progress_msg.edit_text("❌ Failed to load novel.")
+
+    start_ts = time.time()
+    reporter = ProgressReporter.for_message(
+        progress_msg, lambda done, total: progress_text(done, total, start_ts)
+    )
+
+    async def deliver(path, caption):
+        await message.reply_document(document=path, caption=caption)
 
     try:
-        if fmt == "txt":
-            path = export_txt(novel, chapters)
-        elif fmt == "pdf":
-            path = export_pdf(novel, chapters)
-        elif fmt == "epub":
-            path = export_epub(novel, chapters)
-        else:
-            return await progress_msg.edit_text("Unknown format.")
+        await run_download(novel, fmt, first, last, user_id, reporter.update, deliver)
+    except DownloadError as e:
+        await reporter.close(flush=False)
+        return await progress_msg.edit_text(str(e))
+    await reporter.close(flush=False)
 
+    try:
         await progress_msg.delete()
-        await cb.message.reply_document(
-            document=path,
-            caption=f"📚 <b>{novel.title}</b>\n{len(chapters)} chapters",
-        )
-        os.remove(path)
-    except Exception as e:
-        logger.exception(e)
-        await progress_msg.edit_text(f"❌ Export failed: {e}")
+    except Exception:
+        pass
+
+
+@Client.on_callback_query(filters.regex(r"^fol\|"))
+async def cb_follow(client: Client, cb: CallbackQuery):
+    url   = cb.data.split("|", 1)[1]
+    novel = await _get_novel(cb.from_user.id, url)
+    if not novel:
+        return await cb.answer("❌ Could not load novel.", show_alert=True)
+
+    doc = await db.follow_novel(cb.from_user.id, url, novel.title, len(novel.chapters))
+    watcher.watch(doc)
+    await _swap_follow_button(cb, url, True)
+    await cb.answer("🔔 You'll be notified when new chapters come out.")
+
+
+@Client.on_callback_query(filters.regex(r"^unf\|"))
+async def cb_unfollow(client: Client, cb: CallbackQuery):
+    url = cb.data.split("|", 1)[1]
+    if not await db.unfollow_novel(cb.from_user.id, url):
+        watcher.unwatch(url)
+    await _swap_follow_button(cb, url, False)
+    await cb.answer("🔕 Unfollowed.")
+
+
+async def _swap_follow_button(cb: CallbackQuery, url: str, following: bool):
+    """Flip the follow/unfollow button in place, whatever keyboard it sits in."""
+    markup = cb.message.reply_markup
+    if not markup:
+        return
+    rows = [
+        [follow_button(url, following) if (b.callback_data or "")[:4] in ("fol|", "unf|") else b
+         for b in row]
+        for row in markup.inline_keyboard
+    ]
+    try:
+        await cb.message.edit_reply_markup(InlineKeyboardMarkup(rows))
+    except Exception:
+        pass
 
 
 @Client.on_callback_query(filters.regex(r"^novel\|"))
@@ -2,12 +2,16 @@ from pyrogram import Client, filters
 from pyrogram.types import Message
 
 import database as db
+from config import Config
 from scraper import search_novels
+from utils import search_index
 from utils.keyboards import search_results_keyboard
+from utils.tracing import traced
 from script import script
 
 
 @Client.on_message(filters.command("search") & filters.private)
+@traced("search")
 async def search_handler(client: Client, message: Message):
     await db.add_user(message.from_user.id, message.from_user.first_name)
 
@@ -15,8 +19,20 @@ async def search_handler(client: Client, message: Message):
     if not query:
         return await message.reply_text("Usage: <code>/search novel name</code>")
 
-    wait    = await message.reply_text(f"🔍 Searching for: <b>{query}</b>…")
-    results = await search_novels(query)
+    wait = await message.reply_text(f"🔍 Searching for: <b>{query}</b>…")
+
+    # Local index first; only fan out to remote sites when it has little to offer
+    await search_index.index.ensure_loaded()
+    local   = search_index.index.search(query)
+    results = [r for score, r in local if score >= Config.SEARCH_MIN_SCORE]
+    strong  = [r for score, r in local if score >= Config.SEARCH_STRONG_SCORE]
+    if len(strong) < Config.SEARCH_LOCAL_ENOUGH:
+        seen = {r.url for r in results}
+        for r in await search_novels(query):
+            if r.url not in seen:
+                seen.add(r.url)
+                results.append(r)
+    results = results[:10]
 
     if not results:
         return await wait.edit_text(
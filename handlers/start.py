@@ -1,4 +1,3 @@
-import asyncio
 import logging
 
 from pyrogram import Client, filters
@@ -7,7 +6,7 @@ from pyrogram.types import Message
 import database as db
 from config import Config
 from script import script
-from utils.helpers import fetch_random_wallpaper
+from utils.helpers import run_later, wallpapers
 
 logger = logging.getLogger(__name__)
 
@@ -15,25 +14,25 @@ logger = logging.getLogger(__name__)
 @Client.on_message(filters.command("start") & filters.private)
 async def start_handler(client: Client, message: Message):
     user = message.from_user
-    await db.add_user(user.id, user.first_name)
+    run_later(0, lambda: db.add_user(user.id, user.first_name))
 
-    # Sticker (auto-delete after 2s)
+    # Sticker (auto-delete after 2s, without holding the handler)
     try:
         sticker_msg = await message.reply_sticker(Config.START_STICKER)
-        await asyncio.sleep(2)
-        await sticker_msg.delete()
+        run_later(2, sticker_msg.delete)
     except Exception as e:
         logger.warning(f"Sticker failed: {e}")
 
     welcome_text = script.START_TXT.format(user.mention)
     sent = False
 
-    # Try random wallpaper
+    # Wallpaper from the pre-warmed pool (falls back to the static image)
     try:
-        wp = await fetch_random_wallpaper()
-        if wp:
-            await message.reply_photo(photo=wp, caption=welcome_text)
-            sent = True
+        photo = wallpapers.take()
+        msg   = await message.reply_photo(photo=photo, caption=welcome_text)
+        if msg and msg.photo and photo.startswith("http") and photo != Config.WELCOME_IMAGE:
+            wallpapers.remember(msg.photo.file_id)
+        sent = True
     except Exception as e:
         logger.warning(f"Wallpaper failed: {e}")
 
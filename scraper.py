@@ -1,5 +1,6 @@
 """
 Novel Scraper Engine
+Sites are handled by pluggable `SiteAdapter`s (see `register_adapter`).
 Supports:
   - TomatoMTL (tomatotl.com)
   - MTLNovel (mtlnovel.com)
@@ -8,14 +9,25 @@ Supports:
   - Generic sites with chapter lists or next-chapter buttons
 """
 import asyncio
+import json
 import logging
+import os
 import re
-from dataclasses import dataclass, field
-from typing import Optional
+import time
+from collections import deque
+from dataclasses import InitVar, dataclass, field
+from typing import TYPE_CHECKING, Callable, Optional
 from urllib.parse import urljoin, urlparse
 
 import aiohttp
-from bs4 import BeautifulSoup
+
+from config import Config
+from utils import compress, proxies
+from utils.scheduler import BULK, READ, scheduler
+from utils.tracing import span
+
+if TYPE_CHECKING:             # bs4/lxml are imported on first parse, not at startup
+    from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
@@ -30,35 +42,422 @@ HEADERS = {
 }
 
 # ─── Data Models ──────────────────────────────────────────────────────────────
-@dataclass
+@dataclass(slots=True)
 class Chapter:
     index:   int
     title:   str
     url:     str
-    content: str = ""
+    content: InitVar[str] = ""
+    blob:    bytes = field(default=b"", repr=False)   # compressed content
+
+    def __post_init__(self, content: str):
+        if content:
+            self.blob = compress.pack(content)
+
+    @property
+    def has_content(self) -> bool:
+        return bool(self.blob)
+
+
+def _get_content(self: Chapter) -> str:
+    return compress.unpack(self.blob)
+
+def _set_content(self: Chapter, text: str):
+    self.blob = compress.pack(text)
+
+# Assigned after the class body so the dataclass keeps `content` as an init arg;
+# text is only decompressed when a chapter is rendered or exported.
+Chapter.content = property(_get_content, _set_content)
+
+class ChapterList:
+    """Compact TOC for huge novels.
+
+    Titles and URLs are kept in parallel lists with the shared URL prefix
+    stripped, compressed content sits in a sparse dict, and `Chapter` objects
+    are only built when an item is accessed. Supports the list operations the
+    handlers and exporters use (len, iteration, indexing and slicing).
+    """
+    __slots__ = ("_prefix", "_paths", "_titles", "_blobs")
+
+    def __init__(self, chapters=()):
+        chapters     = list(chapters)
+        urls         = [c.url for c in chapters]
+        self._prefix = os.path.commonprefix(urls) if len(urls) > 1 else ""
+        cut          = len(self._prefix)
+        self._paths  = [u[cut:] for u in urls]
+        self._titles = [c.title for c in chapters]
+        self._blobs  = {i: c.blob for i, c in enumerate(chapters) if c.blob}
+
+    def _make(self, i: int) -> Chapter:
+        return Chapter(
+            index=i, title=self._titles[i], url=self._prefix + self._paths[i],
+            blob=self._blobs.get(i, b""),
+        )
 
-@dataclass
+    def _store(self, i: int, ch: Chapter):
+        url = ch.url
+        if not url.startswith(self._prefix):
+            # rare: re-base every stored path on the new common prefix
+            prefix = os.path.commonprefix([self._prefix, url])
+            extra  = self._prefix[len(prefix):]
+            self._paths  = [extra + p for p in self._paths]
+            self._prefix = prefix
+        self._paths[i]  = url[len(self._prefix):]
+        self._titles[i] = ch.title
+        if ch.blob:
+            self._blobs[i] = ch.blob
+        else:
+            self._blobs.pop(i, None)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __iter__(self):
+        for i in range(len(self._paths)):
+            yield self._make(i)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._make(i) for i in range(len(self._paths))[idx]]
+        return self._make(range(len(self._paths))[idx])
+
+    def __setitem__(self, idx, value):
+        if isinstance(idx, slice):
+            positions = range(len(self._paths))[idx]
+            value     = list(value)
+            if len(value) != len(positions):
+                raise ValueError("ChapterList slices cannot change the list length")
+            for i, ch in zip(positions, value):
+                self._store(i, ch)
+            return
+        self._store(range(len(self._paths))[idx], value)
+
+    def append(self, ch: Chapter):
+        self._paths.append("")
+        self._titles.append("")
+        self._store(len(self._paths) - 1, ch)
+
+    def __repr__(self) -> str:
+        return f"<ChapterList {len(self)} chapters>"
+
+    def to_blob(self) -> bytes:
+        """Titles and URLs (no content), compressed for storage."""
+        return compress.pack(json.dumps([self._prefix, self._paths, self._titles]))
+
+    @classmethod
+    def from_blob(cls, blob: bytes) -> "ChapterList":
+        obj = cls.__new__(cls)
+        obj._prefix, obj._paths, obj._titles = json.loads(compress.unpack(blob))
+        obj._blobs = {}
+        return obj
+
+
+@dataclass(slots=True)
 class Novel:
     title:       str
     url:         str
     cover_url:   Optional[str] = None
     description: str = ""
     author:      str = ""
-    chapters:    list = field(default_factory=list)
+    chapters:    ChapterList = field(default_factory=ChapterList)
+
+    def __post_init__(self):
+        if not isinstance(self.chapters, ChapterList):
+            self.chapters = ChapterList(self.chapters)
 
 
 # ─── HTTP ─────────────────────────────────────────────────────────────────────
-async def _fetch(session: aiohttp.ClientSession, url: str) -> str:
+# Bodies are streamed in chunks and capped, so one huge or hostile page can't
+# balloon memory; chapter pages can also stop once the content is complete.
+MAX_PAGE_BYTES = 8 * 1024 * 1024
+_CHUNK         = 64 * 1024
+
+_META_CHARSET_RE = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.I
+)
+
+
+def _sniff_charset(head: bytes) -> str:
+    """Encoding from a BOM or the first <meta charset>; UTF-8 otherwise."""
+    if head.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    if head.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return "utf-16"
+    m = _META_CHARSET_RE.search(head, 0, 4096)
+    return m.group(1).decode("ascii") if m else "utf-8"
+
+
+async def _read_html(r: aiohttp.ClientResponse, stop: Optional[Callable[[bytearray], bool]] = None,
+                     limit: int = MAX_PAGE_BYTES) -> str:
+    """Stream a response body: at most `limit` bytes, ending early once `stop(buf)`."""
+    buf = bytearray()
+    async for chunk in r.content.iter_chunked(_CHUNK):
+        buf += chunk
+        if len(buf) >= limit:
+            logger.warning(f"Page over {limit} bytes, truncated: {r.url}")
+            del buf[limit:]
+            break
+        if stop is not None and stop(buf):
+            break
+
+    encoding = r.charset or _sniff_charset(bytes(buf[:4096]))
+    try:
+        return buf.decode(encoding, errors="replace")
+    except LookupError:
+        return buf.decode("utf-8", errors="replace")
+
+
+async def _fetch(session: aiohttp.ClientSession, url: str,
+                 stop: Optional[Callable[[bytearray], bool]] = None,
+                 priority: int = BULK, user: int = 0, sticky: Optional[str] = None) -> str:
+    """Fetch a page through the host's scheduler slot (see utils.scheduler)
+    and, when a proxy pool is configured, one of its routes."""
+    host  = _host(url)
+    route = None
+    ok, started, sent = False, time.monotonic(), False
     try:
-        async with session.get(
-            url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=30),
-            allow_redirects=True
-        ) as r:
-            r.raise_for_status()
-            return await r.text(errors="replace")
+        async with span("fetch"), scheduler.slot(host, priority, user):
+            # a route's rate budget is taken inside the slot, so a page turn
+            # never queues behind budget already reserved by bulk fetches
+            if proxies.pool:
+                route = await proxies.pool.acquire(host, sticky)
+            # latency samples (hedging, utils.mirrors) time only the HTTP
+            # exchange, never the scheduler queue or a route's rate budget
+            started, sent = time.monotonic(), True
+            async with session.get(
+                url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=30),
+                allow_redirects=True, proxy=route.url if route else None,
+            ) as r:
+                ok = not proxies.blocked(r.status)
+                r.raise_for_status()
+                html = await _read_html(r, stop)
+        _observe(host, time.monotonic() - started, True)
+        return html
+    except asyncio.CancelledError:
+        route = None                  # lost a hedge race: says nothing about the route
+        if sent:                      # ...but it was at least this slow: keep the tail
+            _observe(host, time.monotonic() - started, None)
+        raise
+    except proxies.NoRoute as e:
+        logger.warning(f"Fetch skipped {url}: {e}")
+        return ""
     except Exception as e:
         logger.warning(f"Fetch failed {url}: {e}")
+        if sent:
+            _observe(host, time.monotonic() - started, False)
         return ""
+    finally:
+        if route is not None:
+            proxies.pool.report(route, ok, time.monotonic() - started)
+
+
+_SIMPLE_SELECTOR_RE = re.compile(r"^([a-z][a-z0-9]*)?(?:([.#])([\w-]+))?$", re.I)
+
+
+class _ContainerEnd:
+    """`stop` predicate for `_read_html`: true once the element matching a
+    simple selector (`tag`, `.class`, `#id`, `tag.class`) has been closed."""
+
+    _TAIL = 32                    # don't scan bytes a tag might still be split across
+
+    def __init__(self, selector: str):
+        m = _SIMPLE_SELECTOR_RE.match(selector)
+        if not m or not (m.group(1) or m.group(3)):
+            raise ValueError(f"unsupported selector {selector!r}")
+        tag, kind, name = m.group(1), m.group(2), m.group(3)
+        tag_re = re.escape(tag).encode() if tag else rb"\w+"
+        if kind:
+            attr = b"class" if kind == "." else b"id"
+            word = re.escape(name).encode()
+            self._open = re.compile(
+                rb"<(" + tag_re + rb")\b[^>]*\b" + attr
+                + rb"""\s*=\s*["'][^"']*(?<![\w-])""" + word + rb"(?![\w-])", re.I
+            )
+        else:
+            self._open = re.compile(rb"<(" + tag_re + rb")\b", re.I)
+        self._tags  = None        # compiled once the container's tag name is known
+        self._depth = 0
+        self._pos   = 0
+
+    def __call__(self, buf: bytearray) -> bool:
+        end = len(buf) - self._TAIL
+        if end <= self._pos:
+            return False
+        if self._tags is None:
+            m = self._open.search(buf, self._pos, end)
+            if not m:
+                self._pos = max(self._pos, end - 2048)  # an open tag may span the cut
+                return False
+            name = re.escape(m.group(1))
+            self._tags  = re.compile(rb"<(/?)" + name + rb"\b", re.I)
+            self._depth = 1
+            self._pos   = m.end()
+        for m in self._tags.finditer(buf, self._pos, end):
+            self._pos    = m.end()
+            self._depth += -1 if m.group(1) else 1
+            if self._depth == 0:
+                return True
+        return False
+
+
+# ─── Request Coalescing ───────────────────────────────────────────────────────
+# Concurrent callers asking for the same page (a link shared in a big channel)
+# await a single in-flight fetch and share its result instead of each hitting
+# the site.
+_inflight: dict[tuple[str, str], asyncio.Future] = {}
+_flight_stats: dict[str, dict[str, int]] = {}      # kind → {"leaders", "coalesced"}
+
+
+def _flight_key(url: str) -> str:
+    """Normalise a URL so trivially different spellings share one flight."""
+    p = urlparse(url.strip())
+    path = p.path.rstrip("/") or "/"
+    return f"{p.scheme.lower() or 'https'}://{p.netloc.lower()}{path}" + (f"?{p.query}" if p.query else "")
+
+
+async def _singleflight(kind: str, url: str, fn: Callable):
+    """Run `fn()` once per (kind, url) at a time; concurrent callers share it."""
+    key   = (kind, _flight_key(url))
+    stats = _flight_stats.setdefault(kind, {"leaders": 0, "coalesced": 0})
+
+    while (fut := _inflight.get(key)) is not None:
+        stats["coalesced"] += 1
+        try:
+            return await asyncio.shield(fut)
+        except asyncio.CancelledError:
+            if not fut.cancelled():
+                raise                 # we were cancelled ourselves
+            stats["coalesced"] -= 1   # the leader was cancelled: take over
+
+    fut = asyncio.get_running_loop().create_future()
+    _inflight[key] = fut
+    stats["leaders"] += 1
+    try:
+        result = await fn()
+    except asyncio.CancelledError:
+        fut.cancel()
+        raise
+    except BaseException as e:
+        fut.set_exception(e)
+        fut.exception()               # followers re-raise it; don't warn if none
+        raise
+    else:
+        fut.set_result(result)
+        return result
+    finally:
+        if _inflight.get(key) is fut:
+            del _inflight[key]
+
+
+def coalesce_stats() -> dict:
+    """Per kind ("toc", "chapter"): upstream fetches vs. callers that piggybacked."""
+    return {kind: dict(st) for kind, st in _flight_stats.items()}
+
+
+# ─── Hedged Fetching ──────────────────────────────────────────────────────────
+# A chapter that hasn't arrived by its host's p90 latency gets a second request
+# (a mirror copy of the chapter if we know one, else the same URL again) and
+# the first good answer wins. Hedges are capped at Config.HEDGE_PERCENT of
+# recent chapter fetches, so a struggling site never sees more than that
+# much extra load from us (with a budget under 10% the wait stretches to the
+# matching percentile instead). A chapter that fails outright is tried once
+# on its mirror.
+_LATENCY_WINDOW = 100       # recent fetch durations kept per host
+_MIN_SAMPLES    = 20        # no hedging until a host has this many
+_MIN_HEDGE      = 0.1       # seconds; never hedge sooner than this
+_BUDGET_WINDOW  = 1000      # chapter fetches the hedge budget is measured over
+
+
+class _HostTimes:
+    __slots__ = ("samples", "fail_rate", "_sorted")
+
+    def __init__(self):
+        self.samples   = deque(maxlen=_LATENCY_WINDOW)
+        self.fail_rate = 0.0         # EWMA
+        self._sorted: Optional[list] = None
+
+    def add(self, seconds: float, ok: Optional[bool]):
+        """ok=None: a cancelled request, a latency sample only."""
+        if ok is not None:
+            self.fail_rate = 0.9 * self.fail_rate + (0.0 if ok else 0.1)
+        if ok is not False:
+            self.samples.append(seconds)
+            self._sorted = None
+
+    def quantile(self, q: float) -> Optional[float]:
+        if len(self.samples) < _MIN_SAMPLES:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self.samples)
+        return self._sorted[int(q * (len(self._sorted) - 1))]
+
+
+_host_times: dict[str, _HostTimes] = {}
+_hedge_window = [0, 0]      # [chapter fetches, hedges], halved every _BUDGET_WINDOW
+_hedge_stats  = {"chapters": 0, "hedged": 0, "hedge_won": 0, "failover": 0, "failover_won": 0}
+
+
+def _observe(host: str, seconds: float, ok: Optional[bool]):
+    t = _host_times.get(host)
+    if t is None:
+        t = _host_times[host] = _HostTimes()
+    t.add(seconds, ok)
+
+
+def _hedge_delay(host: str) -> Optional[float]:
+    """How long to wait before hedging a fetch from `host` (None: don't)."""
+    t = _host_times.get(host)
+    q = max(0.9, 1 - Config.HEDGE_PERCENT / 100)
+    wait = t.quantile(q) if t else None
+    return None if wait is None else max(wait, _MIN_HEDGE)
+
+
+def _count_fetch():
+    _hedge_stats["chapters"] += 1
+    _hedge_window[0] += 1
+    if _hedge_window[0] >= _BUDGET_WINDOW:
+        _hedge_window[0] //= 2
+        _hedge_window[1] //= 2
+
+
+def _take_hedge() -> bool:
+    """Spend one hedge if the budget allows it."""
+    if (_hedge_window[1] + 1) * 100 > _hedge_window[0] * Config.HEDGE_PERCENT:
+        return False
+    _hedge_window[1] += 1
+    _hedge_stats["hedged"] += 1
+    return True
+
+
+def struggling(host: str) -> bool:
+    """True when `host` is failing or slow enough that a mirror is worth finding."""
+    t = _host_times.get(host)
+    if t is None:
+        return False
+    p90 = t.quantile(0.9)
+    return t.fail_rate > 0.2 or (p90 is not None and p90 > 5.0)
+
+
+async def _first_good(tasks: list) -> tuple[tuple[bytes, str], int]:
+    """First (blob, title) with content among `tasks`, and its position."""
+    pending = set(tasks)
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and task.exception() is None and task.result()[0]:
+                return task.result(), tasks.index(task)
+    return (b"", ""), -1
+
+
+def hedge_stats() -> dict:
+    """Chapter fetches, hedges sent / won, failovers tried / recovered."""
+    return dict(_hedge_stats)
+
+
+def _soup(html: str) -> "BeautifulSoup":
+    from bs4 import BeautifulSoup
+    with span("parse"):
+        return BeautifulSoup(html, "lxml")
 
 
 # ─── Content Cleaner ──────────────────────────────────────────────────────────
@@ -76,19 +475,20 @@ _AD_PATTERNS = [
 ]
 
 def _clean(raw: str) -> str:
-    paras = [p.strip() for p in raw.split("\n") if p.strip()]
-    out = []
-    for p in paras:
-        if any(pat.search(p) for pat in _AD_PATTERNS):
-            continue
-        if len(p) > 3:
-            out.append(p)
-    return "\n\n".join(out)
+    with span("clean"):
+        paras = [p.strip() for p in raw.split("\n") if p.strip()]
+        out = []
+        for p in paras:
+            if any(pat.search(p) for pat in _AD_PATTERNS):
+                continue
+            if len(p) > 3:
+                out.append(p)
+        return "\n\n".join(out)
 
 
 # ─── Site-Specific Scrapers ───────────────────────────────────────────────────
 
-def _parse_tomato(soup: BeautifulSoup, base_url: str) -> tuple[dict, list]:
+def _parse_tomato(soup: "BeautifulSoup", base_url: str) -> tuple[dict, list]:
     """TomatoMTL / tomatotl.com"""
     title_el = (
         soup.select_one(".novel-title") or
@@ -116,7 +516,7 @@ def _parse_tomato(soup: BeautifulSoup, base_url: str) -> tuple[dict, list]:
     return {"title": title, "cover_url": cover, "description": desc}, chapters
 
 
-def _parse_mtlnovel(soup: BeautifulSoup, base_url: str) -> tuple[dict, list]:
+def _parse_mtlnovel(soup: "BeautifulSoup", base_url: str) -> tuple[dict, list]:
     """mtlnovel.com"""
     title_el = soup.select_one(".entry-title") or soup.select_one("h1")
     title    = title_el.get_text(strip=True) if title_el else "Unknown"
@@ -139,7 +539,7 @@ def _parse_mtlnovel(soup: BeautifulSoup, base_url: str) -> tuple[dict, list]:
     return {"title": title, "cover_url": cover, "description": desc}, chapters
 
 
-def _parse_madara(soup: BeautifulSoup, base_url: str) -> tuple[dict, list]:
+def _parse_madara(soup: "BeautifulSoup", base_url: str) -> tuple[dict, list]:
     """WordPress Madara theme"""
     title_el = soup.select_one(".post-title h1") or soup.select_one("h1")
     title    = title_el.get_text(strip=True) if title_el else "Unknown"
@@ -164,7 +564,7 @@ def _parse_madara(soup: BeautifulSoup, base_url: str) -> tuple[dict, list]:
     return {"title": title, "cover_url": cover, "description": desc}, chapters
 
 
-def _parse_generic(soup: BeautifulSoup, base_url: str) -> tuple[dict, list]:
+def _parse_generic(soup: "BeautifulSoup", base_url: str) -> tuple[dict, list]:
     """Fallback generic parser"""
     title_el = soup.select_one("h1") or soup.find("title")
     title    = title_el.get_text(strip=True) if title_el else urlparse(base_url).netloc
@@ -191,21 +591,6 @@ def _parse_generic(soup: BeautifulSoup, base_url: str) -> tuple[dict, list]:
     return {"title": title, "cover_url": cover, "description": desc}, chapters
 
 
-def _detect_and_parse(soup: BeautifulSoup, url: str) -> tuple[dict, list]:
-    domain = urlparse(url).netloc.lower()
-
-    if "tomato" in domain:
-        return _parse_tomato(soup, url)
-    if "mtlnovel" in domain:
-        return _parse_mtlnovel(soup, url)
-    if soup.select(".wp-manga-chapter"):
-        return _parse_madara(soup, url)
-    if soup.select(".chapter-list a") or soup.select(".chapters-list a"):
-        return _parse_tomato(soup, url)  # same structure
-
-    return _parse_generic(soup, url)
-
-
 # ─── Chapter Content Extractor ────────────────────────────────────────────────
 _CONTENT_SELECTORS = [
     ".chapter-content",
@@ -218,23 +603,177 @@ _CONTENT_SELECTORS = [
     "article",
 ]
 
-def _extract_content(soup: BeautifulSoup) -> str:
-    for sel in _CONTENT_SELECTORS:
-        el = soup.select_one(sel)
-        if el:
-            for junk in el.select("script,style,ins,.ads,.ad,iframe,.sharedaddy"):
-                junk.decompose()
-            return _clean(el.get_text("\n"))
-    return ""
+# Per-domain learned selector: the best-scoring candidate is cached and tried
+# first; it is re-validated every REVALIDATE_EVERY pages, or at once when it
+# stops matching or yields almost nothing.
+REVALIDATE_EVERY = 50
+_MIN_CONTENT     = 200      # chars; less than this from a learned selector → relearn
+_DENSITY         = "<density>"
+
+_learned: dict[str, list] = {}                  # host → [selector, pages since learn]
+_extract_stats: dict[str, dict] = {}            # host → {"pages", "seconds", "hits": {sel: n}}
+
+
+_BOILERPLATE_TAGS = frozenset({"nav", "aside", "footer", "header", "form", "script", "style"})
+_BOILERPLATE_RE   = re.compile(
+    r"(?:^|[\s_-])(?:comments?|respond|reply|share|sharing|sharedaddy|social|related|"
+    r"sidebar|widget|footer|header|nav|navigation|menu|breadcrumbs?|pagination|"
+    r"meta|tags|ads?|advert\w*|promo|author)(?:$|[\s_-])",
+    re.I,
+)
+_NESTED_SHARE = 0.7         # an inner candidate with this share of the outer's score wins
+
+
+def _is_boilerplate(tag) -> bool:
+    if tag.name in _BOILERPLATE_TAGS:
+        return True
+    names = " ".join(tag.get("class") or ()) + " " + (tag.get("id") or "")
+    return bool(_BOILERPLATE_RE.search(names))
+
+
+def _text_profile(el) -> tuple[int, int]:
+    """(all text, real text) chars under `el`; real text is outside links and
+    boilerplate (comments, share bars, navigation, widgets…)."""
+    total = real = 0
+    for s in el.find_all(string=True):
+        n = len(s.strip())
+        if not n or type(s).__name__ != "NavigableString":      # skip comments, doctype…
+            continue
+        total += n
+        p = s.parent
+        while p is not None and p is not el:
+            if p.name == "a" or _is_boilerplate(p):
+                break
+            p = p.parent
+        else:
+            real += n
+    return total, real
+
+
+def _score(el) -> float:
+    """Text-density score: real text weighted by its share of everything under
+    `el`, in few tags, so a wrapper that adds comments or clutter scores lower."""
+    if _is_boilerplate(el):
+        return 0.0
+    total, real = _text_profile(el)
+    if real <= 0:
+        return 0.0
+    tags = len(el.find_all(True)) + 1
+    return real * (real / total) * min(1.0, real / tags / 80)
+
+
+def _in_boilerplate(el) -> bool:
+    return any(_is_boilerplate(p) for p in el.parents if p.name not in ("body", "html", "[document]"))
+
+
+def _density_pick(soup: "BeautifulSoup"):
+    """Heuristic fallback: the element holding the most paragraph text."""
+    best, best_score = None, 0.0
+    seen = set()
+    for p in soup.find_all("p"):
+        parent = p.parent
+        if parent is None or id(parent) in seen:
+            continue
+        seen.add(id(parent))
+        if _in_boilerplate(p):
+            continue
+        sc = _score(parent)
+        if sc > best_score:
+            best, best_score = parent, sc
+    return best
 
-def _extract_chapter_title(soup: BeautifulSoup) -> str:
-    for sel in [".chapter-title", ".entry-title", "h1", "h2"]:
+
+def _learn(soup: "BeautifulSoup", selectors) -> tuple[str, object]:
+    scored = []
+    for sel in selectors:
+        el = soup.select_one(sel)
+        if el is not None:
+            sc = _score(el)
+            if sc > 0:
+                scored.append((sc, sel, el))
+    if not scored:
+        return _DENSITY, _density_pick(soup)
+
+    best_score, best_sel, best_el = max(scored, key=lambda c: c[0])
+    # prefer the innermost candidate that still holds most of the content
+    moved = True
+    while moved:
+        moved = False
+        for sc, sel, el in scored:
+            if el is not best_el and sc >= _NESTED_SHARE * best_score \
+                    and any(p is best_el for p in el.parents):
+                best_score, best_sel, best_el = sc, sel, el
+                moved = True
+                break
+    return best_sel, best_el
+
+
+def _extract_content(soup: "BeautifulSoup", selectors=_CONTENT_SELECTORS, host: str = "") -> str:
+    started = time.perf_counter()
+    memo    = _learned.get(host)
+    el      = None
+
+    if memo and memo[1] < REVALIDATE_EVERY:
+        sel = memo[0]
+        el  = _density_pick(soup) if sel == _DENSITY else soup.select_one(sel)
+        if el is None or len(el.get_text(strip=True)) < _MIN_CONTENT:
+            el = None
+        else:
+            memo[1] += 1
+    if el is None:
+        sel, el = _learn(soup, selectors)
+        _learned[host] = [sel, 0]
+
+    text = ""
+    if el is not None:
+        for junk in el.select("script,style,ins,.ads,.ad,iframe,.sharedaddy"):
+            junk.decompose()
+        text = _clean(el.get_text("\n"))
+
+    st = _extract_stats.setdefault(host, {"pages": 0, "seconds": 0.0, "hits": {}})
+    st["pages"]   += 1
+    st["seconds"] += time.perf_counter() - started
+    key = sel if el is not None else "<none>"
+    st["hits"][key] = st["hits"].get(key, 0) + 1
+    return text
+
+
+def _content_stop(host: str) -> Optional[_ContainerEnd]:
+    """Early-stop predicate for a chapter page on `host`, if its layout is known.
+
+    Only a learned, recently confirmed selector is trusted; pages due for
+    re-validation are read in full so every candidate can be scored."""
+    memo = _learned.get(host)
+    if not memo or memo[0] == _DENSITY or memo[1] >= REVALIDATE_EVERY - 1:
+        return None
+    try:
+        return _ContainerEnd(memo[0])
+    except ValueError:
+        return None
+
+
+def extraction_stats() -> dict:
+    """Per-domain content extraction stats: pages, avg ms, selector hits."""
+    return {
+        host: {
+            "pages":    st["pages"],
+            "avg_ms":   st["seconds"] * 1000 / st["pages"] if st["pages"] else 0.0,
+            "selector": (_learned.get(host) or [None])[0],
+            "hits":     dict(st["hits"]),
+        }
+        for host, st in _extract_stats.items()
+    }
+
+_TITLE_SELECTORS = (".chapter-title", ".entry-title", "h1", "h2")
+
+def _extract_chapter_title(soup: "BeautifulSoup", selectors=_TITLE_SELECTORS) -> str:
+    for sel in selectors:
         el = soup.select_one(sel)
         if el:
             return el.get_text(strip=True)
     return "Chapter"
 
-def _find_next_url(soup: BeautifulSoup, base_url: str) -> Optional[str]:
+def _find_next_url(soup: "BeautifulSoup", base_url: str) -> Optional[str]:
     for a in soup.find_all("a"):
         t = a.get_text(strip=True).lower()
         if any(w in t for w in ["next", "→", "next chapter", ">"]):
@@ -244,10 +783,126 @@ def _find_next_url(soup: BeautifulSoup, base_url: str) -> Optional[str]:
     return None
 
 
+# ─── Site Adapters ────────────────────────────────────────────────────────────
+@dataclass
+class SiteAdapter:
+    """Everything needed to scrape one site (or one site theme).
+
+    `domains` are matched against the host and its parent domains in O(1);
+    `keywords` are host substrings (e.g. "tomato"); `probes` are CSS selectors
+    that identify the layout on hosts no adapter claims. New sites are added
+    by calling `register_adapter` from any module imported at startup.
+    """
+    name:              str
+    parse_toc:         Callable[["BeautifulSoup", str], tuple[dict, list]]
+    domains:           tuple = ()
+    keywords:          tuple = ()
+    probes:            tuple = ()
+    content_selectors: tuple = tuple(_CONTENT_SELECTORS)
+    title_selectors:   tuple = _TITLE_SELECTORS
+    find_next:         Callable[["BeautifulSoup", str], Optional[str]] = _find_next_url
+
+    def matches(self, soup: "BeautifulSoup") -> bool:
+        return any(soup.select_one(p) is not None for p in self.probes)
+
+    def extract_content(self, soup: "BeautifulSoup", host: str = "") -> str:
+        return _extract_content(soup, self.content_selectors, host)
+
+    def extract_title(self, soup: "BeautifulSoup") -> str:
+        return _extract_chapter_title(soup, self.title_selectors)
+
+
+GENERIC = SiteAdapter(name="generic", parse_toc=_parse_generic)
+
+_ADAPTERS:    list[SiteAdapter]      = []   # probe order
+_BY_DOMAIN:   dict[str, SiteAdapter] = {}
+_DOMAIN_MEMO: dict[str, SiteAdapter] = {}   # host → adapter that last produced chapters
+
+
+def register_adapter(adapter: SiteAdapter, first: bool = False) -> SiteAdapter:
+    """Add a site adapter; `first=True` probes it before the built-in ones."""
+    _ADAPTERS.insert(0, adapter) if first else _ADAPTERS.append(adapter)
+    for d in adapter.domains:
+        _BY_DOMAIN[d.lower()] = adapter
+    _DOMAIN_MEMO.clear()
+    return adapter
+
+
+def _host(url: str) -> str:
+    return urlparse(url).hostname or ""
+
+
+def adapter_for(url: str, soup: Optional["BeautifulSoup"] = None) -> SiteAdapter:
+    """Pick the adapter for a url: memo → domain → keyword → layout probes."""
+    host = _host(url)
+    hit  = _DOMAIN_MEMO.get(host)
+    if hit is not None:
+        return hit
+
+    labels = host.split(".")
+    for i in range(len(labels) - 1):
+        hit = _BY_DOMAIN.get(".".join(labels[i:]))
+        if hit is not None:
+            return hit
+    for adapter in _ADAPTERS:
+        if any(k in host for k in adapter.keywords):
+            return adapter
+    if soup is not None:
+        for adapter in _ADAPTERS:
+            if adapter.probes and adapter.matches(soup):
+                return adapter
+    return GENERIC
+
+
+def _detect_and_parse(soup: "BeautifulSoup", url: str) -> tuple[dict, list]:
+    host    = _host(url)
+    adapter = adapter_for(url, soup)
+    meta, chapters = adapter.parse_toc(soup, url)
+
+    if not chapters and _DOMAIN_MEMO.get(host) is adapter:
+        # layout changed (or a different page type): forget and detect afresh
+        del _DOMAIN_MEMO[host]
+        adapter = adapter_for(url, soup)
+        meta, chapters = adapter.parse_toc(soup, url)
+
+    if chapters:
+        _DOMAIN_MEMO[host] = adapter
+    return meta, chapters
+
+
+register_adapter(SiteAdapter(
+    name="madara", parse_toc=_parse_madara,
+    probes=(".wp-manga-chapter",),
+    content_selectors=(".reading-content", ".text-left", *_CONTENT_SELECTORS),
+))
+register_adapter(SiteAdapter(
+    name="tomato", parse_toc=_parse_tomato,
+    domains=("tomatotl.com",), keywords=("tomato",),
+    probes=(".chapter-list a", ".chapters-list a"),
+))
+register_adapter(SiteAdapter(
+    name="mtlnovel", parse_toc=_parse_mtlnovel,
+    domains=("mtlnovel.com",), keywords=("mtlnovel",),
+))
+
+
 # ─── Main Scraper ─────────────────────────────────────────────────────────────
 class NovelScraper:
-    def __init__(self):
+    """`priority` and `user` place this scraper's fetches in the scheduler:
+    READ for a user waiting on the answer, BULK for downloads. `sticky`
+    pins its requests to one proxy route (see utils.proxies). `alternates`
+    maps a chapter to a mirror copy's URL for hedging (see utils.mirrors)."""
+
+    def __init__(self, priority: int = READ, user: int = 0, sticky: Optional[str] = None,
+                 alternates: Optional[Callable[[Chapter], Optional[str]]] = None):
         self.session: Optional[aiohttp.ClientSession] = None
+        self.priority   = priority
+        self.user       = user
+        self.sticky     = sticky       # keep one proxy route for e.g. a download job
+        self.alternates = alternates
+
+    async def _get(self, url: str, stop=None) -> str:
+        return await _fetch(self.session, url, stop, self.priority, self.user, self.sticky)
 
     async def __aenter__(self):
         self.session = aiohttp.ClientSession()
@@ -258,12 +913,16 @@ class NovelScraper:
             await self.session.close()
 
     async def scrape_novel(self, url: str) -> Optional[Novel]:
-        html = await _fetch(self.session, url)
+        return await _singleflight("toc", url, lambda: self._scrape_novel(url))
+
+    async def _scrape_novel(self, url: str) -> Optional[Novel]:
+        html = await self._get(url)
         if not html:
             return None
 
-        soup = BeautifulSoup(html, "lxml")
-        meta, chapters = _detect_and_parse(soup, url)
+        soup = _soup(html)
+        with span("parse"):
+            meta, chapters = _detect_and_parse(soup, url)
 
         # If no chapter list found, this might already be a chapter page
         if not chapters:
@@ -272,56 +931,84 @@ class NovelScraper:
         return Novel(
             title=meta["title"],
             url=url,
-            cover_url=meta.get("cover_url"),
+            cover_url=urljoin(url, meta["cover_url"]) if meta.get("cover_url") else None,
             description=meta.get("description", ""),
             chapters=chapters,
         )
 
-    async def _crawl_next(self, first_soup: BeautifulSoup, first_url: str) -> list:
+    async def _crawl_next(self, first_soup: "BeautifulSoup", first_url: str) -> list:
         chapters, seen = [], set()
         soup, url = first_soup, first_url
 
+        adapter = adapter_for(first_url, first_soup)
+
         for i in range(2000):
             if url in seen:
                 break
             seen.add(url)
-            title   = _extract_chapter_title(soup)
-            content = _extract_content(soup)
+            title   = adapter.extract_title(soup)
+            content = adapter.extract_content(soup, _host(url))
             chapters.append(Chapter(index=i, title=title, url=url, content=content))
 
-            next_url = _find_next_url(soup, url)
+            next_url = adapter.find_next(soup, url)
             if not next_url or next_url in seen:
                 break
 
-            html = await _fetch(self.session, next_url)
+            html = await self._get(next_url)
             if not html:
                 break
-            soup = BeautifulSoup(html, "lxml")
+            soup = _soup(html)
             url  = next_url
 
         return chapters
 
     async def fetch_chapter(self, chapter: Chapter) -> Chapter:
-        if chapter.content:
+        if chapter.has_content:
             return chapter
-        html = await _fetch(self.session, chapter.url)
-        if html:
-            soup = BeautifulSoup(html, "lxml")
-            chapter.content = _extract_content(soup)
+        mirror = self.alternates(chapter) if self.alternates else None
+        blob, title = await _singleflight(
+            "chapter", chapter.url, lambda: self._load_chapter(chapter.url, mirror)
+        )
+        if blob:
+            chapter.blob = blob
             if not chapter.title or chapter.title in ("Chapter", ""):
-                chapter.title = _extract_chapter_title(soup)
+                chapter.title = title
         return chapter
 
-    async def fetch_chapters_batch(
-        self, chapters: list, progress_cb=None, delay: float = 0.3
-    ) -> list:
-        total = len(chapters)
-        for i, ch in enumerate(chapters):
-            chapters[i] = await self.fetch_chapter(ch)
-            await asyncio.sleep(delay)
-            if progress_cb:
-                await progress_cb(i + 1, total)
-        return chapters
+    async def _load_chapter(self, url: str, mirror: Optional[str] = None) -> tuple[bytes, str]:
+        """Like _load_page, hedged after the host's tail latency and failing over to `mirror`."""
+        _count_fetch()
+        tasks = [asyncio.ensure_future(self._load_page(url))]
+        try:
+            delay = _hedge_delay(_host(url))
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and _take_hedge():
+                    tasks.append(asyncio.ensure_future(self._load_page(mirror or url)))
+                    result, winner = await _first_good(tasks)
+                    if winner == 1:
+                        _hedge_stats["hedge_won"] += 1
+                    return result     # both copies have been tried
+            result = await tasks[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if not result[0] and mirror:
+            _hedge_stats["failover"] += 1
+            result = await self._load_page(mirror)
+            if result[0]:
+                _hedge_stats["failover_won"] += 1
+        return result
+
+    async def _load_page(self, url: str) -> tuple[bytes, str]:
+        """(compressed content, page title) for a chapter URL; (b"", "") on failure."""
+        html = await self._get(url, stop=_content_stop(_host(url)))
+        if not html:
+            return b"", ""
+        soup    = _soup(html)
+        adapter = adapter_for(url)
+        return compress.pack(adapter.extract_content(soup, _host(url))), adapter.extract_title(soup)
 
 
 # ─── Search ───────────────────────────────────────────────────────────────────
@@ -339,18 +1026,20 @@ _SEARCH_SOURCES = [
     ("https://readnovelfull.com/novel-list/search?keyword={q}", ".col-novel-main h3 a", ".col-novel-main img"),
 ]
 
-async def search_novels(query: str) -> list:
+async def search_novels(query: str, priority: int = READ, every_source: bool = False) -> list:
+    """Results from the first source that has any (from all of them with
+    `every_source`, e.g. when looking for mirrors)."""
     q = query.replace(" ", "+")
     results = []
 
     async with aiohttp.ClientSession() as session:
         for tmpl, link_sel, img_sel in _SEARCH_SOURCES:
             url  = tmpl.format(q=q)
-            html = await _fetch(session, url)
+            html = await _fetch(session, url, priority=priority)
             if not html:
                 continue
 
-            soup = BeautifulSoup(html, "lxml")
+            soup = _soup(html)
             links = soup.select(link_sel)
 
             for a in links[:5]:
@@ -359,7 +1048,7 @@ async def search_novels(query: str) -> list:
                 if href and title:
                     results.append(SearchResult(title=title, url=href))
 
-            if results:
+            if results and not every_source:
                 break
 
-    return results[:10]
+    return results if every_source else results[:10]
@@ -49,8 +49,52 @@ Configure your reading preferences below."""
 <b>Novels Scraped :</b> {novels}
 <b>Chapters Sent  :</b> {chapters}"""
 
+    FORCE_SUB_STATS_TXT = """
+
+<b>🔒 Force-Sub Gate</b>
+<b>Checks         :</b> {checks} ({rate:.2f}/s)
+<b>Cache Hit Ratio:</b> {hit:.1f}%
+<b>API Calls      :</b> {api}
+<b>Cached Entries :</b> {cached}"""
+
+    PERF_TXT = """<b>⚙️ Extraction Stats</b>
+{rows}"""
+
+    PERF_ROW_TXT = """
+<b>{host}</b> — {pages} pages, {avg_ms:.1f} ms avg
+<code>{selector}</code> · {hits}"""
+
+    PERF_COALESCE_TXT = """
+<b>Coalesced {kind}:</b> {coalesced} callers shared {leaders} fetches"""
+
+    PERF_SCHED_TXT = """
+<b>Fetch {cls}:</b> {requests} ({queued} queued), wait {avg_ms:.0f} ms avg / {max_ms:.0f} ms max"""
+
+    PERF_HEDGE_TXT = """
+<b>Hedged chapters:</b> {hedged} of {chapters} ({hedge_won} won), failover {failover} ({failover_won} recovered)"""
+
+    PERF_PROXY_TXT = """
+<b>Route {name}:</b> {requests} req, {score:.0f}% ok, {latency_ms:.0f} ms{state}"""
+
+    PERF_SPAN_TXT = """
+<b>Span {name}:</b> {count} × {avg_ms:.1f} ms avg, {max_ms:.0f} ms max"""
+
+    PROFILE_TXT = """<b>🔬 Profile</b> — {seconds:.1f}s, {samples} samples
+<i>self% total% function (top by self time)</i>
+{rows}"""
+
+    PERF_WATCH_TXT = """
+
+<b>🔔 Watcher</b> — {novels} novels
+<b>Checks :</b> {total} ({unmodified} not modified, {same_digest} same links, {parsed} parsed)
+<b>Updates:</b> {updates} · <b>Errors:</b> {errors}"""
+
+    NEW_CHAPTERS_TXT = """<b>🔔 {title}</b> has {count} new chapter(s):
+
+{chapters}"""
+
     CHAPTER_TXT = """<b>📖 {title}</b>
-<b>Chapter {num}: {chap_title}</b>
+<b>Chapter {num}: {chap_title}</b>{page}
 ━━━━━━━━━━━━━━━━━━━━━
 {content}
 ━━━━━━━━━━━━━━━━━━━━━
@@ -0,0 +1,50 @@
+import os
+import sys
+from contextlib import asynccontextmanager
+
+import pytest
+
+# config.py reads the environment at import; the motor client never connects in tests
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web  # noqa: E402
+
+import scraper  # noqa: E402
+from config import Config  # noqa: E402
+from utils.scheduler import FetchScheduler  # noqa: E402
+
+
+@asynccontextmanager
+async def _serve(handler, host: str = "127.0.0.1"):
+    """Serve `handler` for every GET path on an ephemeral port; yields the port."""
+    app = web.Application()
+    app.router.add_route("GET", "/{tail:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, 0).start()
+    try:
+        yield runner.addresses[0][1]
+    finally:
+        await runner.cleanup()
+
+
+@pytest.fixture
+def serve():
+    """`async with serve(handler) as port:` — a local stand-in site or proxy."""
+    return _serve
+
+
+@pytest.fixture(autouse=True)
+def fresh_scraper(monkeypatch):
+    """Every test starts with empty scraper caches: latency samples, hedge
+    budget, in-flight loads, learned selectors and scheduler queues."""
+    monkeypatch.setattr(scraper, "_host_times", {})
+    monkeypatch.setattr(scraper, "_hedge_window", [0, 0])
+    monkeypatch.setattr(scraper, "_hedge_stats", dict.fromkeys(scraper._hedge_stats, 0))
+    monkeypatch.setattr(scraper, "_inflight", {})
+    monkeypatch.setattr(scraper, "_flight_stats", {})
+    monkeypatch.setattr(scraper, "_learned", {})
+    monkeypatch.setattr(scraper, "_extract_stats", {})
+    monkeypatch.setattr(scraper, "scheduler",
+                        FetchScheduler(Config.HOST_CONCURRENCY, Config.HOST_RESERVED))
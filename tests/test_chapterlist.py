@@ -0,0 +1,64 @@
+import pytest
+
+from scraper import Chapter, ChapterList, Novel
+
+BASE = "https://novels.test/tale/"
+
+
+def _toc(n=10, content=False):
+    return ChapterList(Chapter(index=i, title=f"Chapter {i + 1}", url=f"{BASE}c{i}",
+                               content=f"text {i} " * 30 if content else "")
+                       for i in range(n))
+
+
+def test_indexing_and_slicing():
+    toc = _toc()
+    assert len(toc) == 10 and toc._prefix == BASE + "c"
+    assert toc[3].url == f"{BASE}c3" and toc[-1].index == 9
+    assert [c.index for c in toc[2:8:3]] == [2, 5]
+    assert [c.title for c in toc[-2:]] == ["Chapter 9", "Chapter 10"]
+    assert [c.url for c in toc] == [f"{BASE}c{i}" for i in range(10)]
+    with pytest.raises(IndexError):
+        toc[10]
+
+
+def test_item_and_slice_assignment():
+    toc = _toc()
+    ch = toc[4]
+    ch.title, ch.content = "Renamed", "new body " * 40
+    toc[4] = ch
+    assert toc[4].title == "Renamed" and toc[4].content.startswith("new body")
+
+    fetched = toc[0:3]
+    for c in fetched:
+        c.content = f"body of {c.index} " * 20
+    toc[0:3] = fetched
+    assert all(c.has_content for c in toc[0:3]) and not toc[3].has_content
+
+    cleared = toc[4]
+    cleared.blob = b""
+    toc[4] = cleared
+    assert 4 not in toc._blobs
+    with pytest.raises(ValueError):
+        toc[0:3] = toc[0:2]
+
+
+def test_store_rebases_on_a_new_common_prefix():
+    toc = _toc()
+    toc[5] = Chapter(index=5, title="Moved", url="https://mirror.test/tale/c5")
+    toc.append(Chapter(index=10, title="Extra", url=f"{BASE}c10"))
+    assert toc._prefix == "https://"
+    assert [c.url for c in toc] == [
+        f"{BASE}c{i}" if i != 5 else "https://mirror.test/tale/c5" for i in range(11)]
+
+
+def test_blob_round_trip_keeps_toc_not_content():
+    toc = _toc(content=True)
+    back = ChapterList.from_blob(toc.to_blob())
+    assert [(c.index, c.title, c.url) for c in back] == [(c.index, c.title, c.url) for c in toc]
+    assert not any(c.has_content for c in back)
+
+
+def test_novel_wraps_plain_lists():
+    novel = Novel(title="T", url=BASE, chapters=[Chapter(index=0, title="One", url=BASE + "1")])
+    assert isinstance(novel.chapters, ChapterList) and novel.chapters[0].title == "One"
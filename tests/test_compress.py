@@ -0,0 +1,26 @@
+import pytest
+
+from utils import compress
+
+PROSE = ("“Are you sure?” she asked, glancing at the old map. The river bent east "
+         "past the ruined tower — three days' walk, maybe four. 龙王 nodded. ") * 40
+
+
+@pytest.mark.parametrize("text", ["", "short", "x" * compress.MIN_SIZE, PROSE, "é\x00\n" * 500])
+def test_round_trip(text):
+    assert compress.unpack(compress.pack(text)) == text
+
+
+def test_codec_choice():
+    assert compress.pack("short")[:1] == compress._RAW
+    blob = compress.pack(PROSE)
+    assert blob[:1] == compress._ZLIB                     # readable on every host
+    assert len(blob) < len(PROSE.encode()) / 5
+
+
+def test_unknown_or_unreadable_codec_is_an_error(monkeypatch):
+    with pytest.raises(ValueError):
+        compress.unpack(b"?payload")
+    monkeypatch.setattr(compress, "zstandard", None)
+    with pytest.raises(ValueError, match="zstandard"):
+        compress.unpack(compress._ZSTD + b"\x28\xb5\x2f\xfd")
@@ -0,0 +1,52 @@
+import asyncio
+import io
+
+from aiohttp import web
+from PIL import Image
+
+from utils import covers
+
+
+def _jpeg(side: int = 1200) -> bytes:
+    img = Image.effect_noise((side, side), 64).convert("RGB")      # noise: barely compressible
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=95)
+    return out.getvalue()
+
+
+def _chunked(raw: bytes, size: int = 16 * 1024):
+    async def handler(req):
+        resp = web.StreamResponse(headers={"Content-Type": "image/jpeg"})
+        await resp.prepare(req)
+        for i in range(0, len(raw), size):
+            await resp.write(raw[i:i + size])
+            await asyncio.sleep(0.005)                 # arrive over several reads
+        await resp.write_eof()
+        return resp
+    return handler
+
+
+def _get(monkeypatch, serve, raw: bytes):
+    monkeypatch.setattr(covers, "_session", None)
+    monkeypatch.setattr(covers, "_bytes", covers.OrderedDict())
+
+    async def main():
+        async with serve(_chunked(raw)) as port:
+            try:
+                return await covers.get_cover(f"http://127.0.0.1:{port}/cover.jpg")
+            finally:
+                await covers._session.close()
+    return asyncio.run(main())
+
+
+def test_multi_chunk_cover_is_read_whole(monkeypatch, serve):
+    raw = _jpeg()
+    assert len(raw) > 10 * 16 * 1024
+    data = _get(monkeypatch, serve, raw)
+    assert data is not None
+    assert max(Image.open(io.BytesIO(data)).size) == covers.Config.COVER_MAX_SIDE
+
+
+def test_oversized_cover_without_length_is_refused(monkeypatch, serve):
+    monkeypatch.setattr(covers, "MAX_COVER_BYTES", 50 * 1024)
+    assert _get(monkeypatch, serve, _jpeg()) is None
@@ -0,0 +1,90 @@
+import os
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from scraper import Chapter, Novel
+from utils.epub import EpubWriter
+from utils.exporters import export_epub
+
+OPF = "{http://www.idpf.org/2007/opf}"
+XHTML = "{http://www.w3.org/1999/xhtml}"
+
+
+@pytest.fixture
+def book(tmp_path):
+    novel = Novel(title="Tom & Jerry <Redux>", url="https://a.test/n", author="A & B")
+    chapters = [
+        Chapter(index=i, title=f"Chapter {i + 1}: <b>{i}</b> & co",
+                url=f"https://a.test/{i}",
+                content=f"First <para> of {i} & more.\x01\n\nSecond “para” — ünïcode {i}.")
+        for i in range(12)
+    ]
+    path = export_epub(novel, chapters, volume="Vol. 1", cover=b"\xff\xd8fakejpeg")
+    yield path, chapters
+    os.remove(path)
+
+
+def test_container_and_mimetype(book):
+    path, _ = book
+    with zipfile.ZipFile(path) as z:
+        first = z.infolist()[0]
+        assert first.filename == "mimetype" and first.compress_type == zipfile.ZIP_STORED
+        assert z.read("mimetype") == b"application/epub+zip"
+        container = ET.fromstring(z.read("META-INF/container.xml"))
+        rootfile = container.find(".//{urn:oasis:names:tc:opendocument:xmlns:container}rootfile")
+        assert rootfile.get("full-path") == "OEBPS/content.opf"
+        assert z.testzip() is None
+
+
+def test_manifest_spine_and_nav_are_consistent(book):
+    path, chapters = book
+    with zipfile.ZipFile(path) as z:
+        names = set(z.namelist())
+        opf = ET.fromstring(z.read("OEBPS/content.opf"))
+        assert opf.find(f"{OPF}metadata/{{http://purl.org/dc/elements/1.1/}}title").text == \
+            "Tom & Jerry <Redux> - Vol. 1"
+        items = {i.get("id"): i for i in opf.iter(f"{OPF}item")}
+        for item in items.values():
+            assert posixpath.join("OEBPS", item.get("href")) in names
+        spine = [r.get("idref") for r in opf.iter(f"{OPF}itemref")]
+        assert spine[0] == "cover" and all(i in items for i in spine)
+        assert len(spine) == len(chapters) + 1
+        assert any(i.get("properties") == "nav" for i in items.values())
+
+        nav = ET.fromstring(z.read("OEBPS/nav.xhtml"))
+        links = [a for a in nav.iter(f"{XHTML}a")]
+        assert [a.text for a in links] == [c.title for c in chapters]
+        assert all(posixpath.join("OEBPS", a.get("href")) in names for a in links)
+
+
+def test_chapters_are_well_formed_and_escaped(book):
+    path, chapters = book
+    with zipfile.ZipFile(path) as z:
+        pages = sorted(n for n in z.namelist() if n.startswith("OEBPS/chap_"))
+        assert len(pages) == len(chapters)
+        for name, ch in zip(pages, chapters):
+            root = ET.fromstring(z.read(name))                    # raises if not well-formed
+            paras = [p.text for p in root.iter(f"{XHTML}p")]
+            assert paras == [f"First <para> of {ch.index} & more.",
+                             f"Second “para” — ünïcode {ch.index}."]
+            assert root.find(f".//{XHTML}h2").text == f"Chapter {ch.index + 1}: {ch.title}"
+
+
+def test_failed_build_removes_partial_file(tmp_path):
+    path = str(tmp_path / "x.epub")
+    with pytest.raises(RuntimeError):
+        with EpubWriter(path, "T") as book:
+            book.add_chapter("One", ["text"])
+            raise RuntimeError("export interrupted")
+    assert not os.path.exists(path)
+
+
+def test_readable_by_ebooklib(book):
+    epub = pytest.importorskip("ebooklib.epub")
+    path, chapters = book
+    parsed = epub.read_epub(path)
+    assert parsed.get_metadata("DC", "title")[0][0] == "Tom & Jerry <Redux> - Vol. 1"
+    assert len(list(parsed.get_items_of_type(9))) >= len(chapters)   # ITEM_DOCUMENT
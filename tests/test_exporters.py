@@ -0,0 +1,54 @@
+import os
+
+from fpdf import FPDF
+
+from utils import exporters
+
+FONTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fonts")
+
+
+def test_bundled_font_used_without_system_fonts(monkeypatch):
+    monkeypatch.setattr(exporters.Config, "PDF_FONT", "")
+    monkeypatch.setattr(exporters, "_FONT_CANDIDATES", exporters._FONT_CANDIDATES[:1])
+    assert exporters._FONT_CANDIDATES[0] == os.path.join(FONTS, "DejaVuSans.ttf")
+
+    family, style, clean = exporters._pdf_font(FPDF())
+    assert (family, style) == ("Body", "B")
+    assert clean("Привет, κόσμε — “quotes”") == "Привет, κόσμε — “quotes”"
+
+
+def test_long_title_keeps_volume_in_file_name():
+    novel = exporters.Novel(title="A Very Long Novel Title " * 5, url="https://a.test/n")
+    stems = {exporters._file_stem(novel, f"Vol. {v} (Ch. {v * 100 - 99}-{v * 100})") for v in (1, 2)}
+    assert len(stems) == 2
+    assert all(s.endswith(("Vol_1_Ch_1-100", "Vol_2_Ch_101-200")) for s in stems)
+    assert exporters._file_stem(novel, "") == exporters._safe(novel.title)[:50]
+
+
+def _breaker():
+    pdf = FPDF()
+    pdf.add_page()
+    return exporters._LineBreaker(pdf, "Helvetica", "", 11), pdf
+
+
+def test_wrap_fits_width_and_keeps_every_word():
+    br, pdf = _breaker()
+    text = "The caravan crossed the dunes before the sun rose over the broken hills. " * 12
+    for width in (40, 90, 180):
+        lines = br.wrap(text, width)
+        assert all(pdf.get_string_width(line) <= width + 1e-6 for line in lines)
+        assert " ".join(lines).split() == text.split()
+        # greedy: the next line's first word would not have fitted
+        for line, nxt in zip(lines, lines[1:]):
+            assert pdf.get_string_width(f"{line} {nxt.split()[0]}") > width
+    assert br.wrap("", 90) == [] and br.wrap("   ", 90) == []
+
+
+def test_wrap_splits_long_unbroken_words():
+    br, pdf = _breaker()
+    url = "https://example.com/" + "a1b2c3" * 60
+    lines = br.wrap(f"see {url} now", 60)
+    assert lines[0] == "see"
+    assert all(pdf.get_string_width(line) <= 60 + 1e-6 for line in lines)
+    assert "".join(lines[1:-1]) + lines[-1].split()[0] == url
+    assert lines[-1].endswith(" now")
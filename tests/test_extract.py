@@ -0,0 +1,32 @@
+import scraper
+from scraper import _CONTENT_SELECTORS, _extract_content, _learn, _soup
+
+PARA = "<p>" + "The hero walked on through the rain and thought about things. " * 8 + "</p>"
+COMMENTS = "".join(
+    f"<div class='comment'><a href='/u{i}'>user{i}</a>"
+    f"<p>{'Great chapter, thanks for the translation! ' * 4}</p><a href='#'>Reply</a></div>"
+    for i in range(25)
+)
+
+
+def test_wrapper_with_comments_loses_to_content_node():
+    page = f"""<html><body><article><h1>Chapter 5</h1>
+    <div class='entry-content'>{PARA * 10}</div>
+    <div class='sharedaddy'><a>Share on X</a></div>
+    <div id='comments' class='comments-area'>{COMMENTS}</div></article></body></html>"""
+    sel, _ = _learn(_soup(page), _CONTENT_SELECTORS)
+    assert sel == ".entry-content"
+
+
+def test_inner_candidate_preferred_over_plain_wrapper():
+    page = f"<html><body><article><h1>Chapter 5</h1><div class='entry-content'>{PARA * 10}</div></article></body></html>"
+    sel, _ = _learn(_soup(page), _CONTENT_SELECTORS)
+    assert sel == ".entry-content"
+
+
+def test_density_fallback_skips_comment_paragraphs():
+    scraper._learned.clear()
+    page = f"<html><body><div class='wrap'>{PARA * 10}</div><div class='comments'>{COMMENTS}</div></body></html>"
+    text = _extract_content(_soup(page), host="example.test")
+    assert text.startswith("The hero walked")
+    assert "translation" not in text
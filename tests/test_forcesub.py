@@ -0,0 +1,73 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+from pyrogram.enums import ChatMemberStatus
+
+from config import Config
+from utils import forcesub
+
+
+class _Client:
+    def __init__(self, fail: set):
+        self.fail, self.calls = fail, 0
+
+    async def get_chat_member(self, channel, user_id):
+        self.calls += 1
+        if channel in self.fail:
+            raise RuntimeError("bot is not an admin")
+        return type("Member", (), {"status": ChatMemberStatus.MEMBER})()
+
+
+def test_errored_check_passes_only_briefly(monkeypatch):
+    monkeypatch.setattr(forcesub, "_cache", OrderedDict())
+    monkeypatch.setattr(forcesub, "_verified", OrderedDict())
+    channels = [ch["id"] for ch in Config.FORCE_SUB_CHANNELS]
+    client = _Client(fail={channels[0]})
+
+    assert asyncio.run(forcesub.missing_channels(client, 7)) == []
+    left = forcesub._verified[7] - time.monotonic()
+    assert left <= Config.FORCE_SUB_NEG_TTL
+
+
+def test_confirmed_membership_cached_for_full_ttl(monkeypatch):
+    monkeypatch.setattr(forcesub, "_cache", OrderedDict())
+    monkeypatch.setattr(forcesub, "_verified", OrderedDict())
+    client = _Client(fail=set())
+
+    assert asyncio.run(forcesub.missing_channels(client, 7)) == []
+    assert forcesub._verified[7] - time.monotonic() > Config.FORCE_SUB_TTL - 5
+    calls = client.calls
+    asyncio.run(forcesub.missing_channels(client, 7))
+    assert client.calls == calls
+
+
+def test_cache_is_a_bounded_lru(monkeypatch):
+    monkeypatch.setattr(forcesub, "_cache", OrderedDict())
+    monkeypatch.setattr(forcesub, "_verified", OrderedDict())
+    monkeypatch.setattr(Config, "FORCE_SUB_CACHE_SIZE", 4)
+    client, channel = _Client(fail=set()), "@chan"
+
+    async def check(user):
+        return await forcesub._is_member(client, user, channel, time.monotonic())
+
+    async def main():
+        for user in range(4):
+            await check(user)
+        await check(0)                      # refreshes user 0
+        await check(4)                      # evicts user 1, the least recently used
+        return client.calls
+
+    assert asyncio.run(main()) == 5
+    assert list(forcesub._cache) == [(u, channel) for u in (2, 3, 0, 4)]
+
+
+def test_sweep_drops_only_expired_entries(monkeypatch):
+    now = time.monotonic()
+    monkeypatch.setattr(forcesub, "_cache", OrderedDict(
+        [((1, "@a"), (True, now - 1)), ((2, "@a"), (True, now + 60))]))
+    monkeypatch.setattr(forcesub, "_verified", OrderedDict([(1, now - 1), (2, now + 60)]))
+
+    forcesub._sweep(now)
+    assert list(forcesub._cache) == [(2, "@a")]
+    assert list(forcesub._verified) == [2]
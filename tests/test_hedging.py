@@ -0,0 +1,97 @@
+import asyncio
+import random
+import time
+
+from aiohttp import web
+
+import scraper
+from config import Config
+from scraper import Chapter, NovelScraper
+from utils.scheduler import FetchScheduler
+
+BODY = "<html><body><h1>Chapter {n}</h1><div id='chapter-content'><p>" + "word " * 300 + "</p></div></body></html>"
+
+
+def _n(req) -> int:
+    return int(req.path.rsplit("/", 1)[-1])
+
+
+def _page(req) -> web.Response:
+    return web.Response(text=BODY.format(n=_n(req)), content_type="text/html")
+
+
+def _setup(monkeypatch, percent=10, per_host=8, reserved=1):
+    monkeypatch.setattr(Config, "HEDGE_PERCENT", percent)
+    monkeypatch.setattr(scraper, "scheduler", FetchScheduler(per_host, reserved))
+
+
+def _chapter(port, n):
+    return Chapter(index=n, title=f"Chapter {n}", url=f"http://127.0.0.1:{port}/c/{n}")
+
+
+def test_slow_chapter_is_hedged_to_mirror_and_loser_kept_as_sample(monkeypatch, serve):
+    _setup(monkeypatch)
+    slow = {1000}
+
+    async def primary(req):
+        await asyncio.sleep(2.0 if _n(req) in slow else 0.02)
+        return _page(req)
+
+    async def mirror(req):
+        return _page(req)
+
+    async def main():
+        async with serve(primary) as p1, serve(mirror, "127.0.0.2") as p2:
+            alt = lambda ch: f"http://127.0.0.2:{p2}/c/{ch.index}"
+            async with NovelScraper(alternates=alt) as s:
+                for n in range(40):                               # latency samples
+                    await s.fetch_chapter(_chapter(p1, n))
+                started = time.monotonic()
+                ch = await s.fetch_chapter(_chapter(p1, 1000))
+                return ch, time.monotonic() - started
+
+    ch, took = asyncio.run(main())
+    assert ch.has_content and took < 0.5
+    st = scraper.hedge_stats()
+    assert st["hedged"] == 1 and st["hedge_won"] == 1
+    # the cancelled slow primary still counts as a (censored) latency sample
+    assert len(scraper._host_times["127.0.0.1"].samples) == 41
+
+
+def test_hedges_stay_within_budget(monkeypatch, serve):
+    _setup(monkeypatch, percent=5)
+    rng = random.Random(3)
+
+    async def site(req):
+        # a smooth spread, so ~5% of fetches always land past the p95 hedge point
+        await asyncio.sleep(rng.uniform(0.01, 0.3))
+        return _page(req)
+
+    async def main():
+        async with serve(site) as port, NovelScraper() as s:
+            sem = asyncio.Semaphore(8)
+
+            async def one(n):
+                async with sem:
+                    await s.fetch_chapter(_chapter(port, n))
+            await asyncio.gather(*(one(n) for n in range(200)))
+
+    asyncio.run(main())
+    st = scraper.hedge_stats()
+    assert 0 < st["hedged"] <= st["chapters"] * 5 / 100
+
+
+def test_latency_samples_exclude_scheduler_queue(monkeypatch, serve):
+    _setup(monkeypatch, percent=0, per_host=1, reserved=0)   # one fetch at a time
+
+    async def site(req):
+        await asyncio.sleep(0.05)
+        return _page(req)
+
+    async def main():
+        async with serve(site) as port, NovelScraper() as s:
+            await asyncio.gather(*(s.fetch_chapter(_chapter(port, n)) for n in range(20)))
+
+    asyncio.run(main())
+    assert max(scraper._host_times["127.0.0.1"].samples) < 0.3     # queue alone reaches ~1 s
+    assert not scraper.struggling("127.0.0.1")
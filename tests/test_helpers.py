@@ -0,0 +1,25 @@
+import asyncio
+import itertools
+
+from utils import helpers
+
+
+def test_wallpaper_pool_fills_before_first_take(monkeypatch):
+    counter = itertools.count()
+
+    async def fake_fetch(session):
+        return f"https://img.test/{next(counter)}.jpg"
+
+    monkeypatch.setattr(helpers, "fetch_random_wallpaper", fake_fetch)
+
+    async def main():
+        pool = helpers.WallpaperPool(size=5)
+        pool.start()
+        await asyncio.sleep(0.05)
+        filled = len(pool._urls)
+        first = pool.take()
+        pool._task.cancel()
+        return filled, first
+
+    filled, first = asyncio.run(main())
+    assert filled == 5 and first == "https://img.test/0.jpg"
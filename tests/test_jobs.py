@@ -0,0 +1,112 @@
+import asyncio
+import os
+
+import database as db
+from scraper import Chapter, Novel
+from utils import downloads, jobs
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = list(docs)
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def _gen(self):
+        for d in self.docs:
+            yield d
+
+
+def test_bad_outbox_entry_does_not_block_later_ones(monkeypatch):
+    outbox = [{"_id": i, "job_id": 1, "file_id": i, "filename": f"v{i}.txt", "caption": ""}
+              for i in range(3)]
+    attempts, sent, dropped = {}, [], []
+
+    async def find_one(*_a, **_k):
+        return {"payload": {"chat_id": 42}}
+
+    async def download(file_id, f):
+        if file_id == 0:
+            raise RuntimeError("file gone")
+        f.write(b"x")
+
+    async def failed(doc, error):
+        attempts[doc["_id"]] = attempts.get(doc["_id"], 0) + 1
+        return attempts[doc["_id"]]
+
+    async def drop(doc):
+        dropped.append(doc["_id"])
+        outbox.remove(doc)
+
+    class Client:
+        async def send_document(self, chat_id, path, caption):
+            sent.append(os.path.basename(path))
+
+    monkeypatch.setattr(db.jobs_col, "find_one", find_one)
+    monkeypatch.setattr(db, "iter_outbox", lambda: _Cursor(outbox))
+    monkeypatch.setattr(db, "download_result_file", download)
+    monkeypatch.setattr(db, "result_failed", failed)
+    monkeypatch.setattr(db, "drop_result", drop)
+
+    asyncio.run(jobs._send_outbox(Client()))
+    assert sent == ["v1.txt", "v2.txt"]
+    assert [d["_id"] for d in outbox] == [0]
+
+    for _ in range(jobs.Config.OUTBOX_MAX_ATTEMPTS - 1):
+        asyncio.run(jobs._send_outbox(Client()))
+    assert outbox == [] and attempts[0] == jobs.Config.OUTBOX_MAX_ATTEMPTS
+
+
+def _run(monkeypatch, records, volume_size=10):
+    delivered = []
+
+    async def get(key):
+        return records.get(key)
+
+    async def start(key, *_a):
+        records.setdefault(key, {})["status"] = "running"
+
+    async def finish(key, status):
+        records[key]["status"] = status
+
+    async def fetch(*_a, **_k):
+        return []
+
+    def export(novel, spool, volume="", **_k):
+        path = os.path.join(os.environ.get("TMPDIR", "/tmp"), f"test_{len(delivered)}.txt")
+        open(path, "w").close()
+        return path
+
+    async def deliver(path, caption):
+        delivered.append(caption.splitlines()[1])
+
+    monkeypatch.setattr(db, "get_download_job", get)
+    monkeypatch.setattr(db, "start_download_job", start)
+    monkeypatch.setattr(db, "finish_download_job", finish)
+    monkeypatch.setattr(downloads, "fetch_job_chapters", fetch)
+    monkeypatch.setitem(downloads.EXPORTERS, "txt", export)
+    monkeypatch.setattr(downloads.Config, "VOLUME_SIZE", volume_size)
+
+    novel = Novel(title="T", url="https://a.test/n",
+                  chapters=[Chapter(index=i, title=f"Chapter {i + 1}", url=f"https://a.test/{i}")
+                            for i in range(30)])
+    asyncio.run(downloads.run_download(novel, "txt", 0, 30, 1, lambda *_: None, deliver))
+    return delivered
+
+
+def test_resume_skips_delivered_volumes(monkeypatch):
+    key = downloads.job_key
+    records = {
+        key("https://a.test/n", "txt", 0, 30) + "|run": {"status": "running"},
+        key("https://a.test/n", "txt", 0, 10): {"status": "complete"},
+        key("https://a.test/n", "txt", 10, 20): {"status": "partial"},
+    }
+    assert _run(monkeypatch, records) == ["Vol. 2 (Ch. 11-20)", "Vol. 3 (Ch. 21-30)"]
+    assert records[key("https://a.test/n", "txt", 0, 30) + "|run"]["status"] == "complete"
+
+
+def test_fresh_download_after_completion_sends_everything(monkeypatch):
+    records = {}
+    assert len(_run(monkeypatch, records)) == 3
+    assert len(_run(monkeypatch, records)) == 3
@@ -0,0 +1,109 @@
+"""Job-queue claims against a real mongod; skipped when none is reachable.
+
+Point MONGODB_TEST_URI at a throwaway server to run them.
+"""
+import asyncio
+import os
+import uuid
+
+import pytest
+
+import database as db
+
+URI = os.environ.get("MONGODB_TEST_URI", "mongodb://127.0.0.1:27017")
+
+
+def _mongod_up() -> bool:
+    import pymongo
+    try:
+        pymongo.MongoClient(URI, serverSelectionTimeoutMS=300).admin.command("ping")
+        return True
+    except Exception:
+        return False
+
+
+pytestmark = pytest.mark.skipif(not _mongod_up(), reason=f"no mongod at {URI}")
+
+
+def _run(monkeypatch, body):
+    """Run `body()` with database.jobs_col pointed at a scratch database."""
+    import motor.motor_asyncio
+
+    async def main():
+        client  = motor.motor_asyncio.AsyncIOMotorClient(URI)
+        scratch = client[f"test_jobs_{uuid.uuid4().hex[:8]}"]
+        monkeypatch.setattr(db, "db", scratch)
+        monkeypatch.setattr(db, "jobs_col", scratch["jobs"])
+        monkeypatch.setattr(db, "outbox_col", scratch["outbox"])
+        monkeypatch.setattr(db, "chapters_col", scratch["chapters"])
+        monkeypatch.setattr(db, "downloads_col", scratch["downloads"])
+        try:
+            await body()
+        finally:
+            await client.drop_database(scratch.name)
+            client.close()
+
+    asyncio.run(main())
+
+
+def test_two_workers_cannot_claim_the_same_job(monkeypatch):
+    async def body():
+        await db.enqueue_job("download", {"n": 1})
+        a, b = await asyncio.gather(db.claim_job("w1", 60, 3), db.claim_job("w2", 60, 3))
+        claimed = [j for j in (a, b) if j]
+        assert len(claimed) == 1
+        assert claimed[0]["attempts"] == 1
+        assert await db.claim_job("w3", 60, 3) is None
+
+    _run(monkeypatch, body)
+
+
+def test_heartbeat_only_extends_the_owners_lease(monkeypatch):
+    async def body():
+        await db.enqueue_job("download", {})
+        job = await db.claim_job("w1", 60, 3)
+        assert await db.heartbeat_job(job["_id"], "w1", 60)
+        assert not await db.heartbeat_job(job["_id"], "w2", 60)
+        after = await db.jobs_col.find_one({"_id": job["_id"]})
+        assert after["lease_until"] > job["lease_until"]
+
+    _run(monkeypatch, body)
+
+
+def test_expired_lease_is_reclaimed_then_failed(monkeypatch):
+    async def body():
+        await db.enqueue_job("download", {})
+        first = await db.claim_job("w1", 0.2, 2)
+        assert await db.claim_job("w2", 0.2, 2) is None     # lease still held
+        await asyncio.sleep(0.4)
+
+        second = await db.claim_job("w2", 0.2, 2)
+        assert second["_id"] == first["_id"]
+        assert second["worker"] == "w2" and second["attempts"] == 2
+        assert not await db.heartbeat_job(first["_id"], "w1", 60)
+
+        await asyncio.sleep(0.4)
+        assert await db.claim_job("w3", 0.2, 2) is None     # out of attempts
+        assert await db.fail_expired_jobs(2, "lost") == 1
+        doc = await db.jobs_col.find_one({"_id": first["_id"]})
+        assert doc["status"] == "failed" and doc["notified"] is False
+
+    _run(monkeypatch, body)
+
+
+def test_indexes_expire_reported_jobs_only(monkeypatch):
+    async def body():
+        await db.ensure_indexes()
+        await db.ensure_indexes()               # idempotent
+        info = await db.jobs_col.index_information()
+        ttl  = [i for i in info.values() if "expireAfterSeconds" in i]
+        assert len(ttl) == 1
+        assert ttl[0]["key"] == [("finished", 1)]
+        assert ttl[0]["partialFilterExpression"] == {"notified": True}
+        assert any(i["key"] == [("status", 1), ("lease_until", 1)] for i in info.values())
+        for col, field in ((db.chapters_col, "saved"), (db.downloads_col, "updated")):
+            info = await col.index_information()
+            assert any(i["key"] == [(field, 1)] and "expireAfterSeconds" in i
+                       for i in info.values())
+
+    _run(monkeypatch, body)
@@ -0,0 +1,13 @@
+from utils.keyboards import chapter_nav_keyboard
+
+
+def _data(kb):
+    return [b.callback_data for row in kb.inline_keyboard for b in row]
+
+
+def test_chapter_nav_leaves_default_page_off():
+    url = "https://a.test/novel"
+    assert _data(chapter_nav_keyboard(url, 5, 10)) == [
+        f"read|{url}|4", "close", f"read|{url}|6"]
+    assert _data(chapter_nav_keyboard(url, 5, 10, page=1, pages=3)) == [
+        f"read|{url}|5", f"read|{url}|5|2", f"read|{url}|4", "close", f"read|{url}|6"]
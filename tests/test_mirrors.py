@@ -0,0 +1,31 @@
+from scraper import Chapter, Novel
+from utils.mirrors import _chapter_key, _match
+
+
+def _novel(url: str, titles: list[str]) -> Novel:
+    return Novel(title="T", url=url, chapters=[
+        Chapter(index=i, title=t, url=f"{url}/{i}") for i, t in enumerate(titles)
+    ])
+
+
+def test_chapter_key_ignores_volume_number():
+    assert _chapter_key("Volume 2 Chapter 15: Rain") == 15
+    assert _chapter_key("Vol. 2 Ch.15") == 15
+    assert _chapter_key("V2 - 15") == 15
+    assert _chapter_key("Chapter 12: The 3 Kings") == 12
+    assert _chapter_key("Prologue") == "prologue"
+
+
+def test_match_picks_the_right_chapter_within_a_volume():
+    home   = _novel("https://a.test", [f"Volume 2 Chapter {n}" for n in range(1, 11)])
+    mirror = _novel("https://b.test", ["Prologue"] + [f"Vol 2 Ch {n}" for n in range(1, 11)])
+    for ch in home.chapters:
+        assert _match(mirror, ch) == f"https://b.test/{ch.index + 1}"
+
+
+def test_titles_without_numbers_must_agree():
+    home   = _novel("https://a.test", ["Prologue", "The Storm", "Aftermath"])
+    mirror = _novel("https://b.test", ["Prologue", "Interlude", "Aftermath"])
+    assert _match(mirror, home.chapters[0]) == "https://b.test/0"
+    assert _match(mirror, home.chapters[1]) is None
+    assert _match(mirror, home.chapters[2]) == "https://b.test/2"
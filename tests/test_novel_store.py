@@ -0,0 +1,38 @@
+import asyncio
+
+import database as db
+from scraper import Chapter, Novel
+from utils import novel_store
+
+
+def test_toc_round_trip_keeps_metadata(monkeypatch):
+    docs = {}
+
+    async def save_toc(url, toc, count, meta=None):
+        docs.setdefault(url, {}).update(meta or {}, toc=toc, toc_count=count)
+
+    async def get_doc(url):
+        doc = docs.get(url)
+        if doc is not None:
+            from datetime import datetime
+            doc = dict(doc, toc_at=datetime.utcnow())
+        return doc
+
+    monkeypatch.setattr(db, "save_novel_toc", save_toc)
+    monkeypatch.setattr(db, "get_novel_doc", get_doc)
+
+    novel = Novel(title="The Tale", url="https://a.test/n", author="Someone",
+                  description="About it", cover_url="https://a.test/c.jpg",
+                  chapters=[Chapter(index=i, title=f"Chapter {i + 1}", url=f"https://a.test/{i}")
+                            for i in range(5)])
+
+    async def main():
+        await novel_store.save(novel)
+        # a later scrape that lost the metadata must not blank it out
+        await novel_store.save(Novel(title="", url=novel.url, chapters=list(novel.chapters)))
+        return await novel_store.load(novel.url)
+
+    loaded = asyncio.run(main())
+    assert (loaded.title, loaded.author, loaded.description, loaded.cover_url) == \
+        ("The Tale", "Someone", "About it", "https://a.test/c.jpg")
+    assert [c.title for c in loaded.chapters] == [c.title for c in novel.chapters]
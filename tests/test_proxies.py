@@ -0,0 +1,142 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+import scraper
+from utils import proxies
+from utils.proxies import NoRoute, ProxyPool
+from utils.scheduler import BULK, READ, FetchScheduler
+
+
+def _stand_in_proxy(name: str):
+    """A tiny forward proxy that tags what it forwards with X-Via."""
+    async def handler(req):
+        async with aiohttp.ClientSession() as s:
+            async with s.get(str(req.url), headers={"X-Via": name}) as r:
+                return web.Response(status=r.status, body=await r.read(), content_type="text/html")
+    return handler
+
+
+def test_every_5xx_counts_as_blocked():
+    assert proxies.blocked(500) and proxies.blocked(503) and proxies.blocked(429)
+    assert not proxies.blocked(404) and not proxies.blocked(200)
+
+
+def test_sticky_route_kept_until_ejected():
+    async def main():
+        pool = ProxyPool(["http://a:1", "http://b:1"], host_rps=0, max_fails=2, cooldown=60)
+        first = await pool.acquire("site", sticky="job")
+        assert all([await pool.acquire("site", sticky="job") is first for _ in range(5)])
+        pool.report(first, False)
+        pool.report(first, False)
+        other = await pool.acquire("site", sticky="job")
+        assert other is not first and not first.healthy(time.monotonic())
+    asyncio.run(main())
+
+
+def test_no_direct_fallback_when_direct_disabled():
+    async def main():
+        pool = ProxyPool(["http://a:1"], direct=False, host_rps=0, max_fails=1, cooldown=600)
+        pool.report(pool.routes[0], False)
+        with pytest.raises(NoRoute):
+            await pool.acquire("site")
+
+        pool = ProxyPool(["http://a:1"], direct=False, host_rps=0, max_fails=1, cooldown=0.05)
+        pool.report(pool.routes[0], False)
+        assert await pool.acquire("site") is pool.routes[0]      # waited for it to return
+
+        pool = ProxyPool(["http://a:1"], direct=True, host_rps=0, max_fails=1, cooldown=600)
+        for r in pool.routes:
+            pool.report(r, False)
+        assert await pool.acquire("site") is None                 # direct allowed
+    asyncio.run(main())
+
+
+def test_fetches_spread_over_stand_in_proxies(monkeypatch, serve):
+    seen = []
+
+    async def site(req):
+        seen.append(req.headers.get("X-Via", "direct"))
+        return web.Response(text="<html>ok</html>", content_type="text/html")
+
+    async def main():
+        async with serve(site) as site_port, serve(_stand_in_proxy("p0")) as p0, \
+                serve(_stand_in_proxy("p1")) as p1:
+            urls = [f"http://127.0.0.1:{p0}", f"http://127.0.0.1:{p1}"]
+            monkeypatch.setattr(proxies, "pool", ProxyPool(urls, direct=False, host_rps=50))
+            monkeypatch.setattr(scraper, "scheduler", FetchScheduler(8, 1))
+            async with aiohttp.ClientSession() as s:
+                pages = await asyncio.gather(*(
+                    scraper._fetch(s, f"http://127.0.0.1:{site_port}/c/{i}") for i in range(20)
+                ))
+        assert all("ok" in p for p in pages)
+
+    asyncio.run(main())
+    assert "direct" not in seen
+    assert seen.count("p0") >= 5 and seen.count("p1") >= 5
+
+
+def test_read_does_not_wait_behind_reserved_bulk_budget(monkeypatch, serve):
+    async def site(req):
+        return web.Response(text="<html>ok</html>", content_type="text/html")
+
+    async def main():
+        # one route at 10 req/s: twelve bulk fetches need over a second of budget
+        monkeypatch.setattr(proxies, "pool", ProxyPool([], direct=True, host_rps=10))
+        monkeypatch.setattr(scraper, "scheduler", FetchScheduler(2, 1))
+        async with serve(site) as port, aiohttp.ClientSession() as s:
+            url = f"http://127.0.0.1:{port}/c"
+            bulk = [asyncio.create_task(scraper._fetch(s, f"{url}/{i}", priority=BULK))
+                    for i in range(12)]
+            await asyncio.sleep(0.05)
+            started = time.monotonic()
+            await scraper._fetch(s, f"{url}/read", priority=READ)
+            read_wait = time.monotonic() - started
+            await asyncio.gather(*bulk)
+        return read_wait
+
+    assert asyncio.run(main()) < 0.35
+
+
+def test_watcher_and_covers_never_go_direct_when_disabled(monkeypatch, serve):
+    import io
+
+    from PIL import Image
+
+    from utils import covers
+    from utils.watcher import Watcher
+
+    img = io.BytesIO()
+    Image.new("RGB", (40, 60), "red").save(img, format="JPEG")
+    seen = []
+
+    async def site(req):
+        seen.append((req.path, req.headers.get("X-Via", "direct")))
+        if req.path == "/cover.jpg":
+            return web.Response(body=img.getvalue(), content_type="image/jpeg")
+        return web.Response(text="<html><a href='/c/1'>Chapter 1</a></html>", content_type="text/html")
+
+    monkeypatch.setattr(covers, "_session", None)
+    monkeypatch.setattr(covers, "_bytes", covers.OrderedDict())
+
+    async def main():
+        async with serve(site) as port, serve(_stand_in_proxy("p0")) as proxy_port:
+            pool = ProxyPool([f"http://127.0.0.1:{proxy_port}"], direct=False,
+                             host_rps=0, max_fails=1, cooldown=600)
+            monkeypatch.setattr(proxies, "pool", pool)
+            w = Watcher(notify=None)
+            async with aiohttp.ClientSession() as w._session:
+                await w._probe(f"http://127.0.0.1:{port}/novel", {})
+                assert await covers.get_cover(f"http://127.0.0.1:{port}/cover.jpg")
+
+                pool.report(pool.routes[0], False)                # eject the only proxy
+                with pytest.raises(NoRoute):
+                    await w._probe(f"http://127.0.0.1:{port}/novel", {})
+                assert await covers.get_cover(f"http://127.0.0.1:{port}/other.jpg") is None
+            await covers._session.close()
+
+    asyncio.run(main())
+    assert seen == [("/novel", "p0"), ("/cover.jpg", "p0")]
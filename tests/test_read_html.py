@@ -0,0 +1,91 @@
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from scraper import _ContainerEnd, _read_html, _sniff_charset
+
+PARA = "<p>" + "Chapter text goes on. " * 20 + "</p>"
+
+
+def _page(comments: int = 2000) -> bytes:
+    return ("<html><body><div class='wrap'><div id='chapter-content' class='x'>"
+            + "<div class='note'><div>nested</div></div>" + PARA * 20
+            + "<div>inner</div></div>"
+            + ("<div class='comment'>" + "Nice chapter! " * 30 + "</div>") * comments
+            + "</div></body></html>").encode()
+
+
+def _read(serve, body: bytes, content_type="text/html", charset=None, **kw) -> str:
+    async def handler(req):
+        resp = web.StreamResponse()
+        resp.content_type = content_type
+        if charset:
+            resp.charset = charset
+        await resp.prepare(req)
+        for i in range(0, len(body), 8192):
+            await resp.write(body[i:i + 8192])
+        await resp.write_eof()
+        return resp
+
+    async def main():
+        async with serve(handler) as port, aiohttp.ClientSession() as s:
+            async with s.get(f"http://127.0.0.1:{port}/") as r:
+                return await _read_html(r, **kw)
+    return asyncio.run(main())
+
+
+def test_size_cap(serve):
+    body = b"<html>" + b"x" * 300_000
+    assert len(_read(serve, body, limit=100_000)) == 100_000
+    assert len(_read(serve, body)) == len(body)
+
+
+def test_stop_after_container_closes(serve):
+    page = _page()
+    html = _read(serve, page, stop=_ContainerEnd("#chapter-content"))
+    assert "<div>inner</div></div>" in html               # nested divs didn't end it early
+    assert len(html) <= 64 * 1024 < len(page)              # one chunk, not the 800 KB page
+
+
+@pytest.mark.parametrize("head, expected", [
+    (b"\xef\xbb\xbf<html>", "utf-8-sig"),
+    (b"\xff\xfe<\x00h\x00", "utf-16"),
+    (b"<html><head><meta charset='gbk'></head>", "gbk"),
+    (b'<meta http-equiv="Content-Type" content="text/html; charset=Shift_JIS">', "Shift_JIS"),
+    (b"<html><head><title>none</title>", "utf-8"),
+])
+def test_sniff_charset(head, expected):
+    assert _sniff_charset(head) == expected
+
+
+def test_meta_charset_used_without_header(serve):
+    text = "<html><head><meta charset='gbk'></head><body>第一章 龙王</body></html>"
+    assert "第一章 龙王" in _read(serve, text.encode("gbk"), content_type="application/octet-stream")
+    # a charset in Content-Type wins over the page's own claim
+    assert "第一章" in _read(serve, text.encode("utf-8"), charset="utf-8")
+
+
+def test_container_end_across_chunk_boundaries():
+    page = _page(comments=50)
+    for step in (1, 7, 100, 4096):
+        stop, buf = _ContainerEnd("div#chapter-content"), bytearray()
+        for i in range(0, len(page), step):
+            buf += page[i:i + step]
+            if stop(buf):
+                break
+        else:
+            pytest.fail(f"never stopped with {step}-byte chunks")
+        assert b"<div>inner</div></div>" in buf and len(buf) < len(page)
+
+
+@pytest.mark.parametrize("selector", [".x", "div.x", "#chapter-content", "div"])
+def test_container_end_selectors(selector):
+    buf = bytearray(_page(comments=5) + b" " * 64)
+    assert _ContainerEnd(selector)(buf)
+
+
+def test_container_end_rejects_complex_selectors():
+    with pytest.raises(ValueError):
+        _ContainerEnd("div > p")
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+from aiohttp import web
+
+import scraper
+from config import Config
+from scraper import Chapter, NovelScraper
+from utils.scheduler import BACKGROUND, BULK, PREFETCH, READ, FetchScheduler
+
+
+async def _queue(sched, order, label, priority, user=0, hold=0.0):
+    async with sched.slot("h", priority, user):
+        order.append(label)
+        await asyncio.sleep(hold)
+
+
+def test_waiters_served_by_class_then_round_robin():
+    async def main():
+        sched, order = FetchScheduler(1, 0), []
+        async with sched.slot("h", BULK):
+            tasks = [asyncio.create_task(_queue(sched, order, *args)) for args in (
+                ("bg", BACKGROUND), ("a1", BULK, 1), ("a2", BULK, 1), ("a3", BULK, 1),
+                ("b1", BULK, 2), ("pre", PREFETCH), ("read", READ),
+            )]
+            await asyncio.sleep(0)                 # all queued behind the held slot
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(main()) == ["read", "pre", "a1", "b1", "a2", "a3", "bg"]
+
+
+def test_reserved_slot_only_for_reads():
+    async def main():
+        sched, order = FetchScheduler(2, 1), []
+        async with sched.slot("h", BULK):
+            bulk = asyncio.create_task(_queue(sched, order, "bulk", BULK))
+            read = asyncio.create_task(_queue(sched, order, "read", READ))
+            await asyncio.sleep(0)
+            await read                             # went through on the reserved slot
+            assert order == ["read"] and not bulk.done()
+        await bulk
+        return sched.stats()
+
+    st = asyncio.run(main())
+    assert st["read"]["queued"] == 0 and st["bulk"]["queued"] == 1
+
+
+def test_cancelled_waiter_releases_nothing():
+    async def main():
+        sched, order = FetchScheduler(1, 0), []
+        async with sched.slot("h", BULK):
+            gone = asyncio.create_task(_queue(sched, order, "gone", BULK))
+            kept = asyncio.create_task(_queue(sched, order, "kept", BULK))
+            await asyncio.sleep(0)
+            gone.cancel()
+        await kept
+        assert order == ["kept"]
+        return sched._hosts
+
+    assert asyncio.run(main()) == {}               # every slot returned
+
+
+def test_page_turns_not_starved_by_bulk_downloads(monkeypatch, serve):
+    monkeypatch.setattr(Config, "HEDGE_PERCENT", 0)
+    monkeypatch.setattr(scraper, "scheduler", FetchScheduler(4, 1))
+    body = "<html><body><div id='chapter-content'><p>" + "word " * 200 + "</p></div></body></html>"
+
+    async def site(req):
+        await asyncio.sleep(0.05)
+        return web.Response(text=body, content_type="text/html")
+
+    async def main():
+        async with serve(site) as port:
+            return await turn_pages(port)
+
+    async def turn_pages(port):
+        chapter = lambda user, n: Chapter(index=n, title="", url=f"http://127.0.0.1:{port}/{user}/{n}")
+
+        async def download(user):
+            async with NovelScraper(priority=BULK, user=user) as s:
+                for n in range(1000):
+                    await s.fetch_chapter(chapter(user, n))
+
+        turns = []
+        bulk = [asyncio.create_task(download(u)) for u in range(1, 21)]
+        try:
+            await asyncio.sleep(0.2)               # bulk queue is full by now
+            async with NovelScraper(priority=READ, user=99) as s:
+                for n in range(10):
+                    started = time.monotonic()
+                    await s.fetch_chapter(chapter(99, n))
+                    turns.append(time.monotonic() - started)
+        finally:
+            for t in bulk:
+                t.cancel()
+            await asyncio.gather(*bulk, return_exceptions=True)
+        return turns
+
+    turns = asyncio.run(main())
+    # a FIFO queue would put each turn behind ~20 bulk fetches (~250 ms+)
+    assert max(turns) < 0.2, [round(t * 1000) for t in turns]
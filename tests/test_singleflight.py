@@ -0,0 +1,52 @@
+import asyncio
+
+from aiohttp import web
+
+import scraper
+from scraper import Chapter, NovelScraper
+from utils.scheduler import FetchScheduler
+
+TOC = "<html><head><title>Tale</title></head><body><h1>Tale</h1><ul class='chapter-list'>{links}</ul></body></html>"
+CHAPTER = "<html><body><div id='chapter-content'><p>" + "text " * 200 + "</p></div></body></html>"
+
+
+def _site(hits: dict):
+    async def handler(req):
+        kind = "chapter" if req.path.startswith("/c/") else "toc"
+        hits[kind] += 1
+        await asyncio.sleep(0.2)          # long enough for every caller to pile up
+        if kind == "chapter":
+            return web.Response(text=CHAPTER, content_type="text/html")
+        links = "".join(f"<li><a href='/c/{i}'>Chapter {i + 1}</a></li>" for i in range(30))
+        return web.Response(text=TOC.format(links=links), content_type="text/html")
+    return handler
+
+
+def test_500_concurrent_opens_hit_upstream_once(monkeypatch, serve):
+    monkeypatch.setattr(scraper, "scheduler", FetchScheduler(4, 1))
+    hits = {"toc": 0, "chapter": 0}
+
+    async def main():
+        async with serve(_site(hits)) as port:
+            return await open_all(f"http://127.0.0.1:{port}")
+
+    async def open_all(base):
+        async def open_novel(i):
+            # trivially different spellings of the same URL share the flight
+            url = f"{base}/novel" + ("/" if i % 2 else "")
+            async with NovelScraper(user=i) as s:
+                return await s.scrape_novel(url)
+
+        async def read_chapter(i):
+            async with NovelScraper(user=i) as s:
+                return await s.fetch_chapter(Chapter(index=0, title="Chapter 1", url=f"{base}/c/0"))
+
+        novels   = await asyncio.gather(*(open_novel(i) for i in range(500)))
+        chapters = await asyncio.gather(*(read_chapter(i) for i in range(500)))
+        return novels, chapters
+
+    novels, chapters = asyncio.run(main())
+    assert hits == {"toc": 1, "chapter": 1}
+    assert all(n is not None and len(n.chapters) == 30 for n in novels)
+    assert all(c.has_content for c in chapters)
+    assert scraper.coalesce_stats()["toc"]["coalesced"] >= 499
@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# parsers, PDF/EPUB and image libraries load on first export/parse, not at boot
+HEAVY  = ("bs4", "lxml", "fpdf", "PIL", "ebooklib")
+BUDGET = float(os.environ.get("IMPORT_BUDGET", 1.5))   # seconds; raise IMPORT_BUDGET on slow CI boxes
+
+_PROBE = """
+import importlib, json, pkgutil, sys, time
+started = time.perf_counter()
+import bot, handlers
+for m in pkgutil.iter_modules(handlers.__path__):
+    importlib.import_module(f"handlers.{m.name}")
+import worker
+print(json.dumps({"seconds": time.perf_counter() - started,
+                  "heavy": sorted(m for m in %r if m in sys.modules)}))
+""" % (HEAVY,)
+
+
+def _probe() -> dict:
+    env = dict(os.environ, MONGODB_URI=os.environ.get("MONGODB_URI", "mongodb://localhost:27017"))
+    out = subprocess.run([sys.executable, "-c", _PROBE], cwd=ROOT, env=env,
+                         capture_output=True, text=True, timeout=120, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_startup_skips_heavy_imports_and_fits_budget():
+    result = _probe()
+    assert result["heavy"] == [], f"imported at startup: {result['heavy']}"
+    assert result["seconds"] < BUDGET, f"startup imports took {result['seconds']:.2f}s"
@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+from pyrogram.errors import FloodWait
+
+import database as db
+from scraper import Chapter
+from utils import watcher
+
+
+class _Client:
+    def __init__(self, flood_once: set):
+        self.flood_once, self.sent = set(flood_once), []
+
+    async def send_message(self, user_id, text, **_):
+        if user_id in self.flood_once:
+            self.flood_once.discard(user_id)
+            raise FloodWait(value=0)
+        self.sent.append(user_id)
+
+
+def test_notices_are_queued_and_retried_after_floodwait(monkeypatch):
+    async def followers(url):
+        return [1, 2, 3]
+
+    monkeypatch.setattr(db, "get_followers", followers)
+    client = _Client(flood_once={2})
+    notifier = watcher._Notifier(client)
+
+    async def main():
+        sender = asyncio.create_task(notifier.run())
+        started = time.monotonic()
+        await notifier.notify("https://a.test/n", {"title": "T"},
+                              [Chapter(index=9, title="Chapter 10", url="https://a.test/10")])
+        queued_in = time.monotonic() - started
+        while len(client.sent) < 3:
+            await asyncio.sleep(0.01)
+        sender.cancel()
+        return queued_in
+
+    assert asyncio.run(asyncio.wait_for(main(), 5)) < 0.01     # the check never waits on sends
+    assert sorted(client.sent) == [1, 2, 3]                     # the flooded follower got it too
+
+
+def _doc(url, due):
+    return {"_id": url, "title": url, "next_check": due}
+
+
+def test_due_novels_are_drained_per_host(monkeypatch):
+    from config import Config
+
+    monkeypatch.setattr(Config, "WATCH_PER_HOST", 2)
+    monkeypatch.setattr(Config, "WATCH_HOST_DELAY", 0)
+    checked, active, peak = [], {}, {}
+
+    async def check(url):
+        host = watcher._host(url)
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        await asyncio.sleep(0.02)
+        checked.append(url)
+        active[host] -= 1
+
+    async def main():
+        w = watcher.Watcher(notify=None)
+        w._check = check
+        past, later = time.time() - 10, time.time() + 3600
+        for i in range(5):
+            w.watch(_doc(f"https://a.test/{i}", past + i))
+        w.watch(_doc("https://b.test/0", past))
+        w.watch(_doc("https://c.test/0", later))            # not due yet
+        w.watch(_doc("https://a.test/0", later))            # already watched: no second entry
+        w.unwatch("https://a.test/4")                       # its heap entry is skipped
+        w._push("https://a.test/3", later)                  # rescheduled: old entry is stale
+
+        w._dispatch_due()
+        assert w._drains == {"a.test": 2, "b.test": 1}
+        while w._tasks:
+            await asyncio.sleep(0.01)
+        assert not w._queues and not w._drains
+        return w
+
+    w = asyncio.run(asyncio.wait_for(main(), 5))
+    assert sorted(checked) == ["https://a.test/0", "https://a.test/1",
+                               "https://a.test/2", "https://b.test/0"]
+    assert checked.index("https://a.test/0") < checked.index("https://a.test/2")
+    assert peak == {"a.test": 2, "b.test": 1}
+    assert [url for _, url in w._heap] == sorted(["https://c.test/0", "https://a.test/3"])
+
+
+def test_reschedule_follows_the_update_rhythm(monkeypatch):
+    from config import Config
+
+    monkeypatch.setattr(Config, "WATCH_JITTER", 0)
+    w   = watcher.Watcher(notify=None)
+    url = "https://a.test/n"
+    day = 86400
+
+    def interval(st, changed):
+        w._state[url] = st
+        w._reschedule(url, st, changed)
+        return st["interval"]
+
+    assert interval({"interval": 3600}, None) == 7200                   # error: back off
+    assert interval({"interval": 3600}, False) == 5400                  # no rhythm yet: stretch
+    st = {"interval": 3600, "last_change": time.time() - 3 * 3600}
+    assert round(interval(st, True)) == 3600                            # a third of the gap
+    assert round(st["gap"]) == 3 * 3600
+    st = {"interval": 3600, "gap": 3 * 3600, "last_change": time.time() - 9 * 3600}
+    assert round(interval(st, False)) == 3 * 3600                       # hiatus stretches it
+    st = {"interval": 3600, "gap": 30 * day, "last_change": time.time() - 30 * day}
+    assert interval(st, False) == Config.WATCH_MAX_INTERVAL             # clamped
+    assert interval({"interval": 60}, True) == Config.WATCH_MIN_INTERVAL
+    assert w._heap[0][0] == w._state[url]["next_check"]
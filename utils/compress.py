@@ -0,0 +1,50 @@
+"""Compressed at-rest storage for chapter text.
+
+Every blob starts with a one-byte codec tag, so raw, zlib and zstd payloads
+can live side by side in memory and in MongoDB. New blobs are always zlib:
+blobs are shared between the bot and worker.py hosts through MongoDB, and
+zlib is the one codec every host can decode. zstd blobs written by earlier
+versions are still read when `zstandard` is installed.
+"""
+import zlib
+
+try:
+    import zstandard
+except ImportError:          # only needed to read old zstd blobs
+    zstandard = None
+
+_RAW  = b"r"
+_ZLIB = b"z"
+_ZSTD = b"s"
+
+LEVEL    = 6
+MIN_SIZE = 128          # shorter texts are not worth the codec header
+
+
+# ─── Codec ────────────────────────────────────────────────────────────────────
+def pack(text: str) -> bytes:
+    """Compress chapter text into a tagged blob."""
+    if not text:
+        return b""
+    raw = text.encode("utf-8")
+    if len(raw) < MIN_SIZE:
+        return _RAW + raw
+    return _ZLIB + zlib.compress(raw, LEVEL)
+
+
+def unpack(blob: bytes) -> str:
+    """Decompress a blob produced by `pack`."""
+    if not blob:
+        return ""
+    tag, body = blob[:1], blob[1:]
+    if tag == _RAW:
+        raw = body
+    elif tag == _ZLIB:
+        raw = zlib.decompress(body)
+    elif tag == _ZSTD:
+        if zstandard is None:
+            raise ValueError("zstd blob, but the zstandard package is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(body)
+    else:
+        raise ValueError(f"Unknown blob codec {tag!r}")
+    return raw.decode("utf-8")
@@ -0,0 +1,100 @@
+"""Cover image pipeline.
+
+Covers are fetched once over a shared connection pool, downsized and
+recompressed with Pillow off the event loop, and cached as bytes. The
+Telegram `file_id` returned by the first upload is remembered per novel so
+later sends don't upload (or make Telegram fetch) anything.
+"""
+import asyncio
+import io
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+import aiohttp
+
+import database as db
+from config import Config
+from scraper import HEADERS
+from utils import proxies
+
+logger = logging.getLogger(__name__)
+
+MAX_COVER_BYTES = 8 * 1024 * 1024       # refuse absurd source images
+
+_session: Optional[aiohttp.ClientSession] = None
+_bytes: "OrderedDict[str, bytes]" = OrderedDict()   # cover url → processed JPEG
+_file_ids: dict[str, str] = {}                      # novel url → Telegram file_id
+
+
+def _get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            headers=HEADERS,
+            connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=20),
+        )
+    return _session
+
+
+def _shrink(raw: bytes) -> bytes:
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(raw))
+    img.thumbnail((Config.COVER_MAX_SIDE, Config.COVER_MAX_SIDE))
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=82, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+async def get_cover(cover_url: str) -> Optional[bytes]:
+    """Processed JPEG bytes for a cover url, or None if it can't be fetched."""
+    if not cover_url:
+        return None
+    data = _bytes.get(cover_url)
+    if data is not None:
+        _bytes.move_to_end(cover_url)
+        return data
+
+    try:
+        async with proxies.routed_get(_get_session(), cover_url) as r:
+            r.raise_for_status()
+            if (r.content_length or 0) > MAX_COVER_BYTES:
+                raise ValueError(f"cover too large ({r.content_length} bytes)")
+            buf = bytearray()
+            async for chunk in r.content.iter_chunked(64 * 1024):
+                buf += chunk
+                if len(buf) > MAX_COVER_BYTES:      # no or lying Content-Length
+                    raise ValueError("cover too large")
+        data = await asyncio.to_thread(_shrink, bytes(buf))
+    except Exception as e:
+        logger.warning(f"Cover fetch failed {cover_url}: {e}")
+        return None
+
+    _bytes[cover_url] = data
+    while len(_bytes) > Config.COVER_CACHE_SIZE:
+        _bytes.popitem(last=False)
+    return data
+
+
+async def get_file_id(novel_url: str) -> Optional[str]:
+    file_id = _file_ids.get(novel_url)
+    if file_id is None:
+        file_id = await db.get_cover_file_id(novel_url)
+        if file_id:
+            _file_ids[novel_url] = file_id
+    return file_id
+
+
+async def remember_file_id(novel_url: str, file_id: str):
+    _file_ids[novel_url] = file_id
+    await db.save_cover_file_id(novel_url, file_id)
+
+
+async def forget_file_id(novel_url: str):
+    """Drop a file_id Telegram no longer accepts."""
+    _file_ids.pop(novel_url, None)
+    await db.save_cover_file_id(novel_url, None)
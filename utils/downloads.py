@@ -0,0 +1,212 @@
+"""Resumable download jobs.
+
+Every fetched chapter is stored in `chapters_col` and checkpointed on the
+job's `downloads_col` document, so pressing the same (url, format) button
+(for the same range) again after a crash or redeploy only fetches what is
+still missing. Both collections expire idle entries (CHAPTER_STORE_TTL,
+CHECKPOINT_TTL); a chapter that expired is simply fetched again.
+"""
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Optional
+
+import database as db
+from config import Config
+from scraper import Chapter, Novel, NovelScraper
+from utils.scheduler import BULK
+from utils.tracing import span
+from utils import covers, mirrors, proxies
+from utils.exporters import export_epub, export_pdf, export_txt
+from utils.spool import ChapterSpool
+
+logger = logging.getLogger(__name__)
+
+FAILED_PLACEHOLDER = "[This chapter could not be fetched. Try the download again later.]"
+
+EXPORTERS = {"txt": export_txt, "pdf": export_pdf, "epub": export_epub}
+
+
+class DownloadError(Exception):
+    """A download failure whose message is meant for the user."""
+
+
+def job_key(novel_url: str, fmt: str, first: int, last: int) -> str:
+    return f"{novel_url}|{fmt}|{first}-{last}"
+
+
+async def fetch_job_chapters(
+    scraper:     NovelScraper,
+    key:         str,
+    chapters:    list,
+    spool:       ChapterSpool,
+    progress:    Optional[Callable[[int, int], None]] = None,
+    delay:       float = Config.CHAPTER_DELAY,
+) -> list[int]:
+    """Fill `spool` with every chapter of the job, resuming from checkpoints.
+
+    Chapters that still fail after the end-of-job retries are spooled with a
+    visible placeholder; their indices are returned.
+    """
+    total = len(chapters)
+    job   = await db.get_download_job(key) or {}
+    done  = set(job.get("done", []))
+    count = 0
+
+    def tick():
+        nonlocal count
+        count += 1
+        if progress:
+            progress(count, total)
+
+    # Already checkpointed chapters come back from the chapter store.
+    by_url = {ch.url: ch for ch in chapters if ch.index in done}
+    if by_url:
+        async for doc in db.iter_chapters(list(by_url)):
+            ch = by_url.pop(doc["_id"])
+            spool.append(Chapter(index=ch.index, title=doc.get("title") or ch.title,
+                                 url=ch.url, blob=doc["blob"]))
+            tick()
+        if done:
+            logger.info(f"Resuming {key}: {count}/{total} chapters from checkpoints")
+
+    pending = [ch for ch in chapters if ch.index not in spool]
+    failed  = []
+    for ch in pending:
+        if not await _fetch_one(scraper, key, ch, spool):
+            failed.append(ch)
+        tick()
+        await asyncio.sleep(delay)
+
+    # Retry failures at the end instead of exporting them empty.
+    for attempt in range(Config.DOWNLOAD_RETRIES):
+        if not failed:
+            break
+        await asyncio.sleep(2 ** attempt)
+        failed = [ch for ch in failed if not await _fetch_one(scraper, key, ch, spool)]
+
+    for ch in failed:
+        spool.append(Chapter(index=ch.index, title=ch.title, url=ch.url,
+                             content=FAILED_PLACEHOLDER))
+    return [ch.index for ch in failed]
+
+
+async def _fetch_one(scraper: NovelScraper, key: str, ch: Chapter, spool: ChapterSpool) -> bool:
+    ch = await scraper.fetch_chapter(ch)
+    ok = ch.has_content
+    if ok:
+        spool.append(ch)
+        await db.save_chapter(ch.url, ch.title, ch.blob)
+        ch.blob = b""
+    await db.checkpoint_chapter(key, ch.index, ok)
+    return ok
+
+
+# ─── Volume runner ────────────────────────────────────────────────────────────
+async def run_download(
+    novel:       Novel,
+    fmt:         str,
+    first:       int,
+    last:        int,
+    user_id:     int,
+    progress:    Callable[[int, int], None],
+    deliver:     Callable[[str, str], Awaitable],
+):
+    """Download chapters [first, last) as volumes of Config.VOLUME_SIZE.
+
+    Each volume is fetched into its own spool, exported and handed to
+    `deliver(path, caption)` before the next one starts, so the first file is
+    out quickly and memory stays bounded by a single volume. When an earlier
+    run of the same range never finished (interrupted, or a worker lost its
+    lease), volumes it already delivered are skipped. `progress` must
+    be cheap and non-blocking (see utils.progress.ProgressReporter.update).
+    Used by the bot process directly and by worker.py.
+    """
+    if fmt not in EXPORTERS:
+        raise DownloadError("Unknown format.")
+
+    total = len(novel.chapters)
+    first = max(first, 0)
+    last  = min(last, total, first + Config.MAX_CHAPTERS_PER_DL)
+    if first >= last:
+        raise DownloadError(f"❌ Chapter out of range. Novel has {total} chapters.")
+
+    # pdf/epub embed the cached, downsized cover; fetched once per job
+    extra = {}
+    if fmt in ("pdf", "epub") and novel.cover_url:
+        extra["cover"] = await covers.get_cover(novel.cover_url)
+
+    bounds = [(lo, min(lo + Config.VOLUME_SIZE, last))
+              for lo in range(first, last, Config.VOLUME_SIZE)]
+    count  = last - first
+
+    run_key  = job_key(novel.url, fmt, first, last) + "|run"
+    previous = await db.get_download_job(run_key)
+    resuming = previous is not None and previous.get("status") != "complete"
+    await db.start_download_job(run_key, novel.url, fmt, user_id)
+
+    for vol_no, (lo, hi) in enumerate(bounds, 1):
+        chapters = novel.chapters[lo:hi]
+        offset   = lo - first
+
+        def vol_progress(done, _total, offset=offset):
+            progress(offset + done, count)
+
+        if len(bounds) > 1:
+            volume = f"Vol. {vol_no} (Ch. {lo + 1}-{hi})"
+        elif (lo, hi) != (0, total):
+            volume = f"Ch. {lo + 1}-{hi}"
+        else:
+            volume = ""
+
+        key = job_key(novel.url, fmt, lo, hi)
+        if resuming and ((await db.get_download_job(key)) or {}).get("status") == "complete":
+            logger.info(f"Resuming {run_key}: {key} was already delivered")
+            vol_progress(hi - lo, hi - lo)
+            continue
+        await db.start_download_job(key, novel.url, fmt, user_id)
+
+        with ChapterSpool() as spool:
+            try:
+                async with NovelScraper(priority=BULK, user=user_id, sticky=key,
+                                        alternates=mirrors.resolver(novel)) as s:
+                    failed = await fetch_job_chapters(
+                        s, key, chapters, spool, progress=vol_progress,
+                        delay=Config.CHAPTER_DELAY,
+                    )
+            except Exception as e:
+                logger.exception(e)
+                await db.finish_download_job(key, "interrupted")
+                raise DownloadError(
+                    f"❌ Download interrupted: {e}\nTap the button again to resume."
+                ) from e
+            finally:
+                if proxies.pool:
+                    proxies.pool.release(key)
+
+            path = None
+            try:
+                # exporters are synchronous: keep the event loop free while they run
+                with span("export"):
+                    path = await asyncio.to_thread(
+                        EXPORTERS[fmt], novel, spool, volume=volume, **extra
+                    )
+                caption = f"📚 <b>{novel.title}</b>\n"
+                caption += f"{volume}\n" if volume else f"{len(chapters)} chapters\n"
+                if failed:
+                    caption += (
+                        f"⚠️ {len(failed)} chapter(s) could not be fetched "
+                        f"(first: {failed[0] + 1}). Download again to retry them."
+                    )
+                with span("send"):
+                    await deliver(path, caption)
+                await db.finish_download_job(key, "partial" if failed else "complete")
+            except Exception as e:
+                logger.exception(e)
+                await db.finish_download_job(key, "interrupted")
+                raise DownloadError(f"❌ Export failed: {e}") from e
+            finally:
+                if path and os.path.exists(path):
+                    os.remove(path)
+
+    await db.finish_download_job(run_key, "complete")
@@ -0,0 +1,179 @@
+"""Streaming EPUB 3 writer.
+
+Chapters are written into the zip as they arrive, so building a book costs
+one chapter of memory plus a (file name, title) pair per chapter; the
+package document, NCX and nav are written last from that metadata.
+"""
+import os
+import re
+import uuid
+import zipfile
+from datetime import datetime
+from html import escape
+from typing import Iterable, Optional
+
+# characters XML 1.0 forbids; scraped text occasionally contains them
+_XML_BAD_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+_CONTAINER = """<?xml version="1.0" encoding="UTF-8"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles>
+    <rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>
+  </rootfiles>
+</container>"""
+
+_CSS = """body { font-family: serif; line-height: 1.5; margin: 0 5%; }
+h2 { text-align: center; margin: 1em 0; }
+p { text-indent: 1.5em; margin: 0 0 .6em; }
+.cover { text-align: center; margin: 0; padding: 0; }
+.cover img { max-width: 100%; max-height: 100%; }"""
+
+_PAGE = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops" xml:lang="{lang}" lang="{lang}">
+<head><meta charset="utf-8"/><title>{title}</title><link rel="stylesheet" type="text/css" href="style.css"/></head>
+<body{body_attrs}>
+{body}
+</body>
+</html>"""
+
+
+def _text(s: str) -> str:
+    return escape(_XML_BAD_RE.sub("", s), quote=False)
+
+
+def _attr(s: str) -> str:
+    return escape(_XML_BAD_RE.sub("", s), quote=True)
+
+
+class EpubWriter:
+    """Write an EPUB 3 file chapter by chapter.
+
+    Usage:
+        with EpubWriter(path, title, author, identifier) as book:
+            book.set_cover(jpeg_bytes)
+            for ch in chapters:
+                book.add_chapter(ch.title, ch.content.split("\\n\\n"))
+
+    If the block raises, the partial file is removed.
+    """
+
+    def __init__(self, path: str, title: str, author: str = "Unknown",
+                 identifier: str = "", language: str = "en"):
+        self.path     = path
+        self.title    = title
+        self.author   = author
+        self.language = language
+        self.uid      = f"urn:uuid:{uuid.uuid5(uuid.NAMESPACE_URL, identifier or title)}"
+
+        self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=6)
+        # the mimetype must come first and be stored uncompressed
+        self._zip.writestr(zipfile.ZipInfo("mimetype"), "application/epub+zip",
+                           compress_type=zipfile.ZIP_STORED)
+        self._zip.writestr("META-INF/container.xml", _CONTAINER)
+        self._zip.writestr("OEBPS/style.css", _CSS)
+
+        self._manifest: list[tuple[str, str, str, str]] = [   # (id, href, media type, properties)
+            ("css", "style.css", "text/css", ""),
+        ]
+        self._spine: list[str]            = []
+        self._toc:   list[tuple[str, str]] = []               # (href, title)
+
+    def _page(self, title: str, body: str, body_attrs: str = "") -> str:
+        return _PAGE.format(lang=self.language, title=_text(title), body=body,
+                            body_attrs=body_attrs)
+
+    def set_cover(self, jpeg: bytes):
+        self._zip.writestr("OEBPS/cover.jpg", jpeg)
+        self._zip.writestr("OEBPS/cover.xhtml", self._page(
+            self.title, f'<div class="cover"><img src="cover.jpg" alt="{_attr(self.title)}"/></div>',
+            ' class="cover"',
+        ))
+        self._manifest += [
+            ("cover-image", "cover.jpg", "image/jpeg", "cover-image"),
+            ("cover", "cover.xhtml", "application/xhtml+xml", ""),
+        ]
+        self._spine.insert(0, "cover")
+
+    def add_chapter(self, title: str, paragraphs: Iterable[str],
+                    heading: Optional[str] = None):
+        """Append one chapter; `title` goes in the TOC, `heading` on the page."""
+        n    = len(self._toc) + 1
+        href = f"chap_{n:05d}.xhtml"
+        body = "\n".join(
+            f"<p>{_text(p.strip())}</p>" for p in paragraphs if p.strip()
+        )
+        self._zip.writestr(
+            f"OEBPS/{href}",
+            self._page(title, f"<h2>{_text(heading or title)}</h2>\n{body}"),
+        )
+        self._manifest.append((f"chap{n}", href, "application/xhtml+xml", ""))
+        self._spine.append(f"chap{n}")
+        self._toc.append((href, title))
+
+    def close(self):
+        """Write nav, NCX and the package document, then finish the zip."""
+        nav = "\n".join(
+            f'<li><a href="{href}">{_text(title)}</a></li>' for href, title in self._toc
+        )
+        self._zip.writestr("OEBPS/nav.xhtml", self._page(
+            self.title,
+            f'<nav epub:type="toc" id="toc"><h1>{_text(self.title)}</h1>\n<ol>\n{nav}\n</ol></nav>',
+        ))
+        self._zip.writestr("OEBPS/toc.ncx", self._ncx())
+        self._zip.writestr("OEBPS/content.opf", self._opf())
+        self._zip.close()
+
+    def _ncx(self) -> str:
+        points = "\n".join(
+            f'<navPoint id="np{i}" playOrder="{i}"><navLabel><text>{_text(title)}</text>'
+            f'</navLabel><content src="{href}"/></navPoint>'
+            for i, (href, title) in enumerate(self._toc, 1)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<ncx xmlns="http://www.daisy.org/z3986/2005/ncx/" version="2005-1">\n'
+            f'<head><meta name="dtb:uid" content="{_attr(self.uid)}"/></head>\n'
+            f'<docTitle><text>{_text(self.title)}</text></docTitle>\n'
+            f'<navMap>\n{points}\n</navMap>\n</ncx>'
+        )
+
+    def _opf(self) -> str:
+        items = [
+            f'<item id="{i}" href="{href}" media-type="{mt}"'
+            + (f' properties="{props}"' if props else "") + "/>"
+            for i, href, mt, props in self._manifest
+        ]
+        items += [
+            '<item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>',
+            '<item id="ncx" href="toc.ncx" media-type="application/x-dtbncx+xml"/>',
+        ]
+        spine    = "\n".join(f'<itemref idref="{i}"/>' for i in self._spine)
+        modified = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="uid">\n'
+            '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">\n'
+            f'<dc:identifier id="uid">{_text(self.uid)}</dc:identifier>\n'
+            f'<dc:title>{_text(self.title)}</dc:title>\n'
+            f'<dc:creator>{_text(self.author)}</dc:creator>\n'
+            f'<dc:language>{_text(self.language)}</dc:language>\n'
+            f'<meta property="dcterms:modified">{modified}</meta>\n'
+            + ('<meta name="cover" content="cover-image"/>\n' if "cover" in self._spine else "")
+            + '</metadata>\n'
+            '<manifest>\n' + "\n".join(items) + '\n</manifest>\n'
+            f'<spine toc="ncx">\n{spine}\n</spine>\n</package>'
+        )
+
+    def __enter__(self) -> "EpubWriter":
+        return self
+
+    def __exit__(self, exc_type, *_):
+        if exc_type is None:
+            self.close()
+            return
+        self._zip.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
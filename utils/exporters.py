@@ -1,22 +1,33 @@
-"""Export chapters to TXT, PDF, and EPUB formats."""
+"""Export chapters to TXT, PDF, and EPUB formats.
+
+Every exporter accepts an optional `progress(done, total)` callable, e.g.
+`utils.progress.ProgressReporter.update`; it is called once per chapter,
+possibly from a worker thread.
+"""
+import io
 import os
 import re
 import tempfile
-from typing import List
+from typing import Callable, Iterable, Optional
 
+from config import Config
 from scraper import Chapter, Novel
+from utils.epub import EpubWriter
 
 
-def export_txt(novel: Novel, chapters: List[Chapter]) -> str:
-    """Write novel to a temp TXT file, return path."""
+def export_txt(
+    novel: Novel, chapters: Iterable[Chapter], volume: str = "",
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> str:
+    """Write novel (or one volume of it) to a temp TXT file, return path."""
     tmp = tempfile.NamedTemporaryFile(
         mode="w", suffix=".txt", delete=False,
         encoding="utf-8",
-        prefix=f"{_safe(novel.title)}_",
+        prefix=f"{_file_stem(novel, volume)}_",
     )
-    tmp.write(f"{novel.title}\n")
+    tmp.write(f"{_book_title(novel, volume)}\n")
     tmp.write("=" * 60 + "\n\n")
-    for ch in chapters:
+    for ch in _tracked(chapters, progress):
         tmp.write(f"Chapter {ch.index + 1}: {ch.title}\n")
         tmp.write("-" * 40 + "\n")
         tmp.write(ch.content + "\n\n")
@@ -24,94 +35,212 @@ def export_txt(novel: Novel, chapters: List[Chapter]) -> str:
     return tmp.name
 
 
-def export_pdf(novel: Novel, chapters: List[Chapter]) -> str:
-    """Write novel to a temp PDF file, return path."""
+def export_pdf(
+    novel: Novel, chapters: Iterable[Chapter], volume: str = "",
+    progress: Optional[Callable[[int, int], None]] = None,
+    cover: Optional[bytes] = None,
+) -> str:
+    """Write novel (or one volume of it) to a temp PDF file, return path.
+
+    Text is set in the Unicode TTF from `_pdf_font` (embedded once, subset on
+    output) or core Helvetica when none is installed. Lines are broken with
+    cached glyph widths and drawn directly instead of through multi_cell;
+    chapters flow on without forced page breaks and get an outline entry.
+    """
     from fpdf import FPDF
 
     pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.set_auto_page_break(False)
+    pdf.set_margins(15, 15)
+    family, bold, clean = _pdf_font(pdf)
+    body = _LineBreaker(pdf, family, "", 11)
+    head = _LineBreaker(pdf, family, bold, 14)
     pdf.add_page()
 
     # Title page
-    pdf.set_font("Helvetica", "B", 20)
-    pdf.cell(0, 10, _truncate(novel.title, 80), ln=True, align="C")
+    pdf.set_font(family, bold, 20)
+    pdf.cell(0, 10, clean(_truncate(novel.title, 80)), new_x="LMARGIN", new_y="NEXT", align="C")
+    if volume:
+        pdf.set_font(family, "", 14)
+        pdf.cell(0, 10, clean(volume), new_x="LMARGIN", new_y="NEXT", align="C")
     pdf.ln(10)
+    if cover:
+        try:
+            pdf.image(io.BytesIO(cover), x=(pdf.w - 100) / 2, w=100)
+        except Exception:
+            pass
+    pdf.add_page()
 
-    for ch in chapters:
-        pdf.add_page()
-        pdf.set_font("Helvetica", "B", 14)
-        title_line = f"Chapter {ch.index + 1}: {_truncate(ch.title, 80)}"
-        pdf.cell(0, 10, title_line, ln=True)
-        pdf.ln(4)
-        pdf.set_font("Helvetica", size=11)
-        for para in ch.content.split("\n\n"):
-            para = para.strip()
-            if para:
-                try:
-                    pdf.multi_cell(0, 7, para)
-                    pdf.ln(3)
-                except Exception:
-                    pass
+    width = pdf.w - pdf.l_margin - pdf.r_margin
+    for ch in _tracked(chapters, progress):
+        title = clean(f"Chapter {ch.index + 1}: {_truncate(ch.title, 80)}")
+        heading = head.wrap(title, width)
+        # keep a heading together with the first lines of its text
+        if pdf.y > pdf.t_margin:
+            pdf.set_y(pdf.y + 8)
+        if pdf.y + len(heading) * head.line_h + 3 * body.line_h > pdf.h - pdf.b_margin:
+            pdf.add_page()
+        pdf.start_section(title)
+        head.draw(heading, after=4)
+
+        # break the whole chapter first, then draw it in one pass
+        batch = [body.wrap(para, width) for para in clean(ch.content).split("\n\n") if para.strip()]
+        for lines in batch:
+            body.draw(lines, after=2)
 
     path = os.path.join(
         tempfile.gettempdir(),
-        f"{_safe(novel.title)}.pdf",
+        f"{_file_stem(novel, volume)}.pdf",
     )
     pdf.output(path)
     return path
 
 
-def export_epub(novel: Novel, chapters: List[Chapter]) -> str:
-    """Write novel to a temp EPUB file, return path."""
-    import ebooklib
-    from ebooklib import epub
-
-    book = epub.EpubBook()
-    book.set_identifier("zero-novel-scraper")
-    book.set_title(novel.title)
-    book.set_language("en")
-    book.add_author(novel.author or "Unknown")
-
-    spine = ["nav"]
-    toc   = []
-
-    for ch in chapters:
-        c = epub.EpubHtml(
-            title=ch.title,
-            file_name=f"chap_{ch.index:05d}.xhtml",
-            lang="en",
-        )
-        body = "".join(
-            f"<p>{para}</p>"
-            for para in ch.content.split("\n\n")
-            if para.strip()
-        )
-        c.set_content(
-            f"<html><body>"
-            f"<h2>Chapter {ch.index + 1}: {ch.title}</h2>"
-            f"{body}"
-            f"</body></html>"
-        )
-        book.add_item(c)
-        spine.append(c)
-        toc.append(epub.Link(c.file_name, ch.title, f"chap_{ch.index}"))
-
-    book.toc   = toc
-    book.spine = spine
-    book.add_item(epub.EpubNcx())
-    book.add_item(epub.EpubNav())
-
+# Unicode fonts looked for when Config.PDF_FONT is unset; the DejaVu pair
+# shipped in fonts/ comes first, so hosts without system fonts still get it
+_FONT_CANDIDATES = (
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fonts", "DejaVuSans.ttf"),
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+)
+
+
+def _pdf_font(pdf) -> tuple[str, str, Callable[[str], str]]:
+    """(family, heading style, text filter) for the best font available."""
+    path = next((p for p in (Config.PDF_FONT, *_FONT_CANDIDATES) if p and os.path.isfile(p)), None)
+    if not path:
+        # core fonts are Latin-1 only: degrade characters instead of losing paragraphs
+        table = _GlyphFilter(lambda cp: cp < 256)
+        return "Helvetica", "B", lambda s: s.translate(table)
+
+    pdf.add_font("Body", "", path)
+    cmaps = [pdf.fonts["body"].cmap]
+    style = ""
+    bold  = path.replace(".ttf", "-Bold.ttf")
+    if os.path.isfile(bold):
+        pdf.add_font("Body", "B", bold)
+        cmaps.append(pdf.fonts["bodyB"].cmap)
+        style = "B"
+    table = _GlyphFilter(lambda cp: all(cp in cmap for cmap in cmaps))
+    return "Body", style, lambda s: s.translate(table)
+
+
+class _GlyphFilter(dict):
+    """str.translate table built on demand: control characters are dropped and
+    characters the font cannot draw become "?"."""
+
+    def __init__(self, covered: Callable[[int], bool]):
+        super().__init__()
+        self._covered = covered
+
+    def __missing__(self, cp: int):
+        if cp in (9, 10):
+            out = cp
+        elif cp < 32:
+            out = None
+        else:
+            out = cp if self._covered(cp) else ord("?")
+        self[cp] = out
+        return out
+
+
+class _LineBreaker:
+    """Greedy word wrap with per-character widths measured once per font/size."""
+
+    def __init__(self, pdf, family: str, style: str, size: float):
+        self.pdf    = pdf
+        self.font   = (family, style, size)
+        self.line_h = size * 0.55          # mm
+        self._cw: dict[str, float] = {}
+
+    def _width(self, text: str) -> float:
+        cw, total = self._cw, 0.0
+        for c in text:
+            w = cw.get(c)
+            if w is None:
+                w = cw[c] = self.pdf.get_string_width(c)
+            total += w
+        return total
+
+    def wrap(self, text: str, width: float) -> list[str]:
+        self.pdf.set_font(*self.font)
+        space = self._width(" ")
+        lines, cur, cur_w = [], [], 0.0
+        for word in text.split():
+            w = self._width(word)
+            if cur and cur_w + space + w > width:
+                lines.append(" ".join(cur))
+                cur, cur_w = [], 0.0
+            if w > width:                  # a URL or unbroken run: split by characters
+                part, part_w = "", 0.0
+                for c in word:
+                    c_w = self._cw[c]
+                    if part and part_w + c_w > width:
+                        lines.append(part)
+                        part, part_w = "", 0.0
+                    part, part_w = part + c, part_w + c_w
+                word, w = part, part_w
+            cur_w = cur_w + space + w if cur else w
+            cur.append(word)
+        if cur:
+            lines.append(" ".join(cur))
+        return lines
+
+    def draw(self, lines: list[str], after: float = 0.0):
+        pdf = self.pdf
+        pdf.set_font(*self.font)
+        bottom = pdf.h - pdf.b_margin
+        for line in lines:
+            if pdf.y + self.line_h > bottom:
+                pdf.add_page()
+            pdf.text(pdf.l_margin, pdf.y + self.line_h * 0.8, line)
+            pdf.set_y(pdf.y + self.line_h)
+        pdf.set_y(pdf.y + after)
+
+
+def export_epub(
+    novel: Novel, chapters: Iterable[Chapter], volume: str = "",
+    progress: Optional[Callable[[int, int], None]] = None,
+    cover: Optional[bytes] = None,
+) -> str:
+    """Write novel (or one volume of it) to a temp EPUB file, return path.
+
+    Chapters are streamed into the zip one at a time (see utils.epub)."""
     path = os.path.join(
         tempfile.gettempdir(),
-        f"{_safe(novel.title)}.epub",
+        f"{_file_stem(novel, volume)}.epub",
     )
-    epub.write_epub(path, book)
+    with EpubWriter(path, _book_title(novel, volume), novel.author or "Unknown",
+                    identifier=f"zero-novel-scraper:{novel.url}:{volume}") as book:
+        if cover:
+            book.set_cover(cover)
+        for ch in _tracked(chapters, progress):
+            book.add_chapter(ch.title, ch.content.split("\n\n"),
+                             heading=f"Chapter {ch.index + 1}: {ch.title}")
     return path
 
 
 # ─── Helpers ─────────────────────────────────────────────────────────────────
+def _tracked(chapters: Iterable[Chapter], progress) -> Iterable[Chapter]:
+    if progress is None:
+        yield from chapters
+        return
+    total = len(chapters) if hasattr(chapters, "__len__") else 0
+    for i, ch in enumerate(chapters, 1):
+        yield ch
+        progress(i, total)
+
+def _book_title(novel: Novel, volume: str) -> str:
+    return f"{novel.title} - {volume}" if volume else novel.title
+
 def _safe(name: str) -> str:
-    return re.sub(r'[^\w\s-]', '', name).strip().replace(" ", "_")[:50]
+    return re.sub(r'[^\w\s-]', '', name).strip().replace(" ", "_")
+
+def _file_stem(novel: Novel, volume: str) -> str:
+    # the title is cut, never the volume label, so volumes of a long title don't collide
+    stem = _safe(novel.title)[:50] or "novel"
+    return f"{stem}_{_safe(volume)}" if volume else stem
 
 def _truncate(text: str, n: int) -> str:
     return text[:n] + "…" if len(text) > n else text
@@ -0,0 +1,143 @@
+"""Force-subscription membership checks with a TTL cache.
+
+Members are cached for FORCE_SUB_TTL, non-members (negative results) for the
+much shorter FORCE_SUB_NEG_TTL so a fresh join is noticed quickly even
+without a join event. Users known to be in every channel take a single dict
+lookup per message, until the earliest of their per-channel results
+expires. A check that errors lets the user through for FORCE_SUB_NEG_TTL
+only.
+
+Both caches are LRUs capped at FORCE_SUB_CACHE_SIZE entries; a background
+task drops expired entries every FORCE_SUB_SWEEP seconds.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from pyrogram import Client
+from pyrogram.enums import ChatMemberStatus
+from pyrogram.errors import UserNotParticipant
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_NOT_MEMBER = (ChatMemberStatus.LEFT, ChatMemberStatus.BANNED)
+
+_cache: "OrderedDict[tuple[int, str], tuple[bool, float]]" = OrderedDict()   # (user, channel) → (member, expires)
+_verified: "OrderedDict[int, float]" = OrderedDict()                         # user → all-channels-OK expiry
+_sweeper: Optional[asyncio.Task] = None
+
+_stats = {"checks": 0, "fast": 0, "hits": 0, "api_calls": 0, "since": time.monotonic()}
+
+
+async def missing_channels(client: Client, user_id: int) -> list[dict]:
+    """Channels from Config.FORCE_SUB_CHANNELS the user has not joined."""
+    _stats["checks"] += 1
+    _start_sweeper()
+    now = time.monotonic()
+    if _verified.get(user_id, 0) > now:
+        _stats["fast"] += 1
+        _verified.move_to_end(user_id)
+        return []
+
+    missing, expires = [], now + Config.FORCE_SUB_TTL
+    for ch in Config.FORCE_SUB_CHANNELS:
+        ok, until = await _is_member(client, user_id, ch["id"], now)
+        expires = min(expires, until)
+        if not ok:
+            missing.append(ch)
+    if not missing:
+        # never trust the pass longer than its shortest-lived part (e.g. a failed check)
+        _put(_verified, user_id, expires)
+    return missing
+
+
+async def _is_member(client: Client, user_id: int, channel: str, now: float) -> tuple[bool, float]:
+    """(member, until when the answer holds)."""
+    key = (user_id, channel)
+    hit = _cache.get(key)
+    if hit and hit[1] > now:
+        _stats["hits"] += 1
+        _cache.move_to_end(key)
+        return hit
+
+    _stats["api_calls"] += 1
+    try:
+        member = await client.get_chat_member(channel, user_id)
+        ok = member.status not in _NOT_MEMBER
+    except UserNotParticipant:
+        ok = False
+    except Exception as e:
+        # misconfigured channel / bot not admin: don't lock everyone out
+        logger.warning(f"Force-sub check failed for {channel}: {e}")
+        result = (True, now + Config.FORCE_SUB_NEG_TTL)
+        _put(_cache, key, result)
+        return result
+
+    ttl = Config.FORCE_SUB_TTL if ok else Config.FORCE_SUB_NEG_TTL
+    result = (ok, now + ttl)
+    _put(_cache, key, result)
+    return result
+
+
+def _put(cache: OrderedDict, key, value):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > Config.FORCE_SUB_CACHE_SIZE:
+        cache.popitem(last=False)             # least recently used
+
+
+def _sweep(now: float):
+    for key in [k for k, (_, exp) in _cache.items() if exp <= now]:
+        del _cache[key]
+    for uid in [u for u, exp in _verified.items() if exp <= now]:
+        del _verified[uid]
+
+
+async def _sweep_forever():
+    while True:
+        await asyncio.sleep(Config.FORCE_SUB_SWEEP)
+        _sweep(time.monotonic())
+
+
+def _start_sweeper():
+    global _sweeper
+    if _sweeper is None or _sweeper.done():
+        _sweeper = asyncio.get_running_loop().create_task(_sweep_forever())
+
+
+def invalidate(user_id: int, channel: str | None = None):
+    """Forget cached results for a user (e.g. after a join/leave event)."""
+    _verified.pop(user_id, None)
+    for ch in Config.FORCE_SUB_CHANNELS:
+        if channel is None or ch["id"] == channel:
+            _cache.pop((user_id, ch["id"]), None)
+
+
+def channel_for_chat(chat) -> str | None:
+    """Map a Telegram chat to its configured force-sub channel id."""
+    keys = {str(chat.id)}
+    if chat.username:
+        keys.add(f"@{chat.username}".lower())
+    for ch in Config.FORCE_SUB_CHANNELS:
+        if str(ch["id"]).lower() in keys:
+            return ch["id"]
+    return None
+
+
+def stats() -> dict:
+    elapsed = max(time.monotonic() - _stats["since"], 1e-9)
+    checks  = _stats["checks"]
+    lookups = _stats["hits"] + _stats["api_calls"]
+    return {
+        "checks":     checks,
+        "check_rate": checks / elapsed,                    # per second
+        "fast_path":  _stats["fast"] / checks if checks else 0.0,
+        "hit_ratio":  (_stats["fast"] + _stats["hits"]) / (_stats["fast"] + lookups)
+                      if (_stats["fast"] + lookups) else 0.0,
+        "api_calls":  _stats["api_calls"],
+        "cached":     len(_cache),
+    }
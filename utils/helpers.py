@@ -1,9 +1,11 @@
+import asyncio
 import logging
+import random
 import time
-from typing import Optional
+from collections import deque
+from typing import Awaitable, Callable, Optional
 
 import aiohttp
-from pyrogram.types import Message
 
 from config import Config
 from script import script
@@ -16,33 +18,102 @@ def make_progress_bar(done: int, total: int, width: int = 20) -> str:
     return "█" * filled + "░" * (width - filled)
 
 
-async def edit_progress(msg: Message, done: int, total: int, start_ts: float):
+def progress_text(done: int, total: int, start_ts: float) -> str:
     pct     = int(done * 100 / total) if total else 0
     elapsed = time.time() - start_ts
     eta_sec = int((elapsed / done) * (total - done)) if done else 0
     eta_str = f"{eta_sec//60}m {eta_sec%60}s" if eta_sec >= 60 else f"{eta_sec}s"
     bar     = make_progress_bar(done, total)
-    text    = script.DOWNLOAD_PROGRESS.format(
+    return script.DOWNLOAD_PROGRESS.format(
         bar=bar, done=done, total=total, pct=pct, eta=eta_str
     )
-    try:
-        await msg.edit_text(text)
-    except Exception:
-        pass
 
 
-async def fetch_random_wallpaper() -> Optional[str]:
+async def fetch_random_wallpaper(session: Optional[aiohttp.ClientSession] = None) -> Optional[str]:
     try:
-        async with aiohttp.ClientSession() as s:
-            async with s.get(Config.WALLPAPER_API, timeout=aiohttp.ClientTimeout(total=10)) as r:
-                if r.status == 200:
-                    data = await r.json(content_type=None)
-                    return data.get("url") or data.get("image") or str(r.url)
+        if session is None:
+            async with aiohttp.ClientSession() as s:
+                return await fetch_random_wallpaper(s)
+        async with session.get(Config.WALLPAPER_API, timeout=aiohttp.ClientTimeout(total=10)) as r:
+            if r.status == 200:
+                data = await r.json(content_type=None)
+                return data.get("url") or data.get("image") or str(r.url)
     except Exception as e:
         logger.warning(f"Wallpaper fetch failed: {e}")
     return None
 
 
+class WallpaperPool:
+    """Background-refilled pool of wallpapers so /start never waits on the API.
+
+    Fresh URLs are topped up by one long-lived task over a single session;
+    `take()` is synchronous and returns immediately. Telegram file_ids of
+    wallpapers we already sent are kept too and reused once URLs run dry.
+    """
+
+    def __init__(self, size: int = 20):
+        self.size      = size
+        self._urls     = deque()
+        self._file_ids = deque(maxlen=size * 5)
+        self._wake     = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start (or restart) the refill task; called at bot startup so the
+        pool is already full when the first /start arrives."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._refill())
+
+    def take(self) -> str:
+        self.start()
+        self._wake.set()
+        if self._urls:
+            return self._urls.popleft()
+        if self._file_ids:
+            return random.choice(self._file_ids)
+        return Config.WELCOME_IMAGE
+
+    def remember(self, file_id: str):
+        self._file_ids.append(file_id)
+
+    async def _refill(self):
+        backoff = 1
+        async with aiohttp.ClientSession() as session:
+            while True:
+                if len(self._urls) >= self.size:
+                    self._wake.clear()
+                    await self._wake.wait()
+                    continue
+                url = await fetch_random_wallpaper(session)
+                if url and url not in self._urls:
+                    self._urls.append(url)
+                    backoff = 1
+                else:
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 60)
+
+
+wallpapers = WallpaperPool()
+
+
+def run_later(delay: float, coro_fn: Callable[[], Awaitable]) -> asyncio.Task:
+    """Schedule `coro_fn()` after `delay` seconds without blocking the caller."""
+    async def runner():
+        await asyncio.sleep(delay)
+        try:
+            await coro_fn()
+        except Exception as e:
+            logger.warning(f"Scheduled task failed: {e}")
+
+    task = asyncio.get_running_loop().create_task(runner())
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+    return task
+
+
+_background: set = set()    # strong refs so scheduled tasks aren't GC'd
+
+
 def split_text(text: str, limit: int = 4000) -> list[str]:
     parts = []
     while len(text) > limit:
@@ -0,0 +1,119 @@
+"""Bot-side half of the worker queue.
+
+Downloads are queued in `jobs_col` for worker.py; this module uploads the
+files workers leave in the outbox and mirrors job progress into the user's
+progress message.
+"""
+import asyncio
+import logging
+import os
+import tempfile
+from calendar import timegm
+
+from pyrogram import Client
+from pyrogram.errors import FloodWait
+
+import database as db
+from config import Config
+from utils.helpers import progress_text
+
+logger = logging.getLogger(__name__)
+
+EXPIRED_TXT = "❌ Download failed: it was interrupted too many times. Please try again."
+
+
+async def enqueue_download(chat_id: int, progress_msg_id: int, user_id: int,
+                           url: str, fmt: str, first: int, last: int):
+    await db.enqueue_job("download", {
+        "chat_id":     chat_id,
+        "progress_id": progress_msg_id,
+        "user_id":     user_id,
+        "url":         url,
+        "fmt":         fmt,
+        "first":       first,
+        "last":        last,
+    })
+
+
+async def dispatch_results(client: Client):
+    """Run forever: upload finished files and keep progress messages current."""
+    shown: dict = {}       # job id → last progress shown
+    while True:
+        try:
+            await db.fail_expired_jobs(Config.JOB_MAX_ATTEMPTS, EXPIRED_TXT)
+            await _send_outbox(client)
+            await _sync_jobs(client, shown)
+        except Exception as e:
+            logger.warning(f"Job dispatcher error: {e}")
+        await asyncio.sleep(Config.JOB_POLL)
+
+
+async def _send_outbox(client: Client):
+    async for doc in db.iter_outbox():
+        job = await db.jobs_col.find_one({"_id": doc["job_id"]}, {"payload": 1})
+        if not job:
+            await db.drop_result(doc)
+            continue
+        try:
+            await _send_result(client, job["payload"]["chat_id"], doc)
+        except FloodWait as e:
+            await asyncio.sleep(e.value)
+            return                    # retried on the next poll, not counted
+        except Exception as e:
+            # one bad entry (user blocked the bot, file gone…) must not hold up the rest
+            attempts = await db.result_failed(doc, str(e))
+            if attempts >= Config.OUTBOX_MAX_ATTEMPTS:
+                logger.warning(f"Dropping result {doc['filename']} after {attempts} attempts: {e}")
+                await db.drop_result(doc)
+            else:
+                logger.info(f"Result {doc['filename']} not sent (attempt {attempts}): {e}")
+            continue
+        await db.drop_result(doc)
+
+
+async def _send_result(client: Client, chat_id: int, doc: dict):
+    path = os.path.join(tempfile.mkdtemp(prefix="outbox_"), doc["filename"])
+    try:
+        with open(path, "wb") as f:
+            await db.download_result_file(doc["file_id"], f)
+        await client.send_document(chat_id, path, caption=doc["caption"])
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+        os.rmdir(os.path.dirname(path))
+
+
+async def _sync_jobs(client: Client, shown: dict):
+    async for job in db.iter_active_jobs():
+        payload = job["payload"]
+        chat_id, msg_id = payload["chat_id"], payload["progress_id"]
+
+        if job["status"] == "running":
+            prog = job.get("progress") or {}
+            done, total = prog.get("done", 0), prog.get("total", 0)
+            if total and shown.get(job["_id"]) != done:
+                shown[job["_id"]] = done
+                started = job.get("started") or job["created"]
+                try:
+                    await client.edit_message_text(
+                        chat_id, msg_id,
+                        progress_text(done, total, _ts(started)),
+                    )
+                except Exception:
+                    pass
+            continue
+
+        # finished: files are already out of the outbox, close the progress message
+        shown.pop(job["_id"], None)
+        try:
+            if job["status"] == "failed":
+                await client.edit_message_text(chat_id, msg_id, job.get("message") or "❌ Download failed.")
+            else:
+                await client.delete_messages(chat_id, msg_id)
+        except Exception:
+            pass
+        await db.mark_job_notified(job["_id"])
+
+
+def _ts(dt) -> float:
+    return timegm(dt.utctimetuple()) + dt.microsecond / 1e6
@@ -1,7 +1,20 @@
 from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 
-def novel_main_keyboard(novel_url: str, total_chapters: int) -> InlineKeyboardMarkup:
+def _read_cb(novel_url: str, index: int, page: int = 0) -> str:
+    # page 0 is cb_read's default, so leave it off (callback data is capped at 64 bytes)
+    return f"read|{novel_url}|{index}|{page}" if page else f"read|{novel_url}|{index}"
+
+
+def follow_button(novel_url: str, following: bool) -> InlineKeyboardButton:
+    if following:
+        return InlineKeyboardButton("🔕 Unfollow", callback_data=f"unf|{novel_url}")
+    return InlineKeyboardButton("🔔 Follow", callback_data=f"fol|{novel_url}")
+
+
+def novel_main_keyboard(
+    novel_url: str, total_chapters: int, following: bool = False
+) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup([
         [
             InlineKeyboardButton("📖 First Chapter",  callback_data=f"read|{novel_url}|0"),
@@ -9,6 +22,7 @@ def novel_main_keyboard(novel_url: str, total_chapters: int) -> InlineKeyboardMa
         ],
         [
             InlineKeyboardButton("🔢 Choose Chapter", callback_data=f"choose|{novel_url}"),
+            follow_button(novel_url, following),
         ],
         [
             InlineKeyboardButton("📄 TXT",  callback_data=f"dl|txt|{novel_url}"),
@@ -18,14 +32,46 @@ def novel_main_keyboard(novel_url: str, total_chapters: int) -> InlineKeyboardMa
     ])
 
 
-def chapter_nav_keyboard(novel_url: str, current: int, total: int) -> InlineKeyboardMarkup:
+def new_chapters_keyboard(novel_url: str, first_new: int) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup([[
+        InlineKeyboardButton("📖 Read New Chapter", callback_data=_read_cb(novel_url, first_new)),
+        follow_button(novel_url, True),
+    ]])
+
+
+def download_options_keyboard(
+    novel_url: str, fmt: str, count: int, volumes: int
+) -> InlineKeyboardMarkup:
+    label = f"📦 All {count} Chapters" + (f" ({volumes} volumes)" if volumes > 1 else "")
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton(label,             callback_data=f"dla|{fmt}|{novel_url}")],
+        [InlineKeyboardButton("🔢 Choose Range", callback_data=f"dlr|{fmt}|{novel_url}")],
+        [InlineKeyboardButton("❌ Close",        callback_data="close")],
+    ])
+
+
+def chapter_nav_keyboard(
+    novel_url: str, current: int, total: int, page: int = 0, pages: int = 1
+) -> InlineKeyboardMarkup:
+    rows = []
+    if pages > 1:
+        page_row = []
+        if page > 0:
+            page_row.append(InlineKeyboardButton(
+                f"◀️ Page {page}", callback_data=_read_cb(novel_url, current, page - 1)))
+        if page < pages - 1:
+            page_row.append(InlineKeyboardButton(
+                f"Page {page+2} ▶️", callback_data=_read_cb(novel_url, current, page + 1)))
+        rows.append(page_row)
+
     row = []
     if current > 0:
-        row.append(InlineKeyboardButton("⬅️ Prev", callback_data=f"read|{novel_url}|{current-1}"))
+        row.append(InlineKeyboardButton("⬅️ Prev", callback_data=_read_cb(novel_url, current - 1)))
     row.append(InlineKeyboardButton("❌ Close", callback_data="close"))
     if current < total - 1:
-        row.append(InlineKeyboardButton("Next ➡️", callback_data=f"read|{novel_url}|{current+1}"))
-    return InlineKeyboardMarkup([row])
+        row.append(InlineKeyboardButton("Next ➡️", callback_data=_read_cb(novel_url, current + 1)))
+    rows.append(row)
+    return InlineKeyboardMarkup(rows)
 
 
 def settings_keyboard(settings: dict) -> InlineKeyboardMarkup:
@@ -48,3 +94,9 @@ def search_results_keyboard(results: list) -> InlineKeyboardMarkup:
         short = r.title[:35] + "…" if len(r.title) > 35 else r.title
         buttons.append([InlineKeyboardButton(f"📚 {short}", callback_data=f"novel|{r.url}")])
     return InlineKeyboardMarkup(buttons)
+
+
+def force_sub_keyboard(channels: list) -> InlineKeyboardMarkup:
+    buttons = [[InlineKeyboardButton(f"📢 Join {ch['name']}", url=ch["link"])] for ch in channels]
+    buttons.append([InlineKeyboardButton("✅ I Joined", callback_data="fsub_check")])
+    return InlineKeyboardMarkup(buttons)
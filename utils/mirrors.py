@@ -0,0 +1,130 @@
+"""Copies of a novel on other sites, used as hedge / failover targets.
+
+Once a novel's own site starts failing or slowing down (scraper.struggling),
+the other search sources are searched for the same title in the background,
+and up to MIRROR_MAX matches are kept with their TOCs. The mirror URLs are
+stored on the novel's document and the TOCs go through novel_store, so the
+search is done once per MIRROR_RECHECK, not once per restart. A chapter is
+matched on a mirror near the same index, by its chapter number ("Chapter N",
+else the last number in the title, so "Volume 2 Chapter 15" is 15) or,
+without one, by its full normalised title, so a mirror with an extra
+prologue still lines up.
+"""
+import asyncio
+import logging
+import re
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+import database as db
+from config import Config
+from scraper import Chapter, Novel, _host, search_novels, struggling
+from utils import novel_store
+from utils.scheduler import BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+_MAX_NOVELS = 500          # novels whose mirrors are kept in memory
+_WINDOW     = 3            # chapters either side of the index searched on a mirror
+
+_mirrors: "OrderedDict[str, list[Novel]]" = OrderedDict()   # novel url → mirror novels
+_searching: set[str] = set()
+_tasks: set[asyncio.Task] = set()
+
+_CHAPTER_RE = re.compile(r"\b(?:chapter|chap|ch|episode|ep)\.?\s*(\d+)", re.I)
+_NUM_RE     = re.compile(r"\d+")
+_WORD_RE    = re.compile(r"\W+")
+
+
+def _norm(title: str) -> str:
+    return _WORD_RE.sub(" ", title.lower()).strip()
+
+
+def _chapter_key(title: str):
+    """Chapter number if the title has one, else the normalised title."""
+    title = title or ""
+    m = _CHAPTER_RE.search(title)
+    if m:
+        return int(m.group(1))
+    nums = _NUM_RE.findall(title)
+    if nums:
+        return int(nums[-1])
+    return _norm(title) or None
+
+
+def _match(mirror: Novel, chapter: Chapter) -> Optional[str]:
+    key = _chapter_key(chapter.title)
+    if key is None:
+        return None
+    chapters = mirror.chapters
+    for off in range(_WINDOW + 1):
+        for j in {chapter.index - off, chapter.index + off}:
+            if 0 <= j < len(chapters) and _chapter_key(chapters[j].title) == key:
+                return chapters[j].url
+    return None
+
+
+def resolver(novel: Novel) -> Optional[Callable[[Chapter], Optional[str]]]:
+    """`alternates` callback for NovelScraper: a mirror URL for a chapter."""
+    if not Config.MIRRORS:
+        return None
+
+    def alternate(chapter: Chapter) -> Optional[str]:
+        mirrors = _mirrors.get(novel.url)
+        if mirrors is None:
+            if struggling(_host(novel.url)):
+                _search_later(novel)
+            return None
+        _mirrors.move_to_end(novel.url)
+        for mirror in mirrors:
+            url = _match(mirror, chapter)
+            if url:
+                return url
+        return None
+
+    return alternate
+
+
+def _search_later(novel: Novel):
+    if novel.url in _searching:
+        return
+    _searching.add(novel.url)
+    task = asyncio.create_task(_search(novel))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def _search(novel: Novel):
+    try:
+        doc  = await db.get_novel_mirrors(novel.url)
+        urls = doc["mirrors"] if doc else None
+        if urls is None or datetime.utcnow() - doc["mirrors_at"] > timedelta(seconds=Config.MIRROR_RECHECK):
+            urls = await _find(novel)
+            await db.save_novel_mirrors(novel.url, urls)
+
+        mirrors = []
+        for url in urls:
+            mirror = await novel_store.load(url, priority=BACKGROUND)
+            if mirror and mirror.chapters:
+                mirrors.append(mirror)
+        _mirrors[novel.url] = mirrors
+        while len(_mirrors) > _MAX_NOVELS:
+            _mirrors.popitem(last=False)
+        logger.info(f"Mirrors for {novel.title}: {[m.url for m in mirrors] or 'none'}")
+    except Exception as e:
+        logger.warning(f"Mirror search failed for {novel.url}: {e}")
+    finally:
+        _searching.discard(novel.url)
+
+
+async def _find(novel: Novel) -> list[str]:
+    """Same-title novels on other sites, by search."""
+    title, home = _norm(novel.title), _host(novel.url)
+    found = []
+    for r in await search_novels(novel.title, priority=BACKGROUND, every_source=True):
+        if _norm(r.title) == title and _host(r.url) != home and r.url not in found:
+            found.append(r.url)
+            if len(found) >= Config.MIRROR_MAX:
+                break
+    return found
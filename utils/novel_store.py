@@ -0,0 +1,75 @@
+"""Scraped novels persisted in `novels_col`.
+
+Each novel's metadata and compressed TOC are stored under its URL with a
+refreshed-at timestamp, so a callback on an old message after a restart is
+answered from one database read instead of a full TOC scrape. A stored TOC
+older than Config.TOC_TTL is still served, and refreshed in the background.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+import database as db
+from config import Config
+from scraper import ChapterList, Novel, NovelScraper
+from utils.scheduler import BACKGROUND, READ
+
+logger = logging.getLogger(__name__)
+
+_refreshing: set[str] = set()            # urls with a background refresh in flight
+_tasks: set[asyncio.Task] = set()
+
+
+async def save(novel: Novel):
+    """Persist a freshly scraped novel's TOC with its metadata."""
+    if novel.chapters:
+        # empty fields (a failed parse) never overwrite what we already have
+        meta = {k: v for k, v in (("title", novel.title), ("author", novel.author),
+                                  ("description", novel.description),
+                                  ("cover_url", novel.cover_url)) if v}
+        await db.save_novel_toc(novel.url, novel.chapters.to_blob(), len(novel.chapters), meta)
+
+
+async def load(url: str, user_id: int = 0, priority: int = READ) -> Optional[Novel]:
+    """Stored novel if we have one (refreshing it when stale), else scrape it."""
+    doc = await db.get_novel_doc(url)
+    if doc:
+        novel = Novel(
+            title=doc.get("title", ""),
+            url=url,
+            cover_url=doc.get("cover_url"),
+            description=doc.get("description", ""),
+            author=doc.get("author", ""),
+            chapters=ChapterList.from_blob(doc["toc"]),
+        )
+        if datetime.utcnow() - doc["toc_at"] > timedelta(seconds=Config.TOC_TTL):
+            _refresh_later(url)
+        return novel
+
+    async with NovelScraper(priority=priority, user=user_id) as s:
+        novel = await s.scrape_novel(url)
+    if novel and novel.chapters:
+        await save(novel)
+    return novel
+
+
+def _refresh_later(url: str):
+    if url in _refreshing:
+        return
+    _refreshing.add(url)
+    task = asyncio.create_task(_refresh(url))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def _refresh(url: str):
+    try:
+        async with NovelScraper(priority=BACKGROUND) as s:
+            novel = await s.scrape_novel(url)
+        if novel and novel.chapters:
+            await save(novel)
+    except Exception as e:
+        logger.warning(f"TOC refresh failed {url}: {e}")
+    finally:
+        _refreshing.discard(url)
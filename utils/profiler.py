@@ -0,0 +1,88 @@
+"""On-demand sampling profiler.
+
+A daemon thread snapshots every thread's Python stack with
+sys._current_frames() every few milliseconds while a session runs; nothing
+is hooked into the interpreter, so there is no cost at all when it is off.
+Results come out as the top functions (self / total samples) and as
+folded stacks ("root;caller;callee count" per line), which flamegraph.pl,
+speedscope and similar tools read directly.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples  = 0
+        self.started  = 0.0
+        self.elapsed  = 0.0
+        self._stacks: Counter = Counter()         # tuple of frames (root first) → samples
+        self._stop    = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float) -> bool:
+        """Start a session of at most `seconds`; False if one is already running."""
+        if self.running:
+            return False
+        self._stacks.clear()
+        self.samples = 0
+        self._stop.clear()
+        self.started = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._run, args=(self.started + seconds,), name="profiler", daemon=True,
+        )
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """End the session (blocks for at most one sampling interval)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, deadline: float):
+        me    = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                if tid not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(f"thread:{names.get(tid, tid)}")
+                self._stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+        self.elapsed = time.monotonic() - self.started
+
+    def folded(self) -> str:
+        """Folded stacks for flamegraph tools."""
+        return "\n".join(
+            f"{';'.join(stack)} {n}" for stack, n in self._stacks.most_common()
+        ) + "\n"
+
+    def top(self, limit: int = 15) -> list[tuple[str, int, int]]:
+        """(function, self samples, total samples), hottest by self time first."""
+        own, total = Counter(), Counter()
+        for stack, n in self._stacks.items():
+            own[stack[-1]] += n
+            for fn in set(stack[1:]):
+                total[fn] += n
+        return [(fn, n, total[fn]) for fn, n in own.most_common(limit)]
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,120 @@
+"""Rate-limited, coalescing progress reporting for long-running jobs."""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from pyrogram.errors import FloodWait
+from pyrogram.types import Message
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressReporter:
+    """Decouple progress producers from slow progress sinks.
+
+    Producers call `update(done, total)`: a cheap, non-blocking, thread-safe
+    state change. A background task publishes the latest state at most once
+    per `interval` seconds and only when it moved by `min_step` percent, so a
+    500-chapter download costs a few dozen edits instead of 500, and a
+    FloodWait only delays the reporter, never the producer.
+    """
+
+    def __init__(
+        self,
+        publish:  Callable[[int, int], Awaitable],
+        interval: float = 3.0,
+        min_step: float = 1.0,
+    ):
+        self._publish  = publish
+        self.interval  = interval
+        self.min_step  = min_step
+        self.done      = 0
+        self.total     = 0
+        self._sent_pct = -100.0
+        self._loop     = asyncio.get_running_loop()
+        self._wake     = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def for_message(cls, msg: Message, render: Callable[[int, int], str], **kw) -> "ProgressReporter":
+        """Reporter that edits `msg` with `render(done, total)`, skipping no-op edits."""
+        last = [None]
+
+        async def publish(done, total):
+            text = render(done, total)
+            if text != last[0]:
+                await msg.edit_text(text)
+                last[0] = text
+
+        return cls(publish, **kw)
+
+    # ── producer side ────────────────────────────────────────────────────────
+    def update(self, done: int, total: int):
+        self.done, self.total = done, total
+        if _in_loop(self._loop):
+            self._kick()
+        else:                     # e.g. an exporter running in a worker thread
+            self._loop.call_soon_threadsafe(self._kick)
+
+    def _kick(self):
+        if self._task is None:
+            self._task = self._loop.create_task(self._run())
+        self._wake.set()
+
+    # ── publisher side ───────────────────────────────────────────────────────
+    async def _run(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            if not self._due():
+                continue
+            started = time.monotonic()
+            await self._flush()
+            # bound the edit rate no matter how fast updates arrive
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+            self._wake.set()      # pick up whatever arrived while sleeping
+
+    def _pct(self) -> float:
+        return self.done * 100 / self.total if self.total else 0.0
+
+    def _due(self) -> bool:
+        return abs(self._pct() - self._sent_pct) >= self.min_step or (
+            self.total and self.done >= self.total and self._sent_pct < 100
+        )
+
+    async def _flush(self):
+        done, total = self.done, self.total
+        try:
+            await self._publish(done, total)
+            self._sent_pct = done * 100 / total if total else 0.0
+        except FloodWait as e:
+            logger.info(f"Progress reporter backing off {e.value}s (FloodWait)")
+            await asyncio.sleep(e.value)
+        except Exception as e:
+            logger.debug(f"Progress publish failed: {e}")
+
+    async def close(self, flush: bool = True):
+        """Stop the background task, optionally publishing the final state."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if flush and self._due():
+            await self._flush()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+
+def _in_loop(loop: asyncio.AbstractEventLoop) -> bool:
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
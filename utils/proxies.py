@@ -0,0 +1,184 @@
+"""Optional outbound proxy pool.
+
+With PROXIES set, every page fetch leaves through one of a pool of routes
+(the proxies, plus our own address when PROXY_DIRECT is on) so sites that
+throttle per IP see the load spread out:
+
+* each (route, host) pair has its own request budget of PROXY_HOST_RPS;
+* a download job sticks to one route (keyed by its job key) while that
+  route stays healthy, so a site sees one consistent client per job;
+* routes are scored by an EWMA of their success rate and latency, and one
+  failing PROXY_MAX_FAILS times in a row is ejected for PROXY_COOLDOWN
+  seconds, then let back on probation.
+
+Routes are taken inside the fetch scheduler's host slot, so priority
+classes still decide who goes first. With PROXY_DIRECT off, our own
+address is never used: when every proxy is ejected, a fetch waits for the
+first one to come back (up to _MAX_WAIT) or fails.
+
+Page fetches go through scraper._fetch; other outbound requests (watcher
+TOC checks, cover images) use `routed_get`, so they obey the same rules.
+
+Without PROXIES, `pool` is None and fetches go out directly as before.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# responses that mean "this route is throttled/blocked", not "page missing";
+# every 5xx counts as well (see `blocked`)
+BLOCKED_STATUSES = frozenset({403, 407, 429})
+
+_STICKY_MAX = 10_000
+_MAX_WAIT   = 30.0          # seconds a fetch waits for an ejected proxy to return
+
+
+class NoRoute(Exception):
+    """Every proxy is ejected and going direct is not allowed."""
+
+
+def blocked(status: int) -> bool:
+    return status in BLOCKED_STATUSES or status >= 500
+
+
+class Route:
+    __slots__ = ("url", "score", "latency", "fails", "ejected_until", "next_ok", "requests")
+
+    def __init__(self, url: Optional[str]):
+        self.url           = url             # None = direct connection
+        self.score         = 1.0             # EWMA of success (1) / failure (0)
+        self.latency       = 0.0             # EWMA seconds
+        self.fails         = 0               # consecutive failures
+        self.ejected_until = 0.0
+        self.next_ok: dict[str, float] = {}  # host → earliest time the budget allows
+        self.requests      = 0
+
+    @property
+    def name(self) -> str:
+        if self.url is None:
+            return "direct"
+        return self.url.rsplit("@", 1)[-1]   # never show credentials
+
+    def healthy(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+
+class ProxyPool:
+    def __init__(self, urls: list[str], direct: bool = False, host_rps: float = 2.0,
+                 max_fails: int = 5, cooldown: float = 300.0):
+        self.routes    = [Route(u) for u in urls] + ([Route(None)] if direct else [])
+        self.direct    = direct
+        self.interval  = 1.0 / host_rps if host_rps > 0 else 0.0
+        self.max_fails = max_fails
+        self.cooldown  = cooldown
+        self._sticky: "OrderedDict[str, Route]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+    def _choose(self, host: str, now: float) -> Optional[Route]:
+        healthy = [r for r in self.routes if r.healthy(now)]
+        if not healthy:
+            return None
+        # soonest free budget for this host first, then the healthiest
+        return min(healthy, key=lambda r: (max(r.next_ok.get(host, 0.0), now), -r.score, r.latency))
+
+    async def acquire(self, host: str, sticky: Optional[str] = None) -> Optional[Route]:
+        """Pick a route for one request to `host` and wait for its budget.
+
+        When every route is ejected: returns None (go direct) if direct
+        connections are allowed, else waits for the first route to come
+        back, raising NoRoute if that is more than _MAX_WAIT away."""
+        now   = time.monotonic()
+        route = self._sticky.get(sticky) if sticky else None
+        if route is None or not route.healthy(now):
+            route = self._choose(host, now)
+            if route is None:
+                if self.direct:
+                    return None
+                back = min(r.ejected_until for r in self.routes) - now
+                if back > _MAX_WAIT:
+                    raise NoRoute(f"all proxies ejected for another {back:.0f}s")
+                await asyncio.sleep(back)
+                now   = time.monotonic()
+                route = self._choose(host, now)
+                if route is None:
+                    raise NoRoute("all proxies ejected")
+            if sticky:
+                self._sticky[sticky] = route
+                while len(self._sticky) > _STICKY_MAX:
+                    self._sticky.popitem(last=False)
+        elif sticky:
+            self._sticky.move_to_end(sticky)
+
+        at = max(route.next_ok.get(host, 0.0), now)
+        route.next_ok[host] = at + self.interval
+        route.requests += 1
+        if at > now:
+            await asyncio.sleep(at - now)
+        return route
+
+    def report(self, route: Route, ok: bool, latency: float = 0.0):
+        route.score   = 0.8 * route.score + 0.2 * (1.0 if ok else 0.0)
+        route.latency = 0.8 * route.latency + 0.2 * latency if route.latency else latency
+        if ok:
+            route.fails = 0
+            return
+        route.fails += 1
+        if route.fails >= self.max_fails:
+            route.ejected_until = time.monotonic() + self.cooldown
+            route.fails = self.max_fails - 1        # one more failure after cooldown re-ejects
+            logger.warning(f"Proxy {route.name} ejected for {self.cooldown:.0f}s")
+
+    def release(self, sticky: str):
+        """Forget a finished job's route assignment."""
+        self._sticky.pop(sticky, None)
+
+    def stats(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {"name": r.name, "requests": r.requests, "score": r.score,
+             "latency_ms": r.latency * 1000, "ejected": not r.healthy(now)}
+            for r in self.routes
+        ]
+
+
+@asynccontextmanager
+async def routed_get(session: aiohttp.ClientSession, url: str,
+                     sticky: Optional[str] = None, **kwargs):
+    """`session.get(url)` through one of the pool's routes (directly without
+    a pool), reporting the outcome back to the route. May raise NoRoute."""
+    route = await pool.acquire(urlparse(url).hostname or "", sticky) if pool else None
+    started, ok = time.monotonic(), False
+    try:
+        async with session.get(url, proxy=route.url if route else None, **kwargs) as r:
+            ok = not blocked(r.status)
+            yield r
+    except asyncio.CancelledError:
+        route = None                  # says nothing about the route
+        raise
+    finally:
+        if route is not None:
+            pool.report(route, ok, time.monotonic() - started)
+
+
+def route_count() -> int:
+    """Independent outbound addresses (1 without a pool)."""
+    return len(pool) if pool else 1
+
+
+pool: Optional[ProxyPool] = (
+    ProxyPool(Config.PROXIES, direct=Config.PROXY_DIRECT, host_rps=Config.PROXY_HOST_RPS,
+              max_fails=Config.PROXY_MAX_FAILS, cooldown=Config.PROXY_COOLDOWN)
+    if Config.PROXIES else None
+)
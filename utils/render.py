@@ -0,0 +1,58 @@
+"""Pre-rendered, paginated chapter pages with a shared render cache."""
+import html
+from collections import OrderedDict
+
+from config import Config
+from script import script
+from utils.helpers import split_text
+from utils.tracing import span
+
+# CHAPTER_TXT chrome + escaping headroom must fit in Telegram's 4096 limit
+PAGE_LIMIT = 3300
+
+# (chapter url, page) → (rendered text, page count); LRU, shared by all users
+_cache: "OrderedDict[tuple[str, int], tuple[str, int]]" = OrderedDict()
+
+
+def cached_page(chapter_url: str, page: int):
+    """Return (text, pages) if the page is already rendered, else None."""
+    hit = _cache.get((chapter_url, page))
+    if hit is not None:
+        _cache.move_to_end((chapter_url, page))
+    return hit
+
+
+def render_page(novel_title: str, idx: int, chapter, page: int = 0) -> tuple[str, int]:
+    """Render every page of a chapter once, cache them, return the one asked for."""
+    hit = cached_page(chapter.url, page)
+    if hit is not None:
+        return hit
+
+    with span("render"):
+        content = chapter.content if chapter.has_content else ""
+        parts   = split_text(content, PAGE_LIMIT) if content else []
+        if not parts:
+            # nothing cached: content may show up on a later fetch
+            return _format(novel_title, idx, chapter.title, "<i>(content unavailable)</i>", 0, 1), 1
+
+        pages    = len(parts)
+        rendered = [
+            _format(novel_title, idx, chapter.title, html.escape(part, quote=False), p, pages)
+            for p, part in enumerate(parts)
+        ]
+    for p, text in enumerate(rendered):
+        _cache[(chapter.url, p)] = (text, pages)
+    while len(_cache) > Config.RENDER_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+    return rendered[min(page, pages - 1)], pages
+
+
+def _format(novel_title: str, idx: int, chap_title: str, body: str, page: int, pages: int) -> str:
+    return script.CHAPTER_TXT.format(
+        title=html.escape(novel_title, quote=False),
+        num=idx + 1,
+        chap_title=html.escape(chap_title, quote=False),
+        page=f" · Page {page + 1}/{pages}" if pages > 1 else "",
+        content=body,
+    )
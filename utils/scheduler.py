@@ -0,0 +1,111 @@
+"""Central scheduler for outbound page fetches.
+
+Every fetch takes a slot for its host before it goes out. Waiting fetches
+are served by priority class first (a reader turning a page beats the
+prefetcher, which beats bulk downloads, which beat background refreshes),
+then round-robin across users within a class, so one user's 2000-chapter
+download cannot starve another user's download either. The top
+HOST_RESERVED slots of each host are kept for interactive reads, so a page
+turn never has to wait for a bulk fetch to finish. The per-host limit is
+HOST_CONCURRENCY per outbound route.
+"""
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+from config import Config
+from utils.proxies import route_count
+
+READ, PREFETCH, BULK, BACKGROUND = range(4)
+CLASS_NAMES = ("read", "prefetch", "bulk", "background")
+
+
+class _Host:
+    __slots__ = ("active", "queues")
+
+    def __init__(self):
+        self.active = 0
+        # one queue per class: user → waiting futures, rotated for round-robin
+        self.queues: list[OrderedDict] = [OrderedDict() for _ in CLASS_NAMES]
+
+
+class FetchScheduler:
+    def __init__(self, per_host: int, reserved: int = 1):
+        self.per_host = per_host
+        self.reserved = min(reserved, per_host - 1)
+        self._hosts: dict[str, _Host] = {}
+        self._stats = [{"requests": 0, "queued": 0, "wait": 0.0, "max_wait": 0.0}
+                       for _ in CLASS_NAMES]
+
+    def _cap(self, priority: int) -> int:
+        return self.per_host if priority == READ else self.per_host - self.reserved
+
+    @asynccontextmanager
+    async def slot(self, host: str, priority: int = BULK, user: int = 0):
+        """Hold one of `host`'s fetch slots for the duration of the block."""
+        started = time.monotonic()
+        await self._acquire(host, priority, user)
+        waited = time.monotonic() - started
+        st = self._stats[priority]
+        st["requests"] += 1
+        st["wait"]     += waited
+        st["max_wait"]  = max(st["max_wait"], waited)
+        try:
+            yield
+        finally:
+            self._release(host)
+
+    async def _acquire(self, host: str, priority: int, user: int):
+        h = self._hosts.get(host)
+        if h is None:
+            h = self._hosts[host] = _Host()
+        # go straight through only if nobody of equal or higher priority is waiting
+        if h.active < self._cap(priority) and not any(h.queues[:priority + 1]):
+            h.active += 1
+            return
+
+        self._stats[priority]["queued"] += 1
+        fut = asyncio.get_running_loop().create_future()
+        h.queues[priority].setdefault(user, deque()).append(fut)
+        try:
+            await fut                     # the releaser counted us in h.active
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._release(host)       # handed a slot just as we were cancelled
+            raise
+
+    def _release(self, host: str):
+        h = self._hosts[host]
+        h.active -= 1
+        for priority, queue in enumerate(h.queues):
+            while queue and h.active < self._cap(priority):
+                user, waiters = next(iter(queue.items()))
+                fut = waiters.popleft()
+                if waiters:
+                    queue.move_to_end(user)
+                else:
+                    del queue[user]
+                if not fut.cancelled():
+                    h.active += 1
+                    fut.set_result(None)
+            if queue:
+                break                     # lower classes have no more room than this one
+        if not h.active and not any(h.queues):
+            del self._hosts[host]
+
+    def stats(self) -> dict:
+        """Per class: requests, how many had to queue, average and max wait (ms)."""
+        return {
+            CLASS_NAMES[i]: {
+                "requests": st["requests"],
+                "queued":   st["queued"],
+                "avg_ms":   st["wait"] * 1000 / st["requests"] if st["requests"] else 0.0,
+                "max_ms":   st["max_wait"] * 1000,
+            }
+            for i, st in enumerate(self._stats)
+        }
+
+
+# each outbound address (see utils.proxies) gets its own share of a site
+scheduler = FetchScheduler(Config.HOST_CONCURRENCY * route_count(), Config.HOST_RESERVED)
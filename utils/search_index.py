@@ -0,0 +1,153 @@
+"""Local full-text index of every novel we have scraped.
+
+Titles and authors are indexed by character trigrams (typo tolerant),
+descriptions by word tokens. The index is loaded from `novels_col` on first
+use and updated incrementally as new novels are scraped, so /search can
+answer in milliseconds and only fall back to remote sites when local results
+are weak.
+"""
+import asyncio
+import logging
+import re
+from collections import defaultdict
+
+import database as db
+from scraper import SearchResult
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+", re.U)
+
+# very common words carry no signal in descriptions
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has he her his in is it its of on or "
+    "she that the their they this to was were will with".split()
+)
+
+
+def _norm(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def _trigrams(text: str) -> set[str]:
+    grams = set()
+    for word in _norm(text).split():
+        w = f"  {word} "
+        grams.update(w[i:i + 3] for i in range(len(w) - 2))
+    return grams
+
+
+def _tokens(text: str) -> set[str]:
+    return {t for t in _WORD_RE.findall(text.lower()) if t not in _STOPWORDS and len(t) > 2}
+
+
+def _dice(a: set, b: set) -> float:
+    return 2 * len(a & b) / (len(a) + len(b)) if a and b else 0.0
+
+
+class SearchIndex:
+    def __init__(self):
+        self._docs:   dict[str, dict]          = {}
+        self._grams:  dict[str, set[str]]      = defaultdict(set)   # trigram → urls
+        self._words:  dict[str, set[str]]      = defaultdict(set)   # desc token → urls
+        self._loaded  = False
+        self._lock    = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    async def ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            async for doc in db.iter_novel_meta():
+                self.add(doc["_id"], doc.get("title", ""), doc.get("author", ""),
+                         doc.get("description", ""), doc.get("cover_url"))
+            self._loaded = True
+            logger.info(f"🔎 Search index loaded: {len(self._docs)} novels")
+
+    def add(self, url: str, title: str, author: str = "", description: str = "",
+            cover_url: str | None = None):
+        """Insert or refresh one novel."""
+        if not title:
+            return
+        if url in self._docs:
+            self.remove(url)
+        doc = {
+            "title":       title,
+            "author":      author,
+            "description": description,
+            "cover_url":   cover_url,
+            "t_grams":     _trigrams(title),
+            "a_grams":     _trigrams(author),
+            "words":       _tokens(f"{title} {description}"),
+            "norm":        _norm(title),
+        }
+        self._docs[url] = doc
+        for g in doc["t_grams"] | doc["a_grams"]:
+            self._grams[g].add(url)
+        for w in doc["words"]:
+            self._words[w].add(url)
+
+    def remove(self, url: str):
+        doc = self._docs.pop(url, None)
+        if not doc:
+            return
+        for g in doc["t_grams"] | doc["a_grams"]:
+            self._grams[g].discard(url)
+        for w in doc["words"]:
+            self._words[w].discard(url)
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[float, SearchResult]]:
+        """Ranked (score, result) pairs; scores are roughly 0..1.3."""
+        q_grams = _trigrams(query)
+        q_words = _tokens(query)
+        q_norm  = _norm(query)
+        if not q_grams:
+            return []
+
+        # candidates must share a decent fraction of trigrams or a word
+        hits: dict[str, int] = defaultdict(int)
+        for g in q_grams:
+            for url in self._grams.get(g, ()):
+                hits[url] += 1
+        need = max(1, len(q_grams) // 4)
+        cands = {u for u, n in hits.items() if n >= need}
+        for w in q_words:
+            cands.update(self._words.get(w, ()))
+
+        scored = []
+        for url in cands:
+            doc   = self._docs[url]
+            score = max(_dice(q_grams, doc["t_grams"]), 0.8 * _dice(q_grams, doc["a_grams"]))
+            if q_words:
+                score += 0.2 * len(q_words & doc["words"]) / len(q_words)
+            if q_norm and q_norm in doc["norm"]:
+                score += 0.1
+            scored.append((score, url))
+
+        scored.sort(reverse=True)
+        return [
+            (score, SearchResult(
+                title=self._docs[url]["title"], url=url,
+                cover_url=self._docs[url]["cover_url"],
+                desc=self._docs[url]["description"][:200],
+            ))
+            for score, url in scored[:limit]
+        ]
+
+
+index = SearchIndex()
+
+
+async def record_novel(novel):
+    """Persist a freshly scraped novel's metadata and index it."""
+    index.add(novel.url, novel.title, novel.author, novel.description, novel.cover_url)
+    await db.save_novel_meta(novel.url, {
+        "title":       novel.title,
+        "author":      novel.author,
+        "description": novel.description,
+        "cover_url":   novel.cover_url,
+    })
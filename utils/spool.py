@@ -0,0 +1,78 @@
+"""Append-only on-disk chapter spool for download jobs.
+
+Chapter bodies are written (still compressed) as they arrive and read back
+through a memory-mapped view, so exporters never need the whole novel in RAM.
+"""
+import mmap
+import os
+import tempfile
+import weakref
+from typing import Iterator
+
+from scraper import Chapter
+
+
+def _cleanup(f, mm_holder: list, path: str):
+    for mm in mm_holder:
+        mm.close()
+    mm_holder.clear()
+    f.close()
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ChapterSpool:
+    """Per-job chapter store: append while fetching, iterate while exporting.
+
+    Use as a context manager; the spool file is also removed on garbage
+    collection if a job dies without closing it.
+    """
+
+    def __init__(self, prefix: str = "novel_"):
+        fd, self.path = tempfile.mkstemp(prefix=prefix, suffix=".spool")
+        self._f     = os.fdopen(fd, "w+b")
+        self._size  = 0
+        self._mm: list[mmap.mmap] = []     # holder so the finalizer can close it
+        # chapter index → (offset, length, title, url)
+        self._index: dict[int, tuple[int, int, str, str]] = {}
+        self._finalizer = weakref.finalize(self, _cleanup, self._f, self._mm, self.path)
+
+    def append(self, ch: Chapter):
+        blob = ch.blob
+        self._f.seek(self._size)
+        self._f.write(blob)
+        self._index[ch.index] = (self._size, len(blob), ch.title, ch.url)
+        self._size += len(blob)
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _view(self) -> mmap.mmap:
+        if self._mm and len(self._mm[0]) >= self._size:
+            return self._mm[0]
+        self._f.flush()
+        for mm in self._mm:
+            mm.close()
+        self._mm[:] = [mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)]
+        return self._mm[0]
+
+    def __iter__(self) -> Iterator[Chapter]:
+        """Yield chapters in chapter-index order, one body in memory at a time."""
+        view = self._view() if self._size else b""
+        for idx in sorted(self._index):
+            off, n, title, url = self._index[idx]
+            yield Chapter(index=idx, title=title, url=url, blob=bytes(view[off:off + n]))
+
+    def close(self):
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -0,0 +1,113 @@
+"""Lightweight request tracing.
+
+`trace(name)` marks the root of a user request; `span(name)` times one step
+of it (fetch, parse, clean, render, export, send). Spans always feed the
+per-name totals shown in /perf, and a request slower than
+Config.SLOW_REQUEST_MS is logged with its per-span breakdown. A span costs
+two perf_counter() calls and a couple of dict updates; spans outside a
+trace only update the totals.
+"""
+import functools
+import logging
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["trace"]] = ContextVar("trace", default=None)
+_totals: dict[str, list] = {}          # span name → [count, seconds, max seconds]
+
+
+class span:
+    """Time a block (`with` or `async with`) as one step of the current request."""
+
+    __slots__ = ("name", "_t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "span":
+        self._t0 = perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        dt  = perf_counter() - self._t0
+        tot = _totals.get(self.name)
+        if tot is None:
+            tot = _totals[self.name] = [0, 0.0, 0.0]
+        tot[0] += 1
+        tot[1] += dt
+        if dt > tot[2]:
+            tot[2] = dt
+        tr = _current.get()
+        if tr is not None:
+            tr._add(self.name, dt)
+
+    async def __aenter__(self) -> "span":
+        return self.__enter__()
+
+    async def __aexit__(self, *exc):
+        self.__exit__(*exc)
+
+
+class trace:
+    """Root span of a request; logs the breakdown when the request is slow."""
+
+    __slots__ = ("name", "tags", "spans", "_t0", "_token")
+
+    def __init__(self, name: str, **tags):
+        self.name  = name
+        self.tags  = tags
+        self.spans: dict[str, list] = {}   # span name → [count, seconds]
+
+    def _add(self, name: str, dt: float):
+        s = self.spans.get(name)
+        if s is None:
+            self.spans[name] = [1, dt]
+        else:
+            s[0] += 1
+            s[1] += dt
+
+    def __enter__(self) -> "trace":
+        self._token = _current.set(self)
+        self._t0    = perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        total = perf_counter() - self._t0
+        _current.reset(self._token)
+        if total * 1000 >= Config.SLOW_REQUEST_MS:
+            parts = ", ".join(
+                f"{name} {secs:.2f}s" + (f" ×{n}" if n > 1 else "")
+                for name, (n, secs) in sorted(self.spans.items(), key=lambda kv: -kv[1][1])
+            )
+            tags = " ".join(f"{k}={v}" for k, v in self.tags.items())
+            logger.warning(f"🐢 Slow {self.name} {total:.2f}s [{parts or 'no spans'}] {tags}")
+
+    async def __aenter__(self) -> "trace":
+        return self.__enter__()
+
+    async def __aexit__(self, *exc):
+        self.__exit__(*exc)
+
+
+def traced(name: str):
+    """Decorator: run an async handler inside `trace(name)`."""
+    def deco(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with trace(name):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def span_stats() -> dict:
+    """Per span name: count, average and max milliseconds since startup."""
+    return {
+        name: {"count": n, "avg_ms": secs * 1000 / n, "max_ms": worst * 1000}
+        for name, (n, secs, worst) in _totals.items()
+    }
@@ -0,0 +1,319 @@
+"""New-chapter watcher for followed novels.
+
+Every followed novel sits in a min-heap keyed by its next check time. Due
+novels are queued per site and drained by at most WATCH_PER_HOST tasks per
+host (and WATCH_CONCURRENCY overall), so one slow or strict site never
+stalls the rest. A check is a conditional GET (ETag / Last-Modified); if the
+page did change, a digest of its links is compared before the page is parsed
+at all. Each novel's interval follows its own update rhythm: about a third
+of its typical gap between releases, stretched while it is on hiatus.
+"""
+import asyncio
+import hashlib
+import heapq
+import logging
+import random
+import re
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+import aiohttp
+from pyrogram import Client
+from pyrogram.errors import FloodWait, InputUserDeactivated, UserIsBlocked
+
+import database as db
+from config import Config
+from scraper import HEADERS, _detect_and_parse, _host, _read_html, _soup
+from script import script
+from utils import proxies
+from utils.keyboards import new_chapters_keyboard
+from utils.scheduler import BACKGROUND, scheduler
+
+logger = logging.getLogger(__name__)
+
+_HREF_RE = re.compile(r"""href\s*=\s*["']([^"'#]+)""", re.I)
+
+# state fields written back to subs_col after every check
+_PERSIST = ("chapters", "etag", "modified", "digest", "interval", "next_check",
+            "last_change", "gap", "errors")
+
+Notify = Callable[[str, dict, list], Awaitable]
+
+
+def _digest(html: str) -> str:
+    """Fingerprint of the page's link set; ignores ads, counters and timestamps."""
+    links = sorted(set(_HREF_RE.findall(html)))
+    return hashlib.sha1("\n".join(links).encode("utf-8", "replace")).hexdigest()
+
+
+def _parse_toc(html: str, url: str) -> list:
+    return _detect_and_parse(_soup(html), url)[1]
+
+
+def _clamp(interval: float) -> float:
+    return min(max(interval, Config.WATCH_MIN_INTERVAL), Config.WATCH_MAX_INTERVAL)
+
+
+class Watcher:
+    def __init__(self, notify: Notify):
+        self._notify  = notify
+        self._state:  dict[str, dict]         = {}   # url → watch state
+        self._heap:   list[tuple[float, str]] = []
+        self._due:    dict[str, float]        = {}   # url → due time of its live heap entry
+        self._queues: dict[str, deque]        = {}   # host → urls waiting for a check
+        self._drains: dict[str, int]          = {}   # host → running drain tasks
+        self._tasks:  set[asyncio.Task]       = set()
+        self._slots   = asyncio.Semaphore(Config.WATCH_CONCURRENCY)
+        self._wake    = asyncio.Event()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.checks   = {"total": 0, "unmodified": 0, "same_digest": 0, "parsed": 0,
+                         "updates": 0, "errors": 0}
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    # ── scheduling ───────────────────────────────────────────────────────────
+    def watch(self, doc: dict):
+        """Start (or keep) watching the novel described by a subs_col document."""
+        url = doc["_id"]
+        if url in self._state:
+            self._state[url]["title"] = doc.get("title", self._state[url]["title"])
+            return
+        state = {k: doc[k] for k in _PERSIST if doc.get(k) is not None}
+        state["title"] = doc.get("title", "")
+        self._state[url] = state
+        # spread a cold start over the first interval instead of a thundering herd
+        due = doc.get("next_check") or time.time() + random.uniform(
+            0, state.get("interval", Config.WATCH_DEFAULT_INTERVAL))
+        self._push(url, due)
+
+    def unwatch(self, url: str):
+        self._state.pop(url, None)
+        self._due.pop(url, None)          # its heap entry is skipped when popped
+
+    def _push(self, url: str, due: float):
+        self._due[url] = due
+        heapq.heappush(self._heap, (due, url))
+        if self._heap[0][1] == url:
+            self._wake.set()
+
+    async def run(self):
+        self._session = aiohttp.ClientSession(
+            headers=HEADERS,
+            connector=aiohttp.TCPConnector(
+                limit=Config.WATCH_CONCURRENCY, limit_per_host=Config.WATCH_PER_HOST,
+                ttl_dns_cache=300,
+            ),
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
+        try:
+            async for doc in db.iter_watched():
+                self.watch(doc)
+            logger.info(f"🔔 Watching {len(self._state)} followed novels")
+            while True:
+                self._dispatch_due()
+                delay = self._heap[0][0] - time.time() if self._heap else 3600
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=max(delay, 0.05))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self._session.close()
+
+    def _dispatch_due(self):
+        now = time.time()
+        while self._heap and self._heap[0][0] <= now:
+            due, url = heapq.heappop(self._heap)
+            if self._due.get(url) != due:
+                continue                  # unwatched or rescheduled since
+            del self._due[url]
+            host = _host(url)
+            self._queues.setdefault(host, deque()).append(url)
+            if self._drains.get(host, 0) < Config.WATCH_PER_HOST:
+                self._drains[host] = self._drains.get(host, 0) + 1
+                task = asyncio.create_task(self._drain(host))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _drain(self, host: str):
+        queue = self._queues[host]
+        try:
+            while queue:
+                url = queue.popleft()
+                async with self._slots:
+                    await self._check(url)
+                await asyncio.sleep(Config.WATCH_HOST_DELAY)
+        finally:
+            self._drains[host] -= 1
+            if not self._drains[host]:
+                del self._drains[host]
+                if not queue:
+                    del self._queues[host]
+
+    # ── one check ────────────────────────────────────────────────────────────
+    async def _check(self, url: str):
+        st = self._state.get(url)
+        if st is None:
+            return
+        self.checks["total"] += 1
+        changed = None
+        try:
+            new = await self._probe(url, st)
+            changed = bool(new)
+            if new:
+                self.checks["updates"] += 1
+                await self._notify(url, st, new)
+            st["errors"] = 0
+        except Exception as e:
+            self.checks["errors"] += 1
+            st["errors"] = st.get("errors", 0) + 1
+            logger.debug(f"Watch check failed {url}: {e}")
+
+        if url not in self._state:        # unfollowed while we were checking
+            return
+        self._reschedule(url, st, changed)
+        try:
+            await db.save_watch_state(url, {k: st[k] for k in _PERSIST if k in st})
+        except Exception as e:
+            logger.warning(f"Could not save watch state for {url}: {e}")
+
+    async def _probe(self, url: str, st: dict) -> list:
+        """New chapters since the last check ([] when nothing changed)."""
+        headers = {}
+        if st.get("etag"):
+            headers["If-None-Match"] = st["etag"]
+        if st.get("modified"):
+            headers["If-Modified-Since"] = st["modified"]
+
+        async with scheduler.slot(_host(url), BACKGROUND), \
+                proxies.routed_get(self._session, url, headers=headers, allow_redirects=True) as r:
+            if r.status == 304:
+                self.checks["unmodified"] += 1
+                return []
+            r.raise_for_status()
+            st["etag"]     = r.headers.get("ETag")
+            st["modified"] = r.headers.get("Last-Modified")
+            html = await _read_html(r)
+
+        digest = _digest(html)
+        if digest == st.get("digest"):
+            self.checks["same_digest"] += 1
+            return []
+        st["digest"] = digest
+
+        self.checks["parsed"] += 1
+        chapters = await asyncio.to_thread(_parse_toc, html, url)
+        if not chapters:
+            return []                     # layout hiccup: keep the old count
+        known = st.get("chapters", 0)
+        st["chapters"] = len(chapters)
+        return list(chapters[known:]) if known and len(chapters) > known else []
+
+    def _reschedule(self, url: str, st: dict, changed: Optional[bool]):
+        now      = time.time()
+        interval = st.get("interval", Config.WATCH_DEFAULT_INTERVAL)
+        gap      = st.get("gap")
+
+        if changed is None:               # error: back off
+            interval *= 2
+        elif changed:
+            last = st.get("last_change")
+            if last:
+                gap = now - last if gap is None else 0.7 * gap + 0.3 * (now - last)
+                st["gap"] = gap
+            st["last_change"] = now
+            interval = gap / 3 if gap else interval
+        elif gap:
+            # check a few times per typical gap; a novel on hiatus decays
+            interval = max(gap, now - st.get("last_change", now)) / 3
+        else:
+            interval *= 1.5
+
+        st["interval"]   = _clamp(interval)
+        st["next_check"] = now + st["interval"] * random.uniform(
+            1 - Config.WATCH_JITTER, 1 + Config.WATCH_JITTER)
+        self._push(url, st["next_check"])
+
+
+# ─── Bot integration ──────────────────────────────────────────────────────────
+_watcher: Optional[Watcher] = None
+_tasks: set[asyncio.Task] = set()     # strong refs to the watcher and notifier tasks
+
+
+_SEND_ATTEMPTS = 5          # tries per follower (FloodWaits are waited out in between)
+
+
+class _Notifier:
+    """Sends new-chapter notices from its own task, so a novel with many
+    followers (or a FloodWait) never holds up the watcher's checks."""
+
+    def __init__(self, client: Client):
+        self._client = client
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    async def notify(self, url: str, st: dict, new: list):
+        first = new[0].index
+        lines = "\n".join(f"• {ch.title}" for ch in new[:5])
+        if len(new) > 5:
+            lines += f"\n… and {len(new) - 5} more"
+        text = script.NEW_CHAPTERS_TXT.format(title=st["title"], count=len(new), chapters=lines)
+        self._queue.put_nowait((url, text, new_chapters_keyboard(url, first)))
+
+    async def run(self):
+        while True:
+            url, text, kb = await self._queue.get()
+            try:
+                for user_id in await db.get_followers(url):
+                    await self._send(user_id, url, text, kb)
+                    await asyncio.sleep(0.05)
+            except Exception as e:
+                logger.warning(f"New-chapter notices for {url} failed: {e}")
+
+    async def _send(self, user_id: int, url: str, text: str, kb):
+        for _ in range(_SEND_ATTEMPTS):
+            try:
+                await self._client.send_message(user_id, text, reply_markup=kb,
+                                                disable_web_page_preview=True)
+                return
+            except FloodWait as e:
+                await asyncio.sleep(e.value)      # then retry the same follower
+            except (UserIsBlocked, InputUserDeactivated):
+                await db.unfollow_novel(user_id, url)
+                return
+            except Exception as e:
+                logger.debug(f"New-chapter notice to {user_id} failed: {e}")
+                return
+
+
+def start(client: Client) -> Watcher:
+    """Create the watcher and its notice sender, running on the bot's loop."""
+    global _watcher
+    notifier = _Notifier(client)
+    _watcher = Watcher(notifier.notify)
+    for coro in (notifier.run(), _watcher.run()):
+        task = asyncio.create_task(coro)
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+    return _watcher
+
+
+def stats() -> Optional[dict]:
+    """Watched novel count and check counters; None when the watcher is off."""
+    if _watcher is None:
+        return None
+    return {"novels": len(_watcher), **_watcher.checks}
+
+
+def watch(doc: dict):
+    if _watcher is not None:
+        _watcher.watch(doc)
+
+
+def unwatch(url: str):
+    if _watcher is not None:
+        _watcher.unwatch(url)
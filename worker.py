@@ -0,0 +1,122 @@
+"""
+Zero Novel Scraper Worker
+=========================
+Runs download jobs queued by the bot (USE_WORKERS=1) in separate processes.
+
+Jobs are claimed atomically from MongoDB with a lease that a heartbeat keeps
+alive; a worker that dies simply lets its lease expire and another one picks
+the job up (resuming from the chapter checkpoints). Finished files go to
+GridFS + the outbox collection, and the bot process uploads them.
+
+Run as many as you need:
+  python worker.py
+"""
+import asyncio
+import logging
+import os
+import socket
+
+import database as db
+from config import Config
+from utils import novel_store
+from utils.downloads import DownloadError, run_download
+from utils.progress import ProgressReporter
+
+# ── Logging ──────────────────────────────────────────────────────────────────
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger("worker")
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+# ── Job execution ────────────────────────────────────────────────────────────
+async def _run_download_job(job: dict):
+    p = job["payload"]
+
+    novel = await novel_store.load(p["url"], p["user_id"])
+    if not novel or not novel.chapters:
+        raise DownloadError("❌ Failed to load novel.")
+
+    async def publish(done, total):
+        await db.update_job_progress(job["_id"], WORKER_ID, done, total)
+
+    async def deliver(path, caption):
+        await db.push_result_file(job["_id"], path, os.path.basename(path), caption)
+
+    # one db write per poll interval is plenty for the bot's progress mirror
+    async with ProgressReporter(publish, interval=Config.JOB_POLL) as reporter:
+        await run_download(novel, p["fmt"], p["first"], p["last"], p["user_id"],
+                           reporter.update, deliver)
+
+
+_HANDLERS = {"download": _run_download_job}
+
+
+async def _heartbeat(job_id, task: asyncio.Task):
+    while not task.done():
+        await asyncio.sleep(Config.JOB_LEASE / 3)
+        if not await db.heartbeat_job(job_id, WORKER_ID, Config.JOB_LEASE):
+            logger.warning(f"Lost lease on job {job_id}, abandoning it")
+            task.cancel()
+            return
+
+
+async def _process(job: dict):
+    handler = _HANDLERS.get(job["kind"])
+    if handler is None:
+        return await db.finish_job(job["_id"], WORKER_ID, "failed", f"Unknown job kind {job['kind']}")
+
+    logger.info(f"▶️ Job {job['_id']} ({job['kind']}, attempt {job['attempts']})")
+    task = asyncio.create_task(handler(job))
+    beat = asyncio.create_task(_heartbeat(job["_id"], task))
+    try:
+        await task
+        await db.finish_job(job["_id"], WORKER_ID, "done")
+        logger.info(f"✅ Job {job['_id']} done")
+    except asyncio.CancelledError:
+        pass                      # lease lost: the new owner reports the result
+    except DownloadError as e:
+        await db.finish_job(job["_id"], WORKER_ID, "failed", str(e))
+    except Exception as e:
+        logger.exception(e)
+        await db.finish_job(job["_id"], WORKER_ID, "failed", f"❌ Download failed: {e}")
+    finally:
+        beat.cancel()
+
+
+# ── Main ──────────────────────────────────────────────────────────────────────
+async def main():
+    logger.info(f"🛠 Worker {WORKER_ID} started ({Config.WORKER_CONCURRENCY} slots)")
+    try:
+        await db.ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Could not create MongoDB indexes: {e}")
+    slots = asyncio.Semaphore(Config.WORKER_CONCURRENCY)
+    running: set[asyncio.Task] = set()
+
+    while True:
+        await slots.acquire()
+        try:
+            job = await db.claim_job(WORKER_ID, Config.JOB_LEASE, Config.JOB_MAX_ATTEMPTS)
+        except Exception as e:
+            logger.warning(f"Claim failed: {e}")
+            job = None
+        if job is None:
+            slots.release()
+            await asyncio.sleep(Config.JOB_POLL)
+            continue
+
+        task = asyncio.create_task(_process(job))
+        running.add(task)
+        task.add_done_callback(lambda t: (running.discard(t), slots.release()))
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logger.info("Worker stopped by user.")